@@ -0,0 +1,207 @@
+"""
+Nausys ve MMK cevaplarının parse maliyetini kayıtlı (anonimleştirilmiş) fixture'lar üzerinde ölçer.
+Ağ ve DB erişimi yoktur; sadece trackerların kullandığı çıkarım fonksiyonları çalıştırılır.
+
+Kullanım (repo kökünden):
+    python -m benchmarks.bench_parsers                  # ölç ve baseline ile karşılaştır
+    python -m benchmarks.bench_parsers --save-baseline  # ölçümü yeni baseline olarak kaydet
+    python -m benchmarks.bench_parsers --check          # çıktıları expected_outputs.json ile doğrula
+    python -m benchmarks.bench_parsers --record-expected
+"""
+import argparse
+import datetime
+import json
+import logging
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from src.core.tracker import mmk_extractor
+from src.core.tracker.mmk_tracker import MMKTracker
+from src.core.tracker.nausys_jsf_client import BookingListForm, parse_partial_response, parse_yacht_rows
+from src.core.tracker.nausys_extractor import extract_booking_details
+
+BENCH_DIR = Path(__file__).resolve().parent
+FIXTURES_DIR = BENCH_DIR / "fixtures"
+BASELINE_PATH = BENCH_DIR / "baseline.json"
+EXPECTED_PATH = FIXTURES_DIR / "expected_outputs.json"
+
+QUEUE_PERIODS = [
+    (datetime.datetime(2025, 8, 2), datetime.datetime(2025, 8, 9)),
+    (datetime.datetime(2025, 8, 9), datetime.datetime(2025, 8, 16)),
+    (datetime.datetime(2025, 8, 16), datetime.datetime(2025, 8, 23)),
+    (datetime.datetime(2025, 8, 23), datetime.datetime(2025, 8, 30)),
+]
+BOOKING_SHEET_YACHTS = 12
+
+
+def _read_text(name: str) -> str:
+    return (FIXTURES_DIR / name).read_text(encoding="utf-8")
+
+
+def build_cases() -> Dict[str, Callable[[], Any]]:
+    """Her case bir dokümanı parse edip trackerın DB'ye yazacağı çıktıyı üretir."""
+    tracker = MMKTracker()
+    nausys_dialog = (FIXTURES_DIR / "nausys_yacht_reservation_dialog.html").read_bytes()
+    booking_list_html = _read_text("nausys_booking_list.html")
+    search_response = (FIXTURES_DIR / "nausys_search_partial_response.xml").read_bytes()
+    quote_html = _read_text("mmk_price_quote.html")
+    queue_html = _read_text("mmk_price_quote_queue.html")
+    booking_sheet = _read_text("mmk_booking_sheet_data.json")
+    comp_data = {"baseId": "", "product": "Bareboat"}
+    yacht_ids = {
+        boat["name"]: boat["id"]
+        for boat in json.loads(booking_sheet)["boats"][:BOOKING_SHEET_YACHTS]
+    }
+    boat_info = MMKTracker.get_boat_info(json.loads(booking_sheet)["boats"], "Demo", comp_data, "Demo Yacht 0",
+                                         yacht_ids["Demo Yacht 0"])
+
+    def nausys_dialog_case():
+        return extract_booking_details(nausys_dialog)
+
+    def nausys_booking_list_case():
+        form = BookingListForm(booking_list_html)
+        return {
+            "form_id": form.form_id,
+            "autocomplete_id": form.autocomplete_id,
+            "search_button_id": form.search_button_id,
+            "search_process": form.search_process,
+            "search_update": form.search_update,
+            "view_state": form.view_state,
+            "fields": form.fields,
+        }
+
+    def nausys_search_response_case():
+        updates, redirect = parse_partial_response(search_response)
+        yacht_ids = {}
+        for content in updates.values():
+            yacht_ids.update(parse_yacht_rows(content))
+        return {"update_ids": sorted(updates), "redirect": redirect, "yacht_ids": yacht_ids}
+
+    def mmk_price_quote_case():
+        dt_from, dt_to = QUEUE_PERIODS[0]
+        quote = mmk_extractor.parse_price_quote(quote_html, "bench")
+        return tracker.build_period_detail(quote, boat_info, dt_from, dt_to, "bench")
+
+    def mmk_price_quote_queue_case():
+        quotes = mmk_extractor.parse_price_quote_queue(queue_html, len(QUEUE_PERIODS), "bench")
+        return [
+            tracker.build_period_detail(quote, boat_info, dt_from, dt_to, "bench")
+            for quote, (dt_from, dt_to) in zip(quotes, QUEUE_PERIODS)
+        ]
+
+    def mmk_booking_sheet_case():
+        boats = json.loads(booking_sheet)["boats"]
+        return [
+            MMKTracker.get_boat_info(boats, "Demo", comp_data, yacht_name, yacht_id)
+            for yacht_name, yacht_id in yacht_ids.items()
+        ]
+
+    return {
+        "nausys_dialog": nausys_dialog_case,
+        "nausys_booking_list": nausys_booking_list_case,
+        "nausys_search_response": nausys_search_response_case,
+        "mmk_price_quote": mmk_price_quote_case,
+        "mmk_price_quote_queue": mmk_price_quote_queue_case,
+        "mmk_booking_sheet": mmk_booking_sheet_case,
+    }
+
+
+def measure(func: Callable[[], Any], iterations: int, warmup: int) -> Dict[str, float]:
+    for _ in range(warmup):
+        func()
+    samples: List[float] = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1_000_000)
+    samples.sort()
+
+    # Zamanlamayı bozmaması için bellek ölçümü ayrı bir çağrıda yapılır. tracemalloc sadece Python
+    # allocator'ını görür; lxml'in C tarafında (libxml2) kurduğu ağaç bu değere dahil değildir.
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    before, _ = tracemalloc.get_traced_memory()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "mean_us": round(statistics.fmean(samples), 1),
+        "p50_us": round(samples[len(samples) // 2], 1),
+        "p95_us": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 1),
+        "peak_alloc_kib": round((peak - before) / 1024, 1),
+    }
+
+
+def _normalize(value: Any) -> Any:
+    return json.loads(json.dumps(value, default=str))
+
+
+def check_outputs(cases: Dict[str, Callable[[], Any]]) -> bool:
+    expected = json.loads(EXPECTED_PATH.read_text(encoding="utf-8"))
+    ok = True
+    for name, func in cases.items():
+        if _normalize(func()) != expected.get(name):
+            print(f"[FAIL] {name}: çıktı expected_outputs.json ile eşleşmiyor")
+            ok = False
+        else:
+            print(f"[OK]   {name}")
+    return ok
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Tracker parser benchmark'ı")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--only", nargs="*", help="Sadece verilen case'leri çalıştır")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--check", action="store_true")
+    parser.add_argument("--record-expected", action="store_true")
+    args = parser.parse_args(argv)
+
+    # Parser'ların uyarı/bilgi logları ölçümü etkilemesin
+    logging.disable(logging.CRITICAL)
+    cases = build_cases()
+    if args.only:
+        cases = {name: func for name, func in cases.items() if name in args.only}
+
+    if args.record_expected:
+        EXPECTED_PATH.write_text(
+            json.dumps({name: _normalize(func()) for name, func in cases.items()}, indent=2, ensure_ascii=False) + "\n",
+            encoding="utf-8"
+        )
+        print(f"Beklenen çıktılar kaydedildi: {EXPECTED_PATH}")
+        return 0
+    if args.check:
+        return 0 if check_outputs(cases) else 1
+
+    baseline = json.loads(BASELINE_PATH.read_text(encoding="utf-8")) if BASELINE_PATH.exists() else {}
+    results = {}
+    print(f"{'case':<24}{'mean µs':>12}{'p50 µs':>12}{'p95 µs':>12}{'peak KiB':>12}{'vs baseline':>14}")
+    for name, func in cases.items():
+        result = measure(func, args.iterations, args.warmup)
+        results[name] = result
+        base = baseline.get("cases", {}).get(name)
+        change = f"{result['mean_us'] / base['mean_us']:.2f}x" if base else "-"
+        print(f"{name:<24}{result['mean_us']:>12}{result['p50_us']:>12}{result['p95_us']:>12}"
+              f"{result['peak_alloc_kib']:>12}{change:>14}")
+
+    if args.save_baseline:
+        BASELINE_PATH.write_text(json.dumps({
+            "recorded_at": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "iterations": args.iterations,
+            "cases": {**baseline.get("cases", {}), **results},
+        }, indent=2) + "\n", encoding="utf-8")
+        print(f"Baseline kaydedildi: {BASELINE_PATH}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
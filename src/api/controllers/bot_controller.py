@@ -1,25 +1,62 @@
 import asyncio
 import logging
-from datetime import datetime, timedelta
-from typing import Optional, Dict
+import uuid
+from datetime import datetime
+from typing import Optional, Dict, List
 
 from src.infra.config.init_database import init_database
-from src.api.dto.bot_dto import BotStatus, BotType, BotStatusResponse
+from src.api.dto.bot_dto import (
+    BotStatus,
+    BotType,
+    BotStatusResponse,
+    BotJobStatus,
+    BotJobResponse,
+    ScrapeRunProgress,
+)
 from src.infra.adapter.update_log_repository import UpdateLogRepository
-from src.infra.adapter.booking_data_repository import BookingDataRepository
+from src.infra.adapter.competitor_repository import CompetitorRepository
+from src.infra.adapter.scrape_job_repository import ScrapeJobRepository
+from src.infra.adapter.tracker_session_repository import TrackerSessionRepository
+from src.core.tracker.scrape_job_worker import ScrapeJobWorker
 from src.core.tracker.nausys_tracker import NausysTracker
 from src.core.tracker.mmk_tracker import MMKTracker
+from src.core.tracker.scrape_scheduler import ScrapeScheduler, init_scrape_scheduler
+from src.core.tracker.webdriver_pool import get_webdriver_pool
 
 logger = logging.getLogger(__name__)
 
+# Bellekte tutulan en fazla arka plan işi; eskiler (bitmiş olanlar) silinir
+BOT_JOB_HISTORY = 50
+
+
+class BotJob:
+    """Bir çalıştırmanın (elle ya da planlı) bu süreçteki arka plan işi."""
+
+    def __init__(self, bot_type: BotType):
+        self.job_id: str = uuid.uuid4().hex
+        self.bot_type = bot_type
+        self.status: BotJobStatus = BotJobStatus.RUNNING
+        self.message: str = ""
+        self.run_id: Optional[str] = None
+        self.started_at: datetime = datetime.now()
+        self.finished_at: Optional[datetime] = None
+        self.cancel_event = asyncio.Event()
+        self.worker: Optional[ScrapeJobWorker] = None
+        # ETA hesabı için: iş başladığında run'da zaten bitmiş (done + failed) kalem sayısı
+        self.run_finished_at_start: int = 0
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def active(self) -> bool:
+        return self.status in (BotJobStatus.RUNNING, BotJobStatus.CANCELLING)
+
 
 class BotInstance:
     def __init__(self):
         self.status: BotStatus = BotStatus.STOPPED
         self.last_started: Optional[datetime] = None
         self.last_run: Optional[datetime] = None
-        self.next_run: Optional[datetime] = None
-        self.task: Optional[asyncio.Task] = None
+        self.job: Optional[BotJob] = None
         self.message: str = ""
         self.tracker: Optional[MMKTracker] = None
 
@@ -32,114 +69,231 @@ class BotController:
         self.bots: Dict[BotType, BotInstance] = {
             BotType.MMK: BotInstance()
         }
+        self.scheduler: Optional[ScrapeScheduler] = None
+        self.jobs: Dict[str, BotJob] = {}
+        self._run_locks: Dict[BotType, asyncio.Lock] = {}
+
+    def start_scheduler(self):
+        """
+        Planlı çalıştırmaları başlatır. Mongo'da kayıtlı job'u olan platformlar (yeniden başlatmadan önce
+        çalışır durumda olanlar) tekrar RUNNING durumuna alınır; kaçırılan çalıştırma varsa hemen telafi edilir.
+        """
+        self.scheduler = init_scrape_scheduler(
+            self.db.database_url,
+            self.db.database_name,
+            self._run_scheduled,
+            self._prewarm_platform
+        )
+        self.scheduler.start()
+        for platform in self.scheduler.scheduled_platforms():
+            bot_instance = self.bots.get(BotType(platform))
+            if bot_instance is None:
+                continue
+            bot_instance.status = BotStatus.RUNNING
+            bot_instance.message = "Bot restored from persisted schedule."
+            logger.info(f"[{platform}] Restored scheduled bot; next run at {self.scheduler.next_run(platform)}.")
+
+    def shutdown_scheduler(self):
+        if self.scheduler is not None:
+            self.scheduler.shutdown()
+            self.scheduler = None
+
+    def _status_response(
+            self,
+            bot_type: BotType,
+            bot_instance: BotInstance,
+            message: Optional[str] = None,
+            progress: Optional[ScrapeRunProgress] = None
+    ) -> BotStatusResponse:
+        next_run = previous_run = None
+        if self.scheduler is not None:
+            next_run = self.scheduler.next_run(bot_type.value)
+            previous_run = self.scheduler.previous_runs.get(bot_type.value)
+        return BotStatusResponse(
+            bot_type=bot_type,
+            status=bot_instance.status,
+            message=message or bot_instance.message,
+            last_run=bot_instance.last_run,
+            next_run=next_run,
+            previous_run=previous_run,
+            bot_last_started=bot_instance.last_started,
+            job_id=bot_instance.job.job_id if bot_instance.job else None,
+            progress=progress,
+        )
+
+    def _ensure_tracker(self, bot_type: BotType, bot_instance: BotInstance):
+        """Tracker yoksa oluşturur; oturum açılışı çalıştırma sırasında ensure_session ile yapılır."""
+        if bot_instance.tracker is not None:
+            return
+        if bot_type == BotType.NAUSYS:
+            bot_instance.tracker = NausysTracker(self.db)
+        elif bot_type == BotType.MMK:
+            bot_instance.tracker = MMKTracker(TrackerSessionRepository(self.db.database))
 
     async def start_bot(self, bot_type: BotType) -> BotStatusResponse:
         bot_instance = self.bots[bot_type]
 
         if bot_instance.status == BotStatus.RUNNING:
-            return BotStatusResponse(
-                bot_type=bot_type,
-                status=bot_instance.status,
-                message="Bot is already running.",
-                last_run=bot_instance.last_run,
-                next_run=bot_instance.next_run,
-                bot_last_started=bot_instance.last_started,
-            )
+            return self._status_response(bot_type, bot_instance, "Bot is already running.")
+        if bot_instance.job is not None and bot_instance.job.active:
+            # İptal edilen iş henüz bitmedi; yeni iş yerine eskisi dönmesin diye başlatma reddedilir
+            return self._status_response(
+                bot_type, bot_instance, "Previous job is still being cancelled; try again when it has finished.")
 
         try:
             bot_instance.status = BotStatus.RUNNING
             bot_instance.last_started = datetime.now()
-            bot_instance.message = "Bot started. Running daily jobs."
-
-            if bot_instance.tracker is None:
-                if bot_type == BotType.NAUSYS:
-                    bot_instance.tracker = NausysTracker()
-                elif bot_type == BotType.MMK:
-                    bot_instance.tracker = MMKTracker()
-
-                try:
-                    bot_instance.tracker.setup_driver()
-                except Exception as setup_exc:
-                    logger.error(f"[{bot_type}] Driver setup error: {setup_exc}", exc_info=True)
-                    bot_instance.message = "Error during driver setup. Bot will retry on next scheduled run."
-
-                try:
-                    if not await bot_instance.tracker.login():
-                        bot_instance.message = "Initial login failed. Bot will retry on next scheduled run."
-                        logger.error(f"[{bot_type}] Initial login failed.")
-                except Exception as login_exc:
-                    logger.error(f"[{bot_type}] Exception during login attempt: {login_exc}", exc_info=True)
-                    bot_instance.message = "Exception during login. Bot will retry on next scheduled run."
-
-            bot_instance.task = asyncio.create_task(self._daily_scheduler(bot_type))
-            await self._run_daily_job(bot_type)
+            bot_instance.message = "Bot started. Run is executing in the background."
+
+            # Oturum (gerekirse Selenium ile login) arka plan işinde _run_tracker_job içinde hazırlanır;
+            # istek login'i beklemeden döner
+            if self.scheduler is not None:
+                self.scheduler.schedule(bot_type.value)
+            self._start_job(bot_type)
         except Exception as e:
             logger.error(f"[{bot_type}] Exception during starting bot: {e}", exc_info=True)
             bot_instance.status = BotStatus.STOPPED
             bot_instance.message = f"Failed to start bot: {str(e)}"
-        return BotStatusResponse(
-            bot_type=bot_type,
-            status=bot_instance.status,
-            message=bot_instance.message,
-            last_run=bot_instance.last_run,
-            next_run=bot_instance.next_run,
-            bot_last_started=bot_instance.last_started,
-        )
+        return self._status_response(bot_type, bot_instance)
+
+    async def _run_scheduled(self, platform: str):
+        bot_type = BotType(platform)
+        bot_instance = self.bots.get(bot_type)
+        if bot_instance is None or bot_instance.status != BotStatus.RUNNING:
+            logger.info(f"[{platform}] Bot is not running; scheduled run skipped.")
+            return
+        # Planlı çalıştırma bitene kadar beklenir ki APScheduler max_instances kontrolü anlamlı kalsın
+        await asyncio.shield(self._start_job(bot_type).task)
 
-    async def _daily_scheduler(self, bot_type: BotType):
+    async def _prewarm_platform(self, platform: str):
+        bot_instance = self.bots.get(BotType(platform))
+        if bot_instance is not None and bot_instance.status == BotStatus.RUNNING:
+            await self._prewarm_drivers(BotType(platform))
+
+    def _start_job(self, bot_type: BotType) -> BotJob:
+        """Çalıştırmayı arka planda başlatır; platformun devam eden bir işi varsa onu döner."""
         bot_instance = self.bots[bot_type]
-        while bot_instance.status == BotStatus.RUNNING:
-            now = datetime.now()
-            next_midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
-            bot_instance.next_run = next_midnight
-            seconds_to_wait = (next_midnight - now).total_seconds()
-            logger.info(f"[{bot_type}] Sleeping until {next_midnight} (~{int(seconds_to_wait)}s).")
-            try:
-                await asyncio.sleep(seconds_to_wait)
-            except asyncio.CancelledError:
-                logger.info(f"[{bot_type}] Daily scheduler cancelled.")
-                break
-            except Exception as e:
-                logger.error(f"[{bot_type}] Error in daily scheduler: {e}", exc_info=True)
-                break
+        if bot_instance.job is not None and bot_instance.job.active:
+            return bot_instance.job
+        job = BotJob(bot_type)
+        self.jobs[job.job_id] = job
+        finished = [job_id for job_id, old in self.jobs.items() if not old.active]
+        for job_id in finished[:max(len(self.jobs) - BOT_JOB_HISTORY, 0)]:
+            del self.jobs[job_id]
+        bot_instance.job = job
+        job.task = asyncio.create_task(self._execute_job(job))
+        logger.info(f"[{bot_type}] Job {job.job_id} started in the background.")
+        return job
 
-            if bot_instance.status == BotStatus.RUNNING:
-                await self._run_daily_job(bot_type)
+    async def _execute_job(self, job: BotJob):
+        bot_instance = self.bots[job.bot_type]
+        try:
+            succeeded = await self._run_daily_job(job.bot_type, job)
+        except asyncio.CancelledError:
+            job.status = BotJobStatus.CANCELLED
+            job.message = "Job task was cancelled."
+            raise
+        except Exception as e:
+            logger.error(f"[{job.bot_type}] Job {job.job_id} failed: {e}", exc_info=True)
+            succeeded = False
+            bot_instance.message = f"Error during daily job: {str(e)}"
+        finally:
+            job.finished_at = datetime.now()
+        if job.cancel_event.is_set():
+            job.status = BotJobStatus.CANCELLED
+            job.message = "Job was cancelled; items finished so far were saved."
+        else:
+            job.status = BotJobStatus.COMPLETED if succeeded else BotJobStatus.FAILED
+            job.message = bot_instance.message
+        logger.info(f"[{job.bot_type}] Job {job.job_id} finished with status {job.status.value}.")
 
-    async def _run_daily_job(self, bot_type: BotType):
+    def _request_cancel(self, job: BotJob):
+        if job.active:
+            job.cancel_event.set()
+            job.status = BotJobStatus.CANCELLING
+            logger.info(f"[{job.bot_type}] Cancellation requested for job {job.job_id}.")
+
+    async def _prewarm_drivers(self, bot_type: BotType):
+        try:
+            if await TrackerSessionRepository(self.db.database).load_session(bot_type.value):
+                logger.info(f"[{bot_type}] Stored session found; WebDriver pre-warm skipped.")
+                return
+            await asyncio.to_thread(get_webdriver_pool().warm_up)
+            logger.info(f"[{bot_type}] WebDriver pool pre-warmed.")
+        except Exception as e:
+            logger.warning(f"[{bot_type}] WebDriver pool pre-warm failed: {e}", exc_info=True)
+
+    async def _run_daily_job(self, bot_type: BotType, job: BotJob) -> bool:
         bot_instance = self.bots[bot_type]
-        if bot_instance.tracker is None:
-            logger.error(f"[{bot_type}] Tracker instance not found; daily job skipped.")
-            return
+        # Elle başlatılan çalıştırma ile planlı çalıştırma aynı süreçte üst üste binmez
+        lock = self._run_locks.setdefault(bot_type, asyncio.Lock())
+        if lock.locked():
+            logger.warning(f"[{bot_type}] Previous run is still in progress; run skipped.")
+            bot_instance.message = "Previous run is still in progress; run skipped."
+            return False
 
-        if not bot_instance.tracker.logged_in:
-            logger.info(f"[{bot_type}] Session appears to be expired; attempting re-login...")
+        async with lock:
+            self._ensure_tracker(bot_type, bot_instance)
+            tracker = bot_instance.tracker
             try:
-                if not await bot_instance.tracker.login():
-                    bot_instance.message = "Login failed during daily run. Will retry at next scheduled time."
-                    logger.error(f"[{bot_type}] Login failed during daily run.")
-                    return
-            except Exception as e:
-                bot_instance.message = f"Exception during re-login: {str(e)}. Will retry at next scheduled time."
-                logger.error(f"[{bot_type}] Exception during re-login: {e}", exc_info=True)
-                return
+                return await self._run_tracker_job(bot_type, bot_instance, job)
+            finally:
+                # Driver çalıştırmalar arasında tutulmaz; bir sonraki çalıştırmadan önce havuz yeniden ısıtılır.
+                # stop_bot çalışan işin driver'ına dokunmaz, iş bittiğinde burada iade edilir.
+                await asyncio.to_thread(tracker.release_driver)
+                await asyncio.to_thread(get_webdriver_pool().close_idle)
+                if bot_instance.status == BotStatus.STOPPED and bot_instance.tracker is tracker:
+                    bot_instance.tracker = None
 
+    async def _run_tracker_job(self, bot_type: BotType, bot_instance: BotInstance, job: BotJob) -> bool:
+        if not bot_instance.tracker.logged_in:
+            logger.info(f"[{bot_type}] Session appears to be expired; restoring or re-logging in...")
         try:
-            db_client = self.db.db_session
-            database = db_client["boat_tracker"]
-            book_repo = BookingDataRepository(database, "booking_data_mmk")
-            update_log_repo = UpdateLogRepository(database)
-            await bot_instance.tracker.fetch_competitor_weekly_price_quotes(book_repo=book_repo, update_log_repo=update_log_repo)
+            if not await bot_instance.tracker.ensure_session():
+                bot_instance.message = "Login failed during daily run. Will retry at next scheduled time."
+                logger.error(f"[{bot_type}] Login failed during daily run.")
+                return False
+        except Exception as e:
+            bot_instance.message = f"Exception during re-login: {str(e)}. Will retry at next scheduled time."
+            logger.error(f"[{bot_type}] Exception during re-login: {e}", exc_info=True)
+            return False
+
+        try:
+            database = self.db.database
+            job_repo = ScrapeJobRepository(database)
+            tracker = bot_instance.tracker
+            # Run kalemleri scrape_jobs'a yazılır; bu süreç de bir worker olarak katılır, worker.py ile
+            # başlatılan diğer süreçler aynı run'dan kalem kiralayarak işi paylaşır
+            run_id = job_repo.daily_run_id(bot_type.value)
+            items = await tracker.build_scrape_jobs(CompetitorRepository(database))
+            created = await job_repo.enqueue_run(bot_type.value, run_id, items)
+            logger.info(f"[{bot_type}] Run {run_id}: {len(items)} work items, {created} newly enqueued.")
+            job.run_id = run_id
+            run_progress = await job_repo.run_progress(bot_type.value, run_id)
+            job.run_finished_at_start = run_progress["done"] + run_progress["failed"] if run_progress else 0
+            # İptal isteği worker'ın yeni kalem almasını durdurur; işlenen yatlar o ana kadarki haftalarla kaydedilir
+            async with tracker.job_processor(database, job.cancel_event) as process:
+                job.worker = ScrapeJobWorker(
+                    job_repo,
+                    bot_type.value,
+                    concurrency=tracker.job_concurrency,
+                    cancel_event=job.cancel_event
+                )
+                await job.worker.run(run_id, process)
             bot_instance.last_run = datetime.now()
-            bot_instance.message = f"Daily run completed successfully at {bot_instance.last_run}."
-            logger.info(f"[{bot_type}] Daily run completed at {bot_instance.last_run}.")
+            if job.cancel_event.is_set():
+                bot_instance.message = f"Run cancelled at {bot_instance.last_run}; partial results were saved."
+                logger.info(f"[{bot_type}] Run {run_id} cancelled; partial results saved.")
+            else:
+                bot_instance.message = f"Daily run completed successfully at {bot_instance.last_run}."
+                logger.info(f"[{bot_type}] Daily run completed at {bot_instance.last_run}.")
+            return True
         except Exception as e:
             bot_instance.message = f"Error during daily job: {str(e)}. Will retry at next scheduled time."
             logger.error(f"[{bot_type}] Error during daily job: {e}", exc_info=True)
 
             try:
-                db_client = self.db.db_session
-                database = db_client["boat_tracker"]
+                database = self.db.database
                 update_log_repo = UpdateLogRepository(database)
                 await update_log_repo.create_one(update_log_repo.collection_name, {
                     "competitor": "N/A",
@@ -151,44 +305,103 @@ class BotController:
                 })
             except Exception as log_exc:
                 logger.error(f"[{bot_type}] Failed to log error to database: {log_exc}", exc_info=True)
+            return False
 
     async def stop_bot(self, bot_type: BotType) -> BotStatusResponse:
         bot_instance = self.bots[bot_type]
         try:
             if bot_instance.status == BotStatus.RUNNING:
                 bot_instance.status = BotStatus.STOPPED
-                if bot_instance.task:
-                    bot_instance.task.cancel()
-                    bot_instance.task = None
+                if self.scheduler is not None:
+                    self.scheduler.unschedule(bot_type.value)
                 bot_instance.message = "Bot was stopped manually."
                 logger.info(f"[{bot_type}] Bot stopped manually.")
-                if bot_instance.tracker and bot_instance.tracker.driver:
-                    try:
-                        bot_instance.tracker.driver.quit()
-                    except Exception as ex:
-                        logger.warning(f"[{bot_type}] Error while quitting driver: {ex}", exc_info=True)
-                bot_instance.tracker = None
+                if bot_instance.job is not None and bot_instance.job.active:
+                    # Çalışan iş driver'ı (ör. ensure_session içinde) kullanıyor olabilir; driver iş bitince
+                    # _run_daily_job tarafından iade edilir
+                    self._request_cancel(bot_instance.job)
+                    bot_instance.message = "Bot was stopped manually; the running job is being cancelled."
+                else:
+                    if bot_instance.tracker and bot_instance.tracker.driver:
+                        try:
+                            await asyncio.to_thread(bot_instance.tracker.cleanup)
+                        except Exception as ex:
+                            logger.warning(f"[{bot_type}] Error while releasing driver: {ex}", exc_info=True)
+                    bot_instance.tracker = None
             else:
                 bot_instance.message = "Bot is already stopped."
         except Exception as e:
             logger.error(f"[{bot_type}] Exception during stopping bot: {e}", exc_info=True)
             bot_instance.message = f"Error while stopping bot: {str(e)}"
-        return BotStatusResponse(
-            bot_type=bot_type,
-            status=bot_instance.status,
-            message=bot_instance.message,
-            last_run=bot_instance.last_run,
-            next_run=bot_instance.next_run,
-            bot_last_started=bot_instance.last_started,
-        )
+        return self._status_response(bot_type, bot_instance)
 
     async def get_bot_status(self, bot_type: BotType) -> BotStatusResponse:
-        bot_instance = self.bots[bot_type]
-        return BotStatusResponse(
-            bot_type=bot_type,
-            status=bot_instance.status,
-            message=bot_instance.message,
-            last_run=bot_instance.last_run,
-            next_run=bot_instance.next_run,
-            bot_last_started=bot_instance.last_started,
+        # Bu süreçte başlatılmamış platformların da (ör. sadece worker'larda çalışan) ilerlemesi raporlanır
+        bot_instance = self.bots.get(bot_type) or BotInstance()
+        progress = None
+        try:
+            run_progress = await ScrapeJobRepository(self.db.database).run_progress(bot_type.value)
+            if run_progress:
+                progress = ScrapeRunProgress(**run_progress)
+        except Exception as e:
+            logger.warning(f"[{bot_type}] Run progress could not be read: {e}", exc_info=True)
+        return self._status_response(bot_type, bot_instance, progress=progress)
+
+    def _find_job(self, job_id: str) -> Optional[BotJob]:
+        return self.jobs.get(job_id)
+
+    async def _job_response(self, job: BotJob) -> BotJobResponse:
+        """
+        Sayaçlar (yat/hafta/hata) bu süreçteki worker'a aittir; hız ve ETA, diğer worker süreçleri de
+        dahil olmak üzere run'ın iş başladığından beri biten kalem sayısından hesaplanır.
+        """
+        counters = job.worker.counters if job.worker else {}
+        run = None
+        rate_per_minute = eta_seconds = None
+        if job.run_id:
+            try:
+                run_progress = await ScrapeJobRepository(self.db.database).run_progress(
+                    job.bot_type.value, job.run_id)
+            except Exception as e:
+                logger.warning(f"[{job.bot_type}] Run progress could not be read: {e}", exc_info=True)
+                run_progress = None
+            if run_progress:
+                run = ScrapeRunProgress(**run_progress)
+                elapsed = ((job.finished_at or datetime.now()) - job.started_at).total_seconds()
+                finished = run.done + run.failed - job.run_finished_at_start
+                if elapsed > 0:
+                    rate_per_minute = finished / elapsed * 60
+                if job.active and rate_per_minute:
+                    eta_seconds = (run.pending + run.leased) / rate_per_minute * 60
+        return BotJobResponse(
+            job_id=job.job_id,
+            bot_type=job.bot_type,
+            status=job.status,
+            message=job.message,
+            run_id=job.run_id,
+            started_at=job.started_at,
+            finished_at=job.finished_at,
+            yachts_done=counters.get("done", 0),
+            yachts_partial=counters.get("partial", 0),
+            weeks_done=counters.get("weeks", 0),
+            errors=counters.get("failed", 0) + counters.get("lost", 0),
+            rate_per_minute=rate_per_minute,
+            eta_seconds=eta_seconds,
+            run=run,
         )
+
+    async def get_job(self, job_id: str) -> Optional[BotJobResponse]:
+        job = self._find_job(job_id)
+        return await self._job_response(job) if job else None
+
+    async def list_jobs(self, bot_type: Optional[BotType] = None) -> List[BotJobResponse]:
+        jobs = [job for job in self.jobs.values() if bot_type is None or job.bot_type == bot_type]
+        return [await self._job_response(job) for job in reversed(jobs)]
+
+    async def cancel_job(self, job_id: str) -> Optional[BotJobResponse]:
+        """İşi durdurur: yeni kalem alınmaz, işlenmekte olan yatlar o ana kadar çekilen haftalarla kaydedilir."""
+        job = self._find_job(job_id)
+        if job is None:
+            return None
+        self._request_cancel(job)
+        return await self._job_response(job)
@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from enum import Enum
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 
@@ -15,10 +15,54 @@ class BotType(str, Enum):
     MMK = "mmk"
 
 
+class BotJobStatus(str, Enum):
+    RUNNING = "running"
+    CANCELLING = "cancelling"
+    COMPLETED = "completed"
+    CANCELLED = "cancelled"
+    FAILED = "failed"
+
+
+class ScrapeRunProgress(BaseModel):
+    """scrape_jobs koleksiyonundaki son run'ın tüm API/worker süreçleri için toplu durumu."""
+    run_id: str
+    total: int = 0
+    pending: int = 0
+    leased: int = 0
+    done: int = 0
+    failed: int = 0
+    weeks_total: int = 0
+    weeks_done: int = 0
+    active_workers: List[str] = []
+    started_at: Optional[datetime] = None
+    last_finished_at: Optional[datetime] = None
+
+
 class BotStatusResponse(BaseModel):
     bot_type: BotType
     status: BotStatus
     message: str
     last_run: Optional[datetime] = None
     next_run: Optional[datetime] = None
+    previous_run: Optional[datetime] = None
     bot_last_started: Optional[datetime] = None
+    job_id: Optional[str] = None
+    progress: Optional[ScrapeRunProgress] = None
+
+
+class BotJobResponse(BaseModel):
+    """Arka plan işinin durumu: sayaçlar bu süreçteki worker'a, hız/ETA ve run alanı run'ın tamamına aittir."""
+    job_id: str
+    bot_type: BotType
+    status: BotJobStatus
+    message: str = ""
+    run_id: Optional[str] = None
+    started_at: datetime
+    finished_at: Optional[datetime] = None
+    yachts_done: int = 0
+    yachts_partial: int = 0
+    weeks_done: int = 0
+    errors: int = 0
+    rate_per_minute: Optional[float] = None
+    eta_seconds: Optional[float] = None
+    run: Optional[ScrapeRunProgress] = None
@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends, Request
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request
 from src.api.controllers.bot_controller import BotController
-from src.api.dto.bot_dto import BotStatusResponse, BotType
+from src.api.dto.bot_dto import BotStatusResponse, BotType, BotJobResponse
 from src.core.auth.jwt_handler import get_current_user
 import logging
 
@@ -38,3 +39,36 @@ async def get_nausys_status(
         bot_controller: BotController = Depends(get_bot_controller)
 ):
     return await bot_controller.get_bot_status(platform)
+
+
+@router.get("/bot/jobs", response_model=List[BotJobResponse])
+async def list_bot_jobs(
+        platform: Optional[BotType] = None,
+        current_user: str = Depends(get_current_user),
+        bot_controller: BotController = Depends(get_bot_controller)
+):
+    return await bot_controller.list_jobs(platform)
+
+
+@router.get("/bot/jobs/{job_id}", response_model=BotJobResponse)
+async def get_bot_job(
+        job_id: str,
+        current_user: str = Depends(get_current_user),
+        bot_controller: BotController = Depends(get_bot_controller)
+):
+    job = await bot_controller.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="İş bulunamadı.")
+    return job
+
+
+@router.post("/bot/jobs/{job_id}/cancel", response_model=BotJobResponse)
+async def cancel_bot_job(
+        job_id: str,
+        current_user: str = Depends(get_current_user),
+        bot_controller: BotController = Depends(get_bot_controller)
+):
+    job = await bot_controller.cancel_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="İş bulunamadı.")
+    return job
@@ -3,32 +3,24 @@ from pydantic import BaseModel
 import logging
 from typing import Dict, Optional, List
 
-from src.infra.adapter.competitor_repository import CompetitorRepository
-from src.infra.config.init_database import init_database
+from src.infra.adapter.competitor_repository import CompetitorRepository, PLATFORMS
 from src.core.auth.jwt_handler import get_current_user
 from src.api.controllers.bot_controller import BotController
-from src.infra.config.config import COMPETITORS_MMK, COMPETITORS_NAUSY
 from src.api.dto.bot_dto import BotStatus, BotType
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
-def get_competitor_config(platform: str) -> Dict:
-    platform = platform.lower()
-    if platform == "mmk":
-        return COMPETITORS_MMK
-    elif platform == "nausys":
-        return COMPETITORS_NAUSY
-    else:
-        raise HTTPException(status_code=400, detail="Geçersiz platform adı: mmk ya da nausys olmalı.")
+def get_competitor_repo(request: Request) -> CompetitorRepository:
+    return CompetitorRepository(request.app.state.db.database)
 
 
-def get_competitor_repo() -> CompetitorRepository:
-    db_conf = init_database()
-    db_client = db_conf.db_session
-    database = db_client["boat_tracker"]
-    return CompetitorRepository(database)
+async def get_competitor_config(platform: str, comp_repo: CompetitorRepository) -> Dict:
+    platform = platform.lower()
+    if platform not in PLATFORMS:
+        raise HTTPException(status_code=400, detail="Geçersiz platform adı: mmk ya da nausys olmalı.")
+    return await comp_repo.get_platform_competitors(platform)
 
 
 def get_bot_controller(request: Request) -> BotController:
@@ -49,8 +41,8 @@ async def create_or_update_competitor(
         bot_controller: BotController = Depends(get_bot_controller),
 ):
     logger.info(f"[create_or_update_competitor] Rakip ekleme/güncelleme tetiklendi: {req}")
-    bot_instance = bot_controller.bots[BotType.NAUSYS]
-    if bot_instance.status != BotStatus.RUNNING:
+    bot_instance = bot_controller.bots.get(BotType.NAUSYS)
+    if not bot_instance or bot_instance.status != BotStatus.RUNNING:
         raise HTTPException(
             status_code=400,
             detail="Nausys bot şu anda çalışmıyor. Lütfen önce /start endpoint'i ile başlatın."
@@ -63,14 +55,11 @@ async def create_or_update_competitor(
             detail="Bot tracker nesnesi bulunamadı. Muhtemelen bot tam başlatılamadı."
         )
 
-    if not bot.logged_in:
-        logger.info("Oturum düşmüş olabilir, tekrar login deneniyor...")
-        success = bot.login()
-        if not success:
-            raise HTTPException(
-                status_code=500,
-                detail="Nausys bot yeniden login olamadı!"
-            )
+    if not await bot.ensure_session():
+        raise HTTPException(
+            status_code=500,
+            detail="Nausys bot yeniden login olamadı!"
+        )
 
     try:
         yacht_ids: Dict[str, str] = await bot.scrape_yacht_ids_and_save(
@@ -87,7 +76,8 @@ async def create_or_update_competitor(
             competitor_name=req.competitor_name,
             yacht_ids=yacht_ids,
             search_text=req.search_text,
-            click_text=req.click_text
+            click_text=req.click_text,
+            platform="nausys"
         )
     except Exception as e:
         logger.error(f"upsert_competitor_info hata: {e}", exc_info=True)
@@ -106,9 +96,10 @@ async def get_competitor_yacht_names(
     competitor_name: Optional[str] = Query(
         None, description="Rakip ismi (opsiyonel). Örn 'sailamor'"
     ),
-    current_user: str = Depends(get_current_user)
+    current_user: str = Depends(get_current_user),
+    comp_repo: CompetitorRepository = Depends(get_competitor_repo),
 ):
-    competitors_config = get_competitor_config(platform)
+    competitors_config = await get_competitor_config(platform, comp_repo)
     if competitor_name:
         competitor_doc = competitors_config.get(competitor_name)
         if not competitor_doc:
@@ -134,9 +125,10 @@ async def get_competitor_details(
     competitor_name: Optional[str] = Query(
         None, description="Rakip ismi (opsiyonel)."
     ),
-    current_user: str = Depends(get_current_user)
+    current_user: str = Depends(get_current_user),
+    comp_repo: CompetitorRepository = Depends(get_competitor_repo),
 ):
-    competitors_config = get_competitor_config(platform)
+    competitors_config = await get_competitor_config(platform, comp_repo)
     if competitor_name:
         competitor_doc = competitors_config.get(competitor_name)
         if not competitor_doc:
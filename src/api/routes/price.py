@@ -1,23 +1,26 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
-from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Dict, List, Optional
+from datetime import date, datetime
+import json
 import logging
 
 from src.core.auth.jwt_handler import get_current_user
-from src.infra.config.init_database import init_database
-from src.infra.adapter.booking_data_repository import BookingDataRepository
+from src.core.utils.export import EXPORT_FORMATS, stream_export
+from src.infra.adapter.booking_data_repository import BookingDataRepository, get_price_query_cache
+from src.infra.adapter.competitor_repository import CompetitorRepository
+from src.infra.config.settings import EXPORT_BATCH_SIZE
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
-def get_booking_data_repo_by_platform(platform: str) -> BookingDataRepository:
+def get_booking_data_repo_by_platform(platform: str, request: Request) -> BookingDataRepository:
     platform = platform.lower()
     if platform not in ["mmk", "nausys"]:
         raise HTTPException(status_code=400, detail="Platform geçersiz. 'mmk' veya 'nausys' olmalı.")
 
-    db_conf = init_database()
-    db_client = db_conf.db_session
-    database = db_client["boat_tracker"]
+    database = request.app.state.db.database
     db_name = f"booking_data_{platform}"
     book_repo = BookingDataRepository(database, db_name)
     return book_repo
@@ -33,8 +36,63 @@ def parse_price(price_str: Optional[str]) -> float:
         return 0.0
 
 
+def read_amount(details: dict, field: str) -> float:
+    """Kayıt sırasında hesaplanan '<alan>_cents' değerini kullanır; henüz backfill edilmemiş dokümanlarda metni parse eder."""
+    cents = details.get(f"{field}_cents")
+    if cents is not None:
+        return cents / 100
+    return parse_price(details.get(field))
+
+
+def build_comparison_row(pf, pt, comp_det: Optional[dict], sail_det: Optional[dict]) -> dict:
+    comp_det = comp_det or {}
+    sail_det = sail_det or {}
+
+    # Rakip
+    rakip_konum = comp_det.get("port_from", "")
+    discount_type = comp_det.get("discount_name", "")
+    discount_percentage = comp_det.get("discount_percent", "")
+    commission_percentage = comp_det.get("commission_percent", "")
+
+    rakip_fiyat = read_amount(comp_det, "total_price")
+    rakip_list_price = read_amount(comp_det, "list_price")
+    commission = read_amount(comp_det, "commission")
+
+    # Biz (Sailamor)
+    bizim_konum = sail_det.get("port_from", "")
+    bizim_fiyat = read_amount(sail_det, "total_price")
+
+    # Fark = Bizim Fiyat - Rakip Fiyat (mutlak değer)
+    diff = bizim_fiyat - rakip_fiyat
+    fark = abs(diff)
+
+    if diff < 0:
+        durum = 0
+    elif diff > 0:
+        durum = 1
+    else:
+        durum = 2
+
+    tarih_str = f"{pf} - {pt}"
+    return {
+        "tarih": tarih_str,
+        "bizim_konum": bizim_konum,
+        "rakip_konum": rakip_konum,
+        "bizim_fiyat": bizim_fiyat,
+        "rakip_fiyat": rakip_fiyat,
+        "rakip_list_price": rakip_list_price,
+        "discount_type": discount_type,
+        "discount_percentage": discount_percentage,
+        "commission_percentage": commission_percentage,
+        "commission": commission,
+        "fark": fark,
+        "durum": durum
+    }
+
+
 @router.get("/prices/compare")
 async def compare_prices(
+    request: Request,
     platform: str = Query(..., description="Platform ismi ('mmk' ya da 'nausys')"),
     date_str: Optional[str] = Query(None, description="Günün tarihi (opsiyonel)"),
     competitor_name: str = Query(..., description="Rakip firma etiketi. Örn: 'rudder'"),
@@ -43,108 +101,189 @@ async def compare_prices(
     current_user: str = Depends(get_current_user),
 ):
 
-    booking_repo = get_booking_data_repo_by_platform(platform)
+    booking_repo = get_booking_data_repo_by_platform(platform, request)
     logger.info(
         "[compare_prices] => competitor=%s, yacht_id=%s, yacht_id_sailamor=%s",
         competitor_name, yacht_id, yacht_id_sailamor
     )
 
-    doc_competitor = await booking_repo.find_booking_doc(
-        competitor=competitor_name,
-        yacht_id=yacht_id
+    # Anahtar, iki tarafın son güncelleme zamanını da içerir; başka bir süreç yazsa bile eski sonuç dönmez
+    cache = get_price_query_cache()
+    cache_key = (
+        booking_repo.platform, "compare", competitor_name, yacht_id, yacht_id_sailamor,
+        await booking_repo.latest_update_date(competitor_name, yacht_id),
+        await booking_repo.latest_update_date("sailamor", yacht_id_sailamor),
+    )
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    rows = await booking_repo.compare_latest(competitor_name, yacht_id, yacht_id_sailamor)
+    if not rows:
+        logger.warning(
+            f"Karşılaştırılacak doc bulunamadı => competitor={competitor_name}, yacht_id={yacht_id}, "
+            f"yacht_id_sailamor={yacht_id_sailamor}"
+        )
+
+    result = [
+        build_comparison_row(row["period_from"], row["period_to"], row.get("competitor"), row.get("sailamor"))
+        for row in rows
+    ]
+    cache.set(cache_key, result)
+    return result
+
+
+async def yacht_names_by_id(request: Request, platform: str) -> Dict[tuple, str]:
+    competitors = await CompetitorRepository(request.app.state.db.database).get_platform_competitors(platform)
+    return {
+        (comp_name, yacht_id): yacht_name
+        for comp_name, comp_data in competitors.items()
+        for yacht_name, yacht_id in comp_data.get("yacht_ids", {}).items()
+    }
+
+
+def periods_by_key(doc: dict) -> Dict[tuple, dict]:
+    return {(p["period_from"], p["period_to"]): p.get("detail") for p in doc.get("booking_periods") or []}
+
+
+async def iter_all_comparisons(
+        booking_repo: BookingDataRepository,
+        names: Dict[tuple, str],
+        competitor_name: Optional[str],
+        yacht_id_sailamor: Optional[str]
+) -> AsyncIterator[str]:
+
+    # Sailamor tarafı bir kez yüklenir; rakip dokümanları cursor üzerinden tek tek işlenir
+    sailamor_yachts = []
+    async for doc in booking_repo.iter_latest_comparison_docs(competitor="sailamor"):
+        if yacht_id_sailamor and doc["yacht_id"] != yacht_id_sailamor:
+            continue
+        sailamor_yachts.append((doc["yacht_id"], periods_by_key(doc)))
+
+    if competitor_name:
+        competitor_docs = booking_repo.iter_latest_comparison_docs(competitor=competitor_name)
+    else:
+        competitor_docs = booking_repo.iter_latest_comparison_docs(exclude_competitor="sailamor")
+
+    async for comp_doc in competitor_docs:
+        comp_periods = periods_by_key(comp_doc)
+        for sail_yacht_id, sail_periods in sailamor_yachts:
+            for pf, pt in sorted(set(comp_periods) | set(sail_periods)):
+                row = {
+                    "competitor": comp_doc["competitor"],
+                    "yacht_id": comp_doc["yacht_id"],
+                    "yacht_name": names.get((comp_doc["competitor"], comp_doc["yacht_id"]), ""),
+                    "yacht_id_sailamor": sail_yacht_id,
+                    "yacht_name_sailamor": names.get(("sailamor", sail_yacht_id), ""),
+                    **build_comparison_row(pf, pt, comp_periods.get((pf, pt)), sail_periods.get((pf, pt))),
+                }
+                yield json.dumps(row, ensure_ascii=False, default=str) + "\n"
+
+
+@router.get("/prices/compare/all")
+async def compare_all_prices(
+    request: Request,
+    platform: str = Query(..., description="Platform ismi ('mmk' ya da 'nausys')"),
+    competitor_name: Optional[str] = Query(None, description="Sadece bu rakip (opsiyonel)"),
+    yacht_id_sailamor: Optional[str] = Query(None, description="Sadece bu Sailamor teknesi (opsiyonel)"),
+    current_user: str = Depends(get_current_user),
+):
+    """Tüm rakip / Sailamor yat çiftlerinin karşılaştırmasını üretildikçe NDJSON olarak akıtır."""
+    booking_repo = get_booking_data_repo_by_platform(platform, request)
+    logger.info(
+        "[compare_all_prices] => platform=%s, competitor=%s, yacht_id_sailamor=%s",
+        booking_repo.platform, competitor_name, yacht_id_sailamor
+    )
+    return StreamingResponse(
+        iter_all_comparisons(
+            booking_repo,
+            await yacht_names_by_id(request, booking_repo.platform),
+            competitor_name,
+            yacht_id_sailamor
+        ),
+        media_type="application/x-ndjson"
+    )
+
+
+@router.get("/prices/history")
+async def get_price_history(
+    request: Request,
+    platform: str = Query(..., description="Platform ismi ('mmk' ya da 'nausys')"),
+    competitor_name: str = Query(..., description="Rakip firma etiketi. Örn: 'rudder'"),
+    yacht_id: str = Query(..., description="Teknenin ID'si"),
+    start_date: date = Query(..., description="Başlangıç tarihi (çekim tarihi)"),
+    end_date: date = Query(..., description="Bitiş tarihi (çekim tarihi)"),
+    period_from: Optional[str] = Query(None, description="Sadece bu haftanın serisi. Örn: '2025-06-07 00:00:00'"),
+    mode: str = Query("range", description="'range' (hafta bazında özet) ya da 'window' (hareketli ortalama)"),
+    window_days: int = Query(7, ge=1, le=90, description="'window' modunda hareketli ortalama penceresi (gün)"),
+    current_user: str = Depends(get_current_user),
+):
+    booking_repo = get_booking_data_repo_by_platform(platform, request)
+    start = datetime(start_date.year, start_date.month, start_date.day, 0, 0, 0)
+    end = datetime(end_date.year, end_date.month, end_date.day, 23, 59, 59)
+
+    if mode not in ("range", "window"):
+        raise HTTPException(status_code=400, detail="Mode geçersiz. 'range' veya 'window' olmalı.")
+
+    cache = get_price_query_cache()
+    cache_key = (
+        booking_repo.platform, "history", mode, competitor_name, yacht_id, start, end, period_from,
+        window_days if mode == "window" else None,
+        await booking_repo.latest_update_date(competitor_name, yacht_id),
     )
-    if not doc_competitor:
-        logger.warning(f"Rakip doc bulunamadı => competitor={competitor_name}, yacht_id={yacht_id}")
-        doc_competitor = {}
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached
 
-    doc_sailamor = await booking_repo.find_booking_doc(
-        competitor="sailamor",
-        yacht_id=yacht_id_sailamor
+    if mode == "range":
+        result = await booking_repo.price_points.get_price_range(
+            booking_repo.platform, competitor_name, yacht_id, start, end, period_from
+        )
+    else:
+        result = await booking_repo.price_points.get_price_window(
+            booking_repo.platform, competitor_name, yacht_id, start, end, window_days, period_from
+        )
+    cache.set(cache_key, result)
+    return result
+
+
+async def iter_named_export_rows(rows: AsyncIterator[dict], names: Dict[tuple, str]) -> AsyncIterator[dict]:
+    async for row in rows:
+        row["yacht_name"] = names.get((row["competitor"], row["yacht_id"]), "")
+        yield row
+
+
+@router.get("/prices/export")
+async def export_price_history(
+    request: Request,
+    platform: str = Query(..., description="Platform ismi ('mmk' ya da 'nausys')"),
+    start_date: date = Query(..., description="Başlangıç tarihi (çekim tarihi)"),
+    end_date: date = Query(..., description="Bitiş tarihi (çekim tarihi)"),
+    competitors: Optional[List[str]] = Query(None, description="Rakip etiketleri (tekrarlanabilir). Boşsa hepsi"),
+    yacht_ids: Optional[List[str]] = Query(None, description="Tekne ID'leri (tekrarlanabilir). Boşsa hepsi"),
+    export_format: str = Query("csv", alias="format", description="'csv', 'parquet' ya da 'arrow'"),
+    current_user: str = Depends(get_current_user),
+):
+    """Fiyat noktalarını düz satırlar halinde, Mongo cursor'ından batch batch okuyarak akıtır."""
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="Format geçersiz. 'csv', 'parquet' veya 'arrow' olmalı.")
+
+    booking_repo = get_booking_data_repo_by_platform(platform, request)
+    start = datetime(start_date.year, start_date.month, start_date.day, 0, 0, 0)
+    end = datetime(end_date.year, end_date.month, end_date.day, 23, 59, 59)
+    logger.info(
+        "[export_price_history] => platform=%s, format=%s, competitors=%s, yacht_ids=%s, %s - %s",
+        booking_repo.platform, export_format, competitors, yacht_ids, start_date, end_date
+    )
+
+    rows = iter_named_export_rows(
+        booking_repo.price_points.iter_export_rows(booking_repo.platform, start, end, competitors, yacht_ids),
+        await yacht_names_by_id(request, booking_repo.platform)
+    )
+    media_type, extension = EXPORT_FORMATS[export_format]
+    filename = f"prices_{booking_repo.platform}_{start_date:%Y%m%d}_{end_date:%Y%m%d}.{extension}"
+    return StreamingResponse(
+        stream_export(rows, export_format, EXPORT_BATCH_SIZE),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
     )
-    if not doc_sailamor:
-        logger.warning(f"Sailamor doc bulunamadı => competitor=sailamor, yacht_id={yacht_id_sailamor}")
-        doc_sailamor = {}
-
-    competitor_periods = doc_competitor.get("booking_periods", [])
-    sailamor_periods = doc_sailamor.get("booking_periods", [])
-
-    competitor_map = {}
-    for c_period in competitor_periods:
-        pf = c_period.get("period_from")
-        pt = c_period.get("period_to")
-        details_list = c_period.get("details", [])
-        competitor_map[(pf, pt)] = details_list[0] if details_list else None
-
-    sailamor_map = {}
-    for s_period in sailamor_periods:
-        pf = s_period.get("period_from")
-        pt = s_period.get("period_to")
-        details_list = s_period.get("details", [])
-        sailamor_map[(pf, pt)] = details_list[0] if details_list else None
-
-    all_keys = set(list(competitor_map.keys()) + list(sailamor_map.keys()))
-    comparison_list = []
-    for (pf, pt) in sorted(all_keys):
-        competitor_details = competitor_map.get((pf, pt)) or {}
-        sailamor_details   = sailamor_map.get((pf, pt))   or {}
-
-        comparison_list.append({
-            "period_from": pf,
-            "period_to": pt,
-            "competitor_details": competitor_details,
-            "sailamor_details": sailamor_details
-        })
-
-    result_table = []
-    for row in comparison_list:
-        pf = row["period_from"]
-        pt = row["period_to"]
-        comp_det = row["competitor_details"]
-        sail_det = row["sailamor_details"]
-
-        # Rakip
-        rakip_konum = comp_det.get("port_from", "")
-        rakip_fiyat_str = comp_det.get("total_price", "0")
-        rakip_list_price_str = comp_det.get("list_price", "0")
-        discount_type = comp_det.get("discount_name", "")
-        discount_percentage = comp_det.get("discount_percent", "")
-        commission_percentage = comp_det.get("commission_percent", "")
-        commission_str = comp_det.get("commission", "0")
-
-        rakip_fiyat = parse_price(rakip_fiyat_str)
-        rakip_list_price = parse_price(rakip_list_price_str)
-        commission = parse_price(commission_str)
-
-        # Biz (Sailamor)
-        bizim_konum = sail_det.get("port_from", "")
-        bizim_fiyat_str = sail_det.get("total_price", "0")
-        bizim_fiyat = parse_price(bizim_fiyat_str)
-
-        # Fark = Bizim Fiyat - Rakip Fiyat (mutlak değer)
-        diff = bizim_fiyat - rakip_fiyat
-        fark = abs(diff)
-
-        if diff < 0:
-            durum = 0
-        elif diff > 0:
-            durum = 1
-        else:
-            durum = 2
-
-        tarih_str = f"{pf} - {pt}"
-        result_table.append({
-            "tarih": tarih_str,
-            "bizim_konum": bizim_konum,
-            "rakip_konum": rakip_konum,
-            "bizim_fiyat": bizim_fiyat,
-            "rakip_fiyat": rakip_fiyat,
-            "rakip_list_price": rakip_list_price,
-            "discount_type": discount_type,
-            "discount_percentage": discount_percentage,
-            "commission_percentage": commission_percentage,
-            "commission": commission,
-            "fark": fark,
-            "durum": durum
-        })
-
-    return result_table
@@ -0,0 +1,47 @@
+import asyncio
+from fastapi import APIRouter, Depends, Request
+from src.core.auth.jwt_handler import get_current_user
+from src.core.tracker.parse_pool import get_parse_pool
+from src.core.tracker.webdriver_pool import get_webdriver_pool
+from src.core.utils.cache import get_cache_stats
+from src.core.utils.rate_limiter import get_rate_limiter_stats
+import logging
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+@router.get("/system/db-pool")
+async def get_db_pool_stats(
+        request: Request,
+        current_user: str = Depends(get_current_user)
+):
+    return request.app.state.db.pool_stats()
+
+
+@router.get("/system/rate-limiters")
+async def get_rate_limiters(
+        current_user: str = Depends(get_current_user)
+):
+    return get_rate_limiter_stats()
+
+
+@router.get("/system/caches")
+async def get_caches(
+        current_user: str = Depends(get_current_user)
+):
+    return get_cache_stats()
+
+
+@router.get("/system/webdrivers")
+async def get_webdrivers(
+        current_user: str = Depends(get_current_user)
+):
+    return await asyncio.to_thread(get_webdriver_pool().stats)
+
+
+@router.get("/system/parse-pool")
+async def get_parse_pool_stats(
+        current_user: str = Depends(get_current_user)
+):
+    return get_parse_pool().stats()
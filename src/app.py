@@ -1,14 +1,17 @@
+import asyncio
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
-from src.api.routes import auth, bot, price, competitor
-from src.infra.config.settings import MONGO_IP, MONGO_PORT, MONGO_DB, MONGO_USERNAME, MONGO_PASSWORD
-from src.infra.config.database import config
+from src.api.routes import auth, bot, price, competitor, system
 from src.infra.config.init_database import init_database
+from src.infra.config.init_indexes import init_indexes
+from src.infra.config.init_competitors import init_competitors
+from src.infra.config.init_price_history import init_price_history
 from src.api.controllers.bot_controller import BotController
+from src.core.tracker.parse_pool import get_parse_pool
+from src.core.tracker.webdriver_pool import get_webdriver_pool
 from fastapi.middleware.cors import CORSMiddleware
 from src.origins import get_origins
 import logging
-from urllib.parse import quote_plus
 
 # Configure logging
 logging.basicConfig(
@@ -25,9 +28,15 @@ async def lifespan(app: FastAPI):
     # Startup
     try:
         db = init_database()
+        await db.warm_up()
+        await init_competitors(db.database)
+        await init_indexes(db.database)
+        await init_price_history(db.database)
         app.state.db = db
         app.state.bot_controller = BotController(db)
-        logger.info("Connected to MongoDB")
+        app.state.bot_controller.start_scheduler()
+        await asyncio.to_thread(get_parse_pool().warm_up)
+        logger.info(f"Connected to MongoDB (pool: {db.pool_stats()})")
     except Exception as e:
         logger.error(f"Failed to connect to MongoDB: {str(e)}")
         raise e
@@ -36,8 +45,19 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     try:
-        if hasattr(app.state.db, "close"):
-            app.state.db.close()
+        app.state.bot_controller.shutdown_scheduler()
+    except Exception as e:
+        logger.error(f"Error shutting down scheduler: {str(e)}")
+    try:
+        await asyncio.to_thread(get_parse_pool().close)
+    except Exception as e:
+        logger.error(f"Error closing parse pool: {str(e)}")
+    try:
+        await asyncio.to_thread(get_webdriver_pool().close)
+    except Exception as e:
+        logger.error(f"Error closing WebDriver pool: {str(e)}")
+    try:
+        app.state.db.close()
         logger.info("Closed MongoDB connection")
     except Exception as e:
         logger.error(f"Error closing MongoDB connection: {str(e)}")
@@ -54,17 +74,6 @@ def create_app():
         redoc_url="/redoc"
     )
 
-    # Configure your database
-    if MONGO_USERNAME and MONGO_PASSWORD:
-        username = quote_plus(MONGO_USERNAME)
-        password = quote_plus(MONGO_PASSWORD)
-        database_url = f"mongodb://{username}:{password}@{MONGO_IP}:{MONGO_PORT}/{MONGO_DB}"
-    else:
-        database_url = f"mongodb://{MONGO_IP}:{MONGO_PORT}/{MONGO_DB}"
-    
-    config.database_url = database_url
-    config.db_session
-
     app.add_middleware(CORSMiddleware, allow_origins=get_origins(), allow_credentials=True, allow_methods=["*"], allow_headers=["*"])
 
     # Include routers with prefix
@@ -72,5 +81,6 @@ def create_app():
     app.include_router(bot.router, prefix=PREFIX, tags=['Bot Control'])
     app.include_router(price.router, prefix=PREFIX, tags=['Price'])
     app.include_router(competitor.router, prefix=PREFIX, tags=['Competitor'])
+    app.include_router(system.router, prefix=PREFIX, tags=['System'])
 
     return app
@@ -1,12 +1,11 @@
 from abc import ABC, abstractmethod
 import logging
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
 
+from src.core.tracker.webdriver_pool import get_webdriver_pool
+
 class BaseTracker(ABC):
     def __init__(self):
         self.driver = None
@@ -15,20 +14,18 @@ class BaseTracker(ABC):
         self.logged_in = False
 
     def setup_driver(self):
-        """Ortak driver kurulum fonksiyonu"""
-        self.logger.info("Driver kurulumu başlıyor...")
-        options = webdriver.ChromeOptions()
-        # Docker için gerekli argümanlar
-        options.add_argument('--headless')
-        options.add_argument('--no-sandbox')
-        options.add_argument('--disable-dev-shm-usage')
-        options.add_argument('--disable-gpu')
-        options.add_argument('--window-size=1920,1080')
+        """Paylaşılan havuzdan headless bir driver kiralar."""
+        if self.driver is None:
+            self.driver = get_webdriver_pool().acquire()
+            self.logged_in = False
+            self.logger.info(f"Driver havuzdan alındı (#{self.driver.instance_id}).")
 
-        service = Service(ChromeDriverManager().install())
-        self.driver = webdriver.Chrome(service=service, options=options)
-        self.driver.implicitly_wait(10)
-        self.logger.info("Driver başarıyla kuruldu.")
+    def release_driver(self):
+        """Driver'ı havuza iade eder; oturum driver'a bağlı olduğundan sonraki kullanımda yeniden login gerekir."""
+        if self.driver is not None:
+            get_webdriver_pool().release(self.driver)
+            self.driver = None
+            self.logged_in = False
 
     @abstractmethod
     def login(self):
@@ -61,7 +58,4 @@ class BaseTracker(ABC):
 
     def cleanup(self):
         """Ortak temizleme fonksiyonu"""
-        if self.driver:
-            self.driver.quit()
-            self.driver = None
-            self.logged_in = False
+        self.release_driver()
@@ -0,0 +1,187 @@
+import logging
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from lxml import etree, html
+
+logger = logging.getLogger(__name__)
+
+PRICE_LABEL = "Price:"
+COMMISSION_LABEL = "Commission"
+
+_LABEL_TEXTS = etree.XPath(f"//text()[contains(., '{PRICE_LABEL}') or contains(., '{COMMISSION_LABEL}')]")
+_DESCENDANT_TEXTS = etree.XPath("descendant-or-self::text()")
+_NUMBER_INPUT = etree.XPath(".//input[@type='number']")
+
+_LEADING_DIGIT = re.compile(r'^\d')
+_DISCOUNTED_PRICE = re.compile(r'([\d,\.]+)\s*€\s*\(\s*([\d,\.]+)\s*€\s*-\s*([\d,\.]+)%\)')
+_COMMISSION_PERCENT = re.compile(r"Commission\s+([\d,\.]+%)")
+
+
+def _string_owners(text) -> List[Any]:
+    """
+    Metin düğümünü tek içerik olarak taşıyan elementleri dıştan içe doğru döner
+    (BeautifulSoup'taki tag.string eşleşmesiyle aynı anlam: sadece tek bir metin çocuğu olan elementler).
+    """
+    if not text.is_text:
+        return []
+    element = text.getparent()
+    if len(element):
+        return []
+    owners = [element]
+    parent = element.getparent()
+    while parent is not None and not parent.text and len(parent) == 1 and not element.tail:
+        owners.append(parent)
+        element, parent = parent, parent.getparent()
+    owners.reverse()
+    return owners
+
+
+def _get_text(element) -> str:
+    return "".join(part.strip() for part in _DESCENDANT_TEXTS(element))
+
+
+def _next_div(element):
+    return next(element.itersiblings("div"), None)
+
+
+def _is_inside(element, scope) -> bool:
+    return any(ancestor is scope for ancestor in element.iterancestors())
+
+
+class QuoteDocument:
+    """
+    addToQueue cevabının tek seferde parse edilmiş hali. 'Price:' ve 'Commission' etiketi taşıyan
+    div'ler tek bir XPath taramasıyla belge sırasına göre toplanır; kuyruk girdileri bu listelerden okunur.
+    """
+
+    def __init__(self, html_text: str):
+        self.root = html.document_fromstring(html_text)
+        self.price_labels: List[Tuple[Any, str]] = []
+        self.commission_labels: List[Tuple[Any, str]] = []
+        for text in _LABEL_TEXTS(self.root):
+            for owner in _string_owners(text):
+                if owner.tag != "div":
+                    continue
+                if PRICE_LABEL in text:
+                    self.price_labels.append((owner, text))
+                if COMMISSION_LABEL in text:
+                    self.commission_labels.append((owner, text))
+
+    def entry_scopes(self) -> List[Any]:
+        """Tüm 'Price:' etiketlerinin ortak atasının, etiket içeren çocuklarını kuyruk girdileri olarak döner."""
+        if not self.price_labels:
+            return []
+        # lxml proxy nesneleri referans tutulmadığında yeniden oluşturulduğundan karşılaştırmalar
+        # id() yerine canlı tutulan listeler üzerinden yapılır
+        common = list(self.price_labels[0][0].iterancestors())
+        for price_label, _ in self.price_labels[1:]:
+            ancestors = list(price_label.iterancestors())
+            common = [parent for parent in common if any(parent is ancestor for ancestor in ancestors)]
+        if not common:
+            return []
+        root = common[0]
+        containing = []
+        for price_label, _ in self.price_labels:
+            for ancestor in price_label.iterancestors():
+                if ancestor.getparent() is root:
+                    containing.append(ancestor)
+                    break
+        return [child for child in root.iterchildren(tag=etree.Element) if any(child is c for c in containing)]
+
+    def parse_scope(self, scope, label: str) -> Optional[Dict[str, Any]]:
+        """scope verilmezse bütün belge, verilirse sadece o elementin altındaki etiketler kullanılır."""
+        price_labels = self.price_labels
+        commission_labels = self.commission_labels
+        if scope is not None:
+            price_labels = [item for item in price_labels if _is_inside(item[0], scope)]
+            commission_labels = [item for item in commission_labels if _is_inside(item[0], scope)]
+
+        price_text = None
+        for price_label, _ in price_labels:
+            sibling = _next_div(price_label)
+            if sibling is not None:
+                text = _get_text(sibling)
+                if _LEADING_DIGIT.search(text) and "NaN" not in text:
+                    price_text = text
+                    break
+
+        if not price_text:
+            logger.warning(f"{label} için Price bilgisi alınamadı.")
+            return None
+
+        if "(" in price_text:
+            m = _DISCOUNTED_PRICE.search(price_text)
+            if not m:
+                logger.warning(f"{label} için Price metni parse edilemedi: {price_text}")
+                return None
+            try:
+                total_price_val = float(m.group(1).replace(",", ""))
+                list_price_val = float(m.group(2).replace(",", ""))
+            except Exception as e:
+                logger.error(f"Fiyat dönüşüm hatası: {e}")
+                return None
+            discount_percent_str = m.group(3) + "%"
+            discount_amount_val = list_price_val - total_price_val
+        else:
+            price_clean = price_text.replace("€", "").strip()
+            try:
+                total_price_val = float(price_clean.replace(",", ""))
+            except Exception as e:
+                logger.error(f"Fiyat dönüşüm hatası: {e}")
+                return None
+            list_price_val = total_price_val
+            discount_percent_str = "0%"
+            discount_amount_val = 0.0
+
+        commission_percentage = None
+        commission_amount_val = None
+        if commission_labels:
+            commission_div, commission_text = commission_labels[0]
+            match_comm = _COMMISSION_PERCENT.search(commission_text.strip())
+            if match_comm:
+                commission_percentage = match_comm.group(1)
+            sibling_div = _next_div(commission_div)
+            if sibling_div is not None:
+                inputs = _NUMBER_INPUT(sibling_div)
+                if inputs and inputs[0].get("value") is not None:
+                    try:
+                        commission_amount_val = float(inputs[0].get("value").replace(",", ""))
+                    except Exception as e:
+                        logger.error(f"Commission dönüşüm hatası: {e}")
+        else:
+            logger.warning(f"{label} için Commission bilgisi bulunamadı.")
+
+        return {
+            "total_price_val": total_price_val,
+            "list_price_val": list_price_val,
+            "discount_percent_str": discount_percent_str,
+            "discount_amount_val": discount_amount_val,
+            "commission_percentage": commission_percentage,
+            "commission_amount_val": commission_amount_val,
+        }
+
+
+def parse_price_quote(html_text: str, label: str) -> Optional[Dict[str, Any]]:
+    """Tek girdili addToQueue cevabından fiyat, indirim ve komisyon bilgilerini çıkarır."""
+    if not html_text or not html_text.strip():
+        logger.warning(f"{label} için boş cevap alındı.")
+        return None
+    return QuoteDocument(html_text).parse_scope(None, label)
+
+
+def parse_price_quote_queue(html_text: str, expected_entries: int, label: str) -> Optional[List[Optional[Dict[str, Any]]]]:
+    """
+    Kuyruk cevabındaki her girdiyi sırasıyla parse eder. Girdi sayısı beklenenle eşleşmezse
+    (eşleştirme güvenilir olmadığından) None döner.
+    """
+    if not html_text or not html_text.strip():
+        logger.warning(f"{label} için boş kuyruk cevabı alındı.")
+        return None
+    document = QuoteDocument(html_text)
+    scopes = [None] if expected_entries == 1 else document.entry_scopes()
+    if len(scopes) != expected_entries:
+        logger.warning(
+            f"{label} için kuyruk cevabında {len(scopes)} girdi bulundu, {expected_entries} bekleniyordu.")
+        return None
+    return [document.parse_scope(scope, label) for scope in scopes]
@@ -1,32 +1,81 @@
-import re
 import json
 import logging
 import time
 import datetime
-import requests
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
-from webdriver_manager.chrome import ChromeDriverManager
 import asyncio
-
-from src.infra.config.config import COMPETITORS_MMK as COMPETITORS
-from src.infra.config.settings import MMK_USERNAME, MMK_PASSWORD
+import httpx
+from collections import defaultdict
+from contextlib import asynccontextmanager
+
+from src.infra.config.settings import (
+    MMK_USERNAME,
+    MMK_PASSWORD,
+    MMK_MAX_CONCURRENCY,
+    MMK_QUEUE_BATCH_SIZE,
+    MMK_REQUEST_INTERVAL_SECONDS,
+    MMK_MIN_REQUEST_INTERVAL_SECONDS,
+    MMK_MAX_REQUEST_INTERVAL_SECONDS,
+    MMK_THROTTLE_COOLDOWN_SECONDS,
+    TRACKER_SESSION_TTL_SECONDS,
+    TRACKER_SESSION_KEEPALIVE_SECONDS,
+)
+from src.core.tracker.parse_pool import get_parse_pool
+from src.core.tracker.scrape_planner import ScrapePlanner, period_departure, period_key
+from src.core.tracker.session_keepalive import session_keepalive
+from src.core.tracker.webdriver_pool import get_webdriver_pool
+from src.core.utils.http_client import create_async_client
+from src.core.utils.rate_limiter import get_rate_limiter
 from src.infra.config.init_database import init_database
 from src.infra.adapter.booking_data_repository import BookingDataRepository
+from src.infra.adapter.competitor_repository import CompetitorRepository
+from src.infra.adapter.scrape_plan_repository import ScrapePlanRepository
+from src.infra.adapter.tracker_session_repository import TrackerSessionRepository
 from src.infra.adapter.update_log_repository import UpdateLogRepository
 
+QUOTE_URL = "https://portal.booking-manager.com/wbm2/page.html"
+
+
+class MMKRunContext:
+    """Bir MMK çalışması boyunca yatlar arasında paylaşılan durum."""
+
+    def __init__(self, client, periods, book_repo, update_log_repo, planner=None, cancel_event=None):
+        self.client = client
+        self.periods = periods
+        self.book_repo = book_repo
+        self.update_log_repo = update_log_repo
+        self.planner = planner
+        self.cancel_event = cancel_event
+        self.semaphore = asyncio.Semaphore(MMK_MAX_CONCURRENCY)
+        self.queue_lock = asyncio.Lock()
+
+    def cancelled(self) -> bool:
+        return self.cancel_event is not None and self.cancel_event.is_set()
+
 
 class MMKTracker:
-    def __init__(self):
+    # Dağıtık kuyrukta bir worker'ın aynı anda işlediği kalem sayısı
+    job_concurrency = MMK_MAX_CONCURRENCY
+
+    def __init__(self, session_repo=None):
         self.driver = None
+        self.session_repo = session_repo
+        # Geçerli oturum cookie'leri (Selenium get_cookies formatı); kayıtlı oturumdan ya da login'den gelir
+        self.cookies = None
         self.logger = logging.getLogger(self.__class__.__name__)
         # Login URL sabit
         self.login_url = "https://portal.booking-manager.com/wbm2/app/login_register/"
         self.logged_in = False
+        self.rate_limiter = get_rate_limiter(
+            "portal.booking-manager.com",
+            interval_seconds=MMK_REQUEST_INTERVAL_SECONDS,
+            min_interval_seconds=MMK_MIN_REQUEST_INTERVAL_SECONDS,
+            max_interval_seconds=MMK_MAX_REQUEST_INTERVAL_SECONDS,
+            cooldown_seconds=MMK_THROTTLE_COOLDOWN_SECONDS,
+            burst=2,
+        )
 
     @staticmethod
     def format_currency(value):
@@ -39,19 +88,18 @@ class MMKTracker:
         return s
 
     def setup_driver(self):
-        """Driver kurulumu"""
-        self.logger.info("Driver kurulumu başlıyor...")
-        options = webdriver.ChromeOptions()
-        options.add_argument('--headless')
-        options.add_argument('--no-sandbox')
-        options.add_argument('--disable-dev-shm-usage')
-        options.add_argument('--disable-gpu')
-        options.add_argument('--window-size=1920,1080')
-        options.binary_location = '/usr/bin/chromium'
-        service = Service('/usr/bin/chromedriver')
-        self.driver = webdriver.Chrome(service=service, options=options)
-        self.driver.implicitly_wait(10)
-        self.logger.info("Driver başarıyla kuruldu.")
+        """Paylaşılan havuzdan headless bir driver kiralar."""
+        if self.driver is None:
+            self.driver = get_webdriver_pool().acquire()
+            self.logged_in = False
+            self.logger.info(f"Driver havuzdan alındı (#{self.driver.instance_id}).")
+
+    def release_driver(self):
+        """Driver'ı havuza iade eder; oturum driver'a bağlı olduğundan sonraki kullanımda yeniden login gerekir."""
+        if self.driver is not None:
+            get_webdriver_pool().release(self.driver)
+            self.driver = None
+            self.logged_in = False
 
     def wait_and_find_element(self, by, value, timeout=10):
         return WebDriverWait(self.driver, timeout).until(
@@ -78,6 +126,8 @@ class MMKTracker:
             self.logger.info("Zaten login durumundasınız, tekrar giriş yapılmadı.")
             return True
         try:
+            if self.driver is None:
+                await asyncio.to_thread(self.setup_driver)
             self.driver.get(self.login_url)
             time.sleep(5)
             username = self.wait_and_find_element(By.NAME, "login_email")
@@ -95,271 +145,499 @@ class MMKTracker:
             self.logger.info("MMK Booking Manager'a başarıyla giriş yapıldı")
             self.logged_in = True
             await asyncio.sleep(5)
+            self.cookies = self.driver.get_cookies()
+            await self.persist_session()
             return True
         except Exception as e:
             self.logger.error(f"MMK login hatası: {str(e)}")
             self.logger.error(f"Hata detayı: {type(e).__name__}")
             return False
 
-    def get_session(self):
-        """Selenium driver'dan cookie'leri alıp requests Session'ına ekler."""
-        cookies = self.driver.get_cookies()
-        session = requests.Session()
-        for cookie in cookies:
-            session.cookies.set(cookie['name'], cookie['value'])
-        return session
+    async def ensure_session(self):
+        """Kayıtlı oturum HTTP ile doğrulanabiliyorsa onu kullanır; değilse tarayıcıyla login olur."""
+        if self.logged_in and self.cookies is not None:
+            return True
+        if await self.restore_session():
+            return True
+        self.logged_in = False
+        return await self.login()
+
+    async def probe_session(self, client):
+        """Kuyruk görünümüne tek bir GET ile oturumun hâlâ geçerli olup olmadığını kontrol eder."""
+        response = await self._request(client, "GET", QUOTE_URL, params={"view": "PriceQuoteQueueBETA"})
+        return response.status_code == 200 and "login" not in str(response.url).lower()
+
+    async def restore_session(self):
+        if self.session_repo is None:
+            return False
+        try:
+            record = await self.session_repo.load_session("mmk")
+        except Exception as e:
+            self.logger.warning(f"Kayıtlı MMK oturumu okunamadı: {e}")
+            return False
+        if not record:
+            return False
+        async with create_async_client(cookies=record["cookies"]) as client:
+            valid = await self.probe_session(client)
+        if not valid:
+            self.logger.info("Kayıtlı MMK oturumu geçersiz, yeniden login olunacak.")
+            await self.session_repo.delete_session("mmk")
+            return False
+        self.cookies = record["cookies"]
+        self.logged_in = True
+        await self.session_repo.extend_session("mmk", TRACKER_SESSION_TTL_SECONDS)
+        self.logger.info("Kayıtlı MMK oturumu doğrulandı, tarayıcı açılmadan devam ediliyor.")
+        return True
+
+    async def persist_session(self):
+        if self.session_repo is None or not self.cookies:
+            return
+        try:
+            await self.session_repo.save_session("mmk", self.cookies, TRACKER_SESSION_TTL_SECONDS)
+        except Exception as e:
+            self.logger.warning(f"MMK oturumu kaydedilemedi: {e}")
+
+    async def keep_session_alive(self, client):
+        """
+        Oturumu yoklar; geçerliyse kayıtlı oturumun süresini uzatır. Oturum çalıştırma sırasında düşmüşse
+        tarayıcıyla yeniden login olup yeni cookie'leri çalıştırmanın paylaşılan client'ına yazar.
+        """
+        if await self.probe_session(client):
+            if self.session_repo is not None:
+                await self.session_repo.extend_session("mmk", TRACKER_SESSION_TTL_SECONDS)
+            return True
+        self.logger.warning("MMK oturumu çalıştırma sırasında düştü, yeniden login olunuyor.")
+        return await self.refresh_expired_session(client)
 
-    async def fetch_competitor_weekly_price_quotes(self, book_repo, update_log_repo):
+    async def refresh_expired_session(self, client):
+        """Düşen oturumu siler, yeniden login olur ve client'ın cookie'lerini yeni oturumla değiştirir."""
+        self.logged_in = False
+        self.cookies = None
+        if self.session_repo is not None:
+            try:
+                await self.session_repo.delete_session("mmk")
+            except Exception as e:
+                self.logger.warning(f"Kayıtlı MMK oturumu silinemedi: {e}")
+        if not await self.login():
+            self.logger.error("MMK oturumu yenilenemedi!")
+            return False
+        client.cookies.clear()
+        for cookie in self.cookies:
+            client.cookies.set(cookie["name"], cookie["value"])
+        self.logger.info("MMK oturumu yenilendi, çalıştırma yeni cookie'lerle devam ediyor.")
+        return True
 
-        session = self.get_session()
+    def get_session(self):
+        """Oturum cookie'lerini keep-alive kullanan async HTTP client'a ekler."""
+        cookies = self.cookies if self.cookies is not None else self.driver.get_cookies()
+        return create_async_client(cookies=cookies)
+
+    async def _request(self, client, method, url, **kwargs):
+        """Paylaşılan hız sınırlayıcıdan izin alıp isteği gönderir ve sonucu limiter'a bildirir."""
+        await self.rate_limiter.acquire()
+        started = time.monotonic()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.TimeoutException:
+            self.rate_limiter.record_timeout()
+            raise
+        self.rate_limiter.observe(response.status_code, time.monotonic() - started, response.headers)
+        return response
+
+    @staticmethod
+    def weekly_periods():
+        """Önümüzdeki cumartesiden başlayarak ~6 aylık haftalık (başlangıç, bitiş) periyotlarını üretir."""
         today = datetime.date.today()
         days_ahead = 5 - today.weekday()
         if days_ahead < 0:
             days_ahead += 7
         next_saturday = today + datetime.timedelta(days=days_ahead)
         period_end = next_saturday + datetime.timedelta(days=180)  # Örneğin 6 ay
-        base_url = "https://portal.booking-manager.com/wbm2/page.html"
-        results = []
+        periods = []
+        current_start = next_saturday
+        while current_start < period_end:
+            current_end = current_start + datetime.timedelta(days=7)
+            dt_from = datetime.datetime(current_start.year, current_start.month, current_start.day, 0, 0)
+            dt_to = datetime.datetime(current_end.year, current_end.month, current_end.day, 0, 0)
+            periods.append((dt_from, dt_to))
+            current_start = current_end
+        return periods
+
+    async def fetch_competitor_weekly_price_quotes(self, book_repo, update_log_repo, competitor_repo, planner=None):
+        """
+        Rakipler ve yatlar eşzamanlı işlenir; aynı anda işlenen yat sayısı MMK_MAX_CONCURRENCY ile sınırlıdır.
+        PriceQuoteQueue oturuma bağlı olduğundan addToQueue/clearQueue adımları bir kilit altında sıralanır.
+        Rakip listesi her çalıştırmada competitor koleksiyonundan okunur; oturum çalıştırma boyunca keep-alive ile canlı tutulur.
+        planner verilirse her yat için sadece yenileme vadesi gelen haftalar sorgulanır.
+        """
+        competitors = await competitor_repo.get_platform_competitors("mmk")
+        async with self.get_session() as client:
+            run = MMKRunContext(client, self.weekly_periods(), book_repo, update_log_repo, planner)
+            async with session_keepalive(
+                    lambda: self.keep_session_alive(client), TRACKER_SESSION_KEEPALIVE_SECONDS, "mmk"
+            ):
+                competitor_results = await asyncio.gather(*[
+                    self._fetch_competitor(run, competitor_name, comp_data)
+                    for competitor_name, comp_data in competitors.items()
+                ])
+
+        results = [record for records in competitor_results for record in records]
+        print(json.dumps({"results": results}, indent=4, ensure_ascii=False, default=str))
+        return results
 
-        for competitor_name, comp_data in COMPETITORS.items():
-            self.logger.info(f"Rakip: {competitor_name} için işlemler başlatılıyor...")
-            json_response = session.get(comp_data["url"], params=comp_data["params"])
-            try:
-                data = json_response.json()
-            except Exception as e:
-                self.logger.error(f"{competitor_name} için JSON verisi alınamadı: {str(e)}")
-                continue
-
-            if "boats" not in data:
-                self.logger.warning(f"{competitor_name} için 'boats' verisi bulunamadı.")
-                continue
-
-            boats = data["boats"]
-            for yacht_name, yacht_id in comp_data["yacht_ids"].items():
-                existing_booking = await book_repo.get_daily_booking_data(competitor_name, yacht_id, datetime.date.today())
-                if existing_booking:
-                    self.logger.info(f"Güncel veri mevcut: {competitor_name} - {yacht_name}. Güncelleme atlanıyor.")
-                    continue
-                self.logger.info(
-                    f"Rakip: {competitor_name} - Yat: {yacht_name} (ID: {yacht_id}) için haftalık işlemler başlatılıyor...")
-                boat_data = next((b for b in boats if b.get("id") == yacht_id), None)
-                if boat_data:
-                    resource_id = boat_data["id"]
-                    base_id = boat_data.get("baseId", "")
-                    product_id = boat_data.get("product", [{}])[0].get("id", "Bareboat")
-                    yacht_fullname = boat_data.get("fullName", yacht_name)
-                    company_name = boat_data.get("company", competitor_name)
-                    if "Turizm" in company_name:
-                        company_name = company_name.replace(" Turizm", "")
-                    port = boat_data.get("base", "")
-                    deposit_val = boat_data.get("deposit", 0)
-                else:
-                    resource_id = yacht_id
-                    base_id = comp_data.get("baseId", "")
-                    product_id = comp_data.get("product", "Bareboat")
-                    yacht_fullname = yacht_name
-                    company_name = competitor_name
-                    port = ""
-                    deposit_val = 0
-
-                booking_periods = []
-                current_start = next_saturday
-                while current_start < period_end:
-                    current_end = current_start + datetime.timedelta(days=7)
-                    dt_from = datetime.datetime(current_start.year, current_start.month, current_start.day, 0, 0)
-                    dt_to = datetime.datetime(current_end.year, current_end.month, current_end.day, 0, 0)
-                    dateFrom_ms = int(time.mktime(dt_from.timetuple()) * 1000)
-                    dateTo_ms = int(time.mktime(dt_to.timetuple()) * 1000)
-
-                    params_add = {
-                        'view': 'PriceQuoteQueueBETA',
-                        'action': 'addToQueue',
-                        'resourceid': resource_id,
-                        'dateFrom': dateFrom_ms,
-                        'dateTo': dateTo_ms,
-                        'reservationId': '',
-                        'baseFromId': base_id,
-                        'baseToId': base_id,
-                        'product': product_id,
-                        'extraDiscount': '0.0'
-                    }
-                    response_add = session.post(base_url, params=params_add)
-                    if response_add.status_code != 200:
-                        self.logger.warning(
-                            f"{competitor_name} - {yacht_name} için addToQueue başarısız! Tarih: {current_start} - {current_end}")
-                        current_start = current_end
-                        continue
+    async def _fetch_competitor(self, run, competitor_name, comp_data):
+        self.logger.info(f"Rakip: {competitor_name} için işlemler başlatılıyor...")
+        boats = await self._load_boats(run, competitor_name, comp_data)
+        if boats is None:
+            return []
+        # Hatalar _fetch_yacht içinde loglanır; toplu çalıştırmada diğer yatlar etkilenmez
+        yacht_results = await asyncio.gather(*[
+            self._fetch_yacht(run, competitor_name, comp_data, boats, yacht_name, yacht_id)
+            for yacht_name, yacht_id in comp_data["yacht_ids"].items()
+        ], return_exceptions=True)
+        return [result[0] for result in yacht_results if result and not isinstance(result, BaseException)]
+
+    async def _load_boats(self, run, competitor_name, comp_data):
+        """Rakibin BookingSheetData listesini çeker; alınamazsa None döner."""
+        async with run.semaphore:
+            json_response = await self._request(run.client, "GET", comp_data["url"], params=comp_data["params"])
+        try:
+            data = json_response.json()
+        except Exception as e:
+            self.logger.error(f"{competitor_name} için JSON verisi alınamadı: {str(e)}")
+            return None
+
+        if "boats" not in data:
+            self.logger.warning(f"{competitor_name} için 'boats' verisi bulunamadı.")
+            return None
+        return data["boats"]
+
+    async def build_scrape_jobs(self, competitor_repo):
+        """Dağıtık kuyruk için her (rakip, yat) kalemini bu çalıştırmanın hafta aralığıyla üretir."""
+        competitors = await competitor_repo.get_platform_competitors("mmk")
+        periods = [(period_key(dt_from), period_key(dt_to)) for dt_from, dt_to in self.weekly_periods()]
+        return [
+            {"competitor": competitor_name, "yacht_name": yacht_name, "yacht_id": yacht_id, "periods": periods}
+            for competitor_name, comp_data in competitors.items()
+            for yacht_name, yacht_id in comp_data.get("yacht_ids", {}).items()
+        ]
+
+    @asynccontextmanager
+    async def job_processor(self, database, cancel_event=None):
+        """
+        Kuyruktaki kalemleri işleyecek fonksiyonu verir. Oturum, HTTP client ve keep-alive worker'ın çalışması
+        boyunca paylaşılır; rakiplerin BookingSheetData listesi ilk ihtiyaç duyulduğunda bir kez çekilir.
+        cancel_event set edilirse işlenen yat sıradaki haftaya geçmeden o ana kadar çekilen haftalarla kaydedilir.
+        """
+        if not await self.ensure_session():
+            raise RuntimeError("MMK oturumu açılamadı.")
+        book_repo = BookingDataRepository(database, "booking_data_mmk")
+        update_log_repo = UpdateLogRepository(database)
+        planner = ScrapePlanner(ScrapePlanRepository(database), "mmk")
+        competitors = await CompetitorRepository(database).get_platform_competitors("mmk")
+        boats_cache = {}
+        boats_locks = defaultdict(asyncio.Lock)
+
+        async def process(job):
+            competitor_name = job["competitor"]
+            comp_data = competitors.get(competitor_name)
+            if comp_data is None:
+                return {"status": "skipped", "reason": "competitor_removed"}
+            async with boats_locks[competitor_name]:
+                if competitor_name not in boats_cache:
+                    boats_cache[competitor_name] = await self._load_boats(run, competitor_name, comp_data)
+            boats = boats_cache[competitor_name]
+            if boats is None:
+                # Bir sonraki denemede liste yeniden çekilsin
+                boats_cache.pop(competitor_name, None)
+                raise RuntimeError(f"{competitor_name} için BookingSheetData alınamadı.")
+            periods = [(period_departure(dt_from), period_departure(dt_to)) for dt_from, dt_to in job["periods"]]
+            result = await self._fetch_yacht(
+                run, competitor_name, comp_data, boats, job["yacht_name"], job["yacht_id"], periods)
+            if not result:
+                return {"status": "skipped"}
+            _, weeks, partial = result
+            return {"status": "partial" if partial else "updated", "weeks": weeks}
+
+        async with self.get_session() as client:
+            run = MMKRunContext(client, self.weekly_periods(), book_repo, update_log_repo, planner, cancel_event)
+            async with session_keepalive(
+                    lambda: self.keep_session_alive(client), TRACKER_SESSION_KEEPALIVE_SECONDS, "mmk"
+            ):
+                yield process
 
-                    response_add.encoding = 'utf-8'
-                    soup = BeautifulSoup(response_add.text, "html.parser")
-                    price_text = None
-                    price_labels = soup.find_all("div", string=lambda s: s and "Price:" in s)
-                    for label in price_labels:
-                        sibling = label.find_next_sibling("div")
-                        if sibling:
-                            text = sibling.get_text(strip=True)
-                            if re.search(r'^\d', text) and "NaN" not in text:
-                                price_text = text
-                                break
-
-                    if not price_text:
-                        self.logger.warning(
-                            f"{competitor_name} - {yacht_name} için Price bilgisi alınamadı. Tarih: {current_start} - {current_end}")
-                        current_start = current_end
-                        continue
+    @staticmethod
+    def get_boat_info(boats, competitor_name, comp_data, yacht_name, yacht_id):
+        """BookingSheetData içindeki tekne kaydından fiyat teklifi için gereken alanları çıkarır."""
+        boat_data = next((b for b in boats if b.get("id") == yacht_id), None)
+        if boat_data:
+            company_name = boat_data.get("company", competitor_name)
+            if "Turizm" in company_name:
+                company_name = company_name.replace(" Turizm", "")
+            return {
+                "resource_id": boat_data["id"],
+                "base_id": boat_data.get("baseId", ""),
+                "product_id": boat_data.get("product", [{}])[0].get("id", "Bareboat"),
+                "yacht_fullname": boat_data.get("fullName", yacht_name),
+                "company_name": company_name,
+                "port": boat_data.get("base", ""),
+                "deposit_val": boat_data.get("deposit", 0),
+            }
+        return {
+            "resource_id": yacht_id,
+            "base_id": comp_data.get("baseId", ""),
+            "product_id": comp_data.get("product", "Bareboat"),
+            "yacht_fullname": yacht_name,
+            "company_name": competitor_name,
+            "port": "",
+            "deposit_val": 0,
+        }
+
+    async def _fetch_yacht(self, run, competitor_name, comp_data, boats, yacht_name, yacht_id, periods=None):
+        """
+        Yatın haftalarını çekip kaydeder; (kayıt, çekilen hafta sayısı, iptalle yarıda kesildi mi) ya da
+        atlandıysa None döner. Hata update_log'a yazılıp yeniden fırlatılır, kuyruk kalemi tekrar denenir.
+        """
+        book_repo = run.book_repo
+        update_log_repo = run.update_log_repo
+        async with run.semaphore:
+            if await update_log_repo.has_success_on(competitor_name, yacht_id, datetime.date.today()):
+                self.logger.info(f"Güncel veri mevcut: {competitor_name} - {yacht_name}. Güncelleme atlanıyor.")
+                return None
+            boat_info = self.get_boat_info(boats, competitor_name, comp_data, yacht_name, yacht_id)
+            label = f"{competitor_name} - {yacht_name}"
+            periods = run.periods if periods is None else periods
+            if run.planner:
+                periods = await run.planner.due_periods(competitor_name, boat_info["resource_id"], periods)
+                if not periods:
+                    self.logger.info(f"{label} için yenilenmesi gereken hafta yok. Güncelleme atlanıyor.")
+                    return None
+            self.logger.info(
+                f"Rakip: {competitor_name} - Yat: {yacht_name} (ID: {yacht_id}) için {len(periods)} haftalık işlem başlatılıyor...")
 
-                    if "(" in price_text:
-                        price_pattern = r'([\d,\.]+)\s*€\s*\(\s*([\d,\.]+)\s*€\s*-\s*([\d,\.]+)%\)'
-                        m = re.search(price_pattern, price_text)
-                        if m:
-                            total_price_str = m.group(1)
-                            list_price_str = m.group(2)
-                            discount_percent_str = m.group(3) + "%"
-                            try:
-                                total_price_val = float(total_price_str.replace(",", ""))
-                                list_price_val = float(list_price_str.replace(",", ""))
-                            except Exception as e:
-                                self.logger.error(f"Fiyat dönüşüm hatası: {e}")
-                                current_start = current_end
-                                continue
-                            discount_amount_val = list_price_val - total_price_val
-                        else:
-                            self.logger.warning(
-                                f"{competitor_name} - {yacht_name} için Price metni parse edilemedi: {price_text}")
-                            current_start = current_end
-                            continue
-                    else:
-                        price_clean = price_text.replace("€", "").strip()
-                        try:
-                            total_price_val = float(price_clean.replace(",", ""))
-                        except Exception as e:
-                            self.logger.error(f"Fiyat dönüşüm hatası: {e}")
-                            current_start = current_end
-                            continue
-                        list_price_val = total_price_val
-                        discount_percent_str = "0%"
-                        discount_amount_val = 0.0
-
-                    commission_div = soup.find("div", string=lambda s: s and "Commission" in s)
-                    commission_percentage = None
-                    commission_amount_val = None
-                    if commission_div:
-                        commission_div_text = commission_div.get_text(strip=True)
-                        match_comm = re.search(r"Commission\s+([\d,\.]+%)", commission_div_text)
-                        if match_comm:
-                            commission_percentage = match_comm.group(1)
-                        sibling_div = commission_div.find_next_sibling("div")
-                        if sibling_div:
-                            inp = sibling_div.find("input", {"type": "number"})
-                            if inp and inp.has_attr("value"):
-                                try:
-                                    commission_amount_val = float(inp["value"].replace(",", ""))
-                                except Exception as e:
-                                    self.logger.error(f"Commission dönüşüm hatası: {e}")
-                    else:
-                        self.logger.warning(f"{competitor_name} - {yacht_name} için Commission bilgisi bulunamadı.")
-
-                    total_div = soup.find("div", string=lambda s: s and "Total:" in s)
-                    total_text = None
-                    if total_div:
-                        sibling_div = total_div.find_next_sibling("div")
-                        if sibling_div:
-                            inp = sibling_div.find("input", {"type": "number"})
-                            if inp and inp.has_attr("value"):
-                                total_text = inp["value"]
-                    if not total_text:
-                        total_text = str(total_price_val)
-
-                    client_price_val = total_price_val
-                    agency_price_val = client_price_val - (commission_amount_val if commission_amount_val else 0)
-                    formatted_list_price = self.format_currency(list_price_val)
-                    formatted_total_price = self.format_currency(total_price_val)
-                    formatted_discount = "-" + self.format_currency(discount_amount_val)
-                    formatted_deposit = self.format_currency(deposit_val)
-                    formatted_commission = self.format_currency(
-                        commission_amount_val) if commission_amount_val is not None else ""
-                    formatted_client_price = self.format_currency(client_price_val)
-                    formatted_agency_price = self.format_currency(agency_price_val)
-                    period_from_str = dt_from.strftime("%Y-%m-%d %H:%M:%S")
-                    period_to_str = dt_to.strftime("%Y-%m-%d %H:%M:%S")
-                    discount_name = "Discount"
-
-                    period_detail = {
-                        "period_from": period_from_str,
-                        "period_to": period_to_str,
-                        "details": [
-                            {
-                                "discount_name": discount_name,
-                                "yacht_name": yacht_fullname,
-                                "company_name": company_name,
-                                "port_from": port,
-                                "port_to": port,
-                                "deposit": formatted_deposit,
-                                "discount_percent": discount_percent_str,
-                                "list_price": formatted_list_price,
-                                "discount": formatted_discount,
-                                "total_price": formatted_total_price,
-                                "commission_percent": commission_percentage,
-                                "commission": formatted_commission,
-                                "client_price": formatted_client_price,
-                                "agency_price": formatted_agency_price,
-                                "agency_income": formatted_commission,
-                                "total_advanced_payment": formatted_client_price
-                            }
-                        ]
-                    }
-                    booking_periods.append(period_detail)
-                    self.logger.info(
-                        f"[{competitor_name} - {yacht_name}] Tarih: {period_from_str} - {period_to_str} | "
-                        f"Price={formatted_total_price} € (List: {formatted_list_price} € - {discount_percent_str}) | "
-                        f"Commission Oran={commission_percentage} | Commission Tutar={formatted_commission}"
-                    )
-                    params_clear = {'view': 'PriceQuoteQueueBETA', 'action': 'clearQueue'}
-                    session.post(base_url, params=params_clear)
-                    await asyncio.sleep(15)
-                    current_start = current_end
+            try:
+                if MMK_QUEUE_BATCH_SIZE > 1:
+                    booking_periods, attempted = await self._fetch_quotes_batched(run, boat_info, periods, label)
+                else:
+                    booking_periods = []
+                    attempted = 0
+                    for dt_from, dt_to in periods:
+                        if run.cancelled():
+                            break
+                        attempted += 1
+                        period_detail = await self._fetch_week_quote(
+                            run.client, run.queue_lock, boat_info, dt_from, dt_to, label)
+                        if period_detail:
+                            booking_periods.append(period_detail)
+                partial = attempted < len(periods)
+
+                fetched_periods = booking_periods
+                if run.planner:
+                    previous_doc = await book_repo.find_booking_doc(competitor_name, boat_info["resource_id"])
+                    booking_periods = run.planner.merge_booking_periods(
+                        previous_doc, fetched_periods, periods[:attempted])
 
                 record = {
-                    "yacht_id": resource_id,
+                    "yacht_id": boat_info["resource_id"],
                     "booking_periods": booking_periods,
                     "competitor": competitor_name
                 }
-                results.append(record)
-                today_dt = datetime.datetime.now()
                 await book_repo.save_daily_booking_data(competitor_name, [record])
+                if run.planner:
+                    await run.planner.record_results(
+                        competitor_name, boat_info["resource_id"], fetched_periods, periods[:attempted])
+                if partial:
+                    self.logger.info(f"{label}: iptal istendi, çekilen {len(fetched_periods)} hafta kaydedildi.")
+                await update_log_repo.create_one(update_log_repo.collection_name, {
+                    "competitor": competitor_name,
+                    "yacht_id": boat_info["resource_id"],
+                    "last_update_date": datetime.datetime.now(),
+                    "status": "partial" if partial else "success",
+                    "timestamp": datetime.datetime.now()
+                })
+            except Exception as e:
+                self.logger.error(f"{label} güncellenirken hata: {e}", exc_info=True)
                 await update_log_repo.create_one(update_log_repo.collection_name, {
                     "competitor": competitor_name,
-                    "yacht_id": resource_id,
-                    "last_update_date": today_dt,
-                    "status": "success",
+                    "yacht_id": boat_info["resource_id"],
+                    "last_update_date": datetime.datetime.now(),
+                    "status": "error",
+                    "error": str(e),
                     "timestamp": datetime.datetime.now()
                 })
-                await asyncio.sleep(30)
+                raise
+            return record, len(fetched_periods), partial
 
-            await asyncio.sleep(60)
+    @staticmethod
+    def _add_to_queue_params(boat_info, dt_from, dt_to):
+        return {
+            'view': 'PriceQuoteQueueBETA',
+            'action': 'addToQueue',
+            'resourceid': boat_info["resource_id"],
+            'dateFrom': int(time.mktime(dt_from.timetuple()) * 1000),
+            'dateTo': int(time.mktime(dt_to.timetuple()) * 1000),
+            'reservationId': '',
+            'baseFromId': boat_info["base_id"],
+            'baseToId': boat_info["base_id"],
+            'product': boat_info["product_id"],
+            'extraDiscount': '0.0'
+        }
+
+    async def _clear_queue(self, client):
+        params_clear = {'view': 'PriceQuoteQueueBETA', 'action': 'clearQueue'}
+        await self._request(client, "POST", QUOTE_URL, params=params_clear)
+
+    async def _fetch_week_quote(self, client, queue_lock, boat_info, dt_from, dt_to, label):
+        params_add = self._add_to_queue_params(boat_info, dt_from, dt_to)
+        async with queue_lock:
+            try:
+                response_add = await self._request(client, "POST", QUOTE_URL, params=params_add)
+                if response_add.status_code != 200:
+                    self.logger.warning(
+                        f"{label} için addToQueue başarısız! Tarih: {dt_from.date()} - {dt_to.date()}")
+                    return None
+                quote = await self.parse_price_quote(response_add.content, label, dt_from, dt_to)
+            finally:
+                await self._clear_queue(client)
+
+        if not quote:
+            return None
+        return self.build_period_detail(quote, boat_info, dt_from, dt_to, label)
+
+    async def _fetch_quotes_batched(self, run, boat_info, periods, label):
+        """
+        Haftaları MMK_QUEUE_BATCH_SIZE'lık gruplar halinde kuyruğa ekler ve fiyatları son addToQueue
+        cevabındaki kuyruk listesinden tek seferde okur. Parse edilemeyen haftalar tek tek tekrar sorgulanır.
+        İptal istenirse yeni gruba geçilmez; (çekilen haftalar, sorgulanan hafta sayısı) döner.
+        """
+        client, queue_lock = run.client, run.queue_lock
+        booking_periods = []
+        for i in range(0, len(periods), MMK_QUEUE_BATCH_SIZE):
+            if run.cancelled():
+                return booking_periods, i
+            batch = periods[i:i + MMK_QUEUE_BATCH_SIZE]
+            quotes = await self._fetch_quote_batch(client, queue_lock, boat_info, batch, label)
+            for (dt_from, dt_to), quote in zip(batch, quotes):
+                if quote:
+                    booking_periods.append(self.build_period_detail(quote, boat_info, dt_from, dt_to, label))
+                    continue
+                self.logger.info(f"{label} için {dt_from.date()} haftası tekil sorgu ile tekrar deneniyor.")
+                period_detail = await self._fetch_week_quote(client, queue_lock, boat_info, dt_from, dt_to, label)
+                if period_detail:
+                    booking_periods.append(period_detail)
+        return booking_periods, len(periods)
 
-        print(json.dumps({"results": results}, indent=4, ensure_ascii=False, default=str))
-        return results
+    async def _fetch_quote_batch(self, client, queue_lock, boat_info, batch, label):
+        """Bir grup haftayı kuyruğa ekler; her hafta için quote sözlüğü ya da None döner."""
+        quotes = [None] * len(batch)
+        async with queue_lock:
+            try:
+                await self._clear_queue(client)
+                queued = []
+                last_response = None
+                for index, (dt_from, dt_to) in enumerate(batch):
+                    response_add = await self._request(
+                        client, "POST", QUOTE_URL, params=self._add_to_queue_params(boat_info, dt_from, dt_to))
+                    if response_add.status_code != 200:
+                        self.logger.warning(
+                            f"{label} için addToQueue başarısız! Tarih: {dt_from.date()} - {dt_to.date()}")
+                        continue
+                    queued.append(index)
+                    last_response = response_add
+
+                if last_response is None:
+                    return quotes
+                entry_quotes = await self.parse_price_quote_queue(last_response.content, len(queued), label)
+                if entry_quotes is None:
+                    return quotes
+                for index, quote in zip(queued, entry_quotes):
+                    quotes[index] = quote
+            finally:
+                await self._clear_queue(client)
+        return quotes
+
+    async def parse_price_quote(self, content, label, dt_from, dt_to):
+        """addToQueue cevabından fiyat, indirim ve komisyon bilgilerini parse havuzunda çıkarır."""
+        quote = await get_parse_pool().parse("mmk_price_quote", content, label)
+        if quote is None:
+            self.logger.warning(f"{label} için fiyat alınamadı. Tarih: {dt_from.date()} - {dt_to.date()}")
+        return quote
+
+    async def parse_price_quote_queue(self, content, expected_entries, label):
+        """Kuyruk cevabındaki girdileri sırasıyla parse eder; girdi sayısı beklenenle eşleşmezse None döner."""
+        return await get_parse_pool().parse("mmk_price_quote_queue", content, expected_entries, label)
+
+    def build_period_detail(self, quote, boat_info, dt_from, dt_to, label):
+        total_price_val = quote["total_price_val"]
+        list_price_val = quote["list_price_val"]
+        commission_amount_val = quote["commission_amount_val"]
+        commission_percentage = quote["commission_percentage"]
+        discount_percent_str = quote["discount_percent_str"]
+
+        client_price_val = total_price_val
+        agency_price_val = client_price_val - (commission_amount_val if commission_amount_val else 0)
+        formatted_list_price = self.format_currency(list_price_val)
+        formatted_total_price = self.format_currency(total_price_val)
+        formatted_discount = "-" + self.format_currency(quote["discount_amount_val"])
+        formatted_deposit = self.format_currency(boat_info["deposit_val"])
+        formatted_commission = self.format_currency(
+            commission_amount_val) if commission_amount_val is not None else ""
+        formatted_client_price = self.format_currency(client_price_val)
+        formatted_agency_price = self.format_currency(agency_price_val)
+        period_from_str = dt_from.strftime("%Y-%m-%d %H:%M:%S")
+        period_to_str = dt_to.strftime("%Y-%m-%d %H:%M:%S")
+        discount_name = "Discount"
+
+        period_detail = {
+            "period_from": period_from_str,
+            "period_to": period_to_str,
+            "details": [
+                {
+                    "discount_name": discount_name,
+                    "yacht_name": boat_info["yacht_fullname"],
+                    "company_name": boat_info["company_name"],
+                    "port_from": boat_info["port"],
+                    "port_to": boat_info["port"],
+                    "deposit": formatted_deposit,
+                    "discount_percent": discount_percent_str,
+                    "list_price": formatted_list_price,
+                    "discount": formatted_discount,
+                    "total_price": formatted_total_price,
+                    "commission_percent": commission_percentage,
+                    "commission": formatted_commission,
+                    "client_price": formatted_client_price,
+                    "agency_price": formatted_agency_price,
+                    "agency_income": formatted_commission,
+                    "total_advanced_payment": formatted_client_price
+                }
+            ]
+        }
+        self.logger.info(
+            f"[{label}] Tarih: {period_from_str} - {period_to_str} | "
+            f"Price={formatted_total_price} € (List: {formatted_list_price} € - {discount_percent_str}) | "
+            f"Commission Oran={commission_percentage} | Commission Tutar={formatted_commission}"
+        )
+        return period_detail
 
     def cleanup(self):
-        if self.driver:
-            self.driver.quit()
-            self.driver = None
-            self.logged_in = False
+        self.release_driver()
 
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
-    tracker = MMKTracker()
-    tracker.setup_driver()
     db_conf = init_database()
-    db_client = db_conf.db_session
-    database = db_client["boat_tracker"]
+    database = db_conf.database
+    tracker = MMKTracker(TrackerSessionRepository(database))
     book_repo = BookingDataRepository(database, "booking_data_mmk")
     update_log_repo = UpdateLogRepository(database)
-
-    if asyncio.run(tracker.login()):
-        asyncio.run(tracker.fetch_competitor_weekly_price_quotes(book_repo=book_repo, update_log_repo=update_log_repo))
+    competitor_repo = CompetitorRepository(database)
+
+    if asyncio.run(tracker.ensure_session()):
+        asyncio.run(tracker.fetch_competitor_weekly_price_quotes(
+            book_repo=book_repo,
+            update_log_repo=update_log_repo,
+            competitor_repo=competitor_repo
+        ))
     else:
         print("Giriş yapılamadı.")
     tracker.cleanup()
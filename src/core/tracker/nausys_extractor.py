@@ -0,0 +1,37 @@
+from typing import Dict, Optional
+
+from lxml import etree, html
+
+BOOKING_DIALOG_XPATHS = {
+    "discount_name": '//*[@id="yachtReservationDialogForm:tabView:discountGroup:contentTable:0:discountName"]',
+    "yacht_name": '//*[@id="yachtReservationDialogForm:tabView:j_idt109"]',
+    "company_name": '//*[@id="yachtReservationDialogForm:tabView:generalPanel"]/tbody/tr[3]/td[2]/div/div[1]/label',
+    "port_from": '//*[@id="yachtReservationDialogForm:tabView:generalPanel"]/tbody/tr[7]/td[2]/label',
+    "port_to": '//*[@id="yachtReservationDialogForm:tabView:generalPanel"]/tbody/tr[8]/td[2]/label',
+    "deposit": '//*[@id="yachtReservationDialogForm:tabView:generalPanel"]/tbody/tr[10]/td[2]/span[1]',
+    "discount_percent": '//*[@id="yachtReservationDialogForm:tabView:discountGroup:contentTable_data"]/tr/td[5]/span',
+    "list_price": '//*[@id="yachtReservationDialogForm:tabView:priceCalculationPanelGrid"]/tbody/tr[1]/td[2]/div/div/span[1]',
+    "discount": '//*[@id="yachtReservationDialogForm:tabView:priceCalculationPanelGrid"]/tbody/tr[1]/td[2]/div/div/span[3]/span[1]',
+    "total_price": '//*[@id="yachtReservationDialogForm:tabView:priceCalculationPanelGrid"]/tbody/tr[1]/td[2]/div/div/span[4]',
+    "commission_percent": '//*[@id="yachtReservationDialogForm:tabView:commissionPercent"]',
+    "commission": '//*[@id="yachtReservationDialogForm:tabView:priceCalculationPanelGrid"]/tbody/tr[2]/td[2]/div/div[2]/span[1]',
+    "client_price": '//*[@id="yachtReservationDialogForm:tabView:priceCalculationPanelGrid"]/tbody/tr[4]/td[2]/div/div/span[1]',
+    "agency_price": '//*[@id="yachtReservationDialogForm:tabView:priceCalculationPanelGrid"]/tbody/tr[5]/td[2]/div/div/span[1]',
+    "agency_income": '//*[@id="yachtReservationDialogForm:tabView:priceCalculationPanelGrid"]/tbody/tr[6]/td[2]/div/div/span[1]',
+    "total_advanced_payment": '//*[@id="yachtReservationDialogForm:tabView:priceCalculationPanelGrid"]/tbody/tr[7]/td[2]/div/div/span[1]',
+}
+
+_COMPILED_XPATHS = {key: etree.XPath(xp) for key, xp in BOOKING_DIALOG_XPATHS.items()}
+
+
+def extract_booking_details(content: bytes) -> Dict[str, Optional[str]]:
+    """
+    yachtReservationDialog.xhtml cevabından rezervasyon detaylarını çıkarır.
+    Sayfada bulunamayan alanlar None olarak döner; I/O ve loglama çağıran tarafa aittir.
+    """
+    tree = html.fromstring(content)
+    results = {}
+    for key, xpath in _COMPILED_XPATHS.items():
+        elems = xpath(tree)
+        results[key] = elems[0].text_content().strip() if elems else None
+    return results
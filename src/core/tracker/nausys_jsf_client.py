@@ -0,0 +1,223 @@
+import logging
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+from lxml import etree, html
+
+from src.core.utils.http_client import create_async_client
+
+logger = logging.getLogger(__name__)
+
+BOOKING_LIST_URL = "https://agency.nausys.com/NauSYS-agency/app/bookinglist.xhtml"
+VIEW_STATE_NAME = "javax.faces.ViewState"
+AUTOCOMPLETE_SUFFIX = "charterCompanyAutocompleteComponentId2"
+SEARCH_BUTTON_SUFFIX = "searchBtn"
+
+PARTIAL_HEADERS = {
+    "Faces-Request": "partial/ajax",
+    "X-Requested-With": "XMLHttpRequest",
+    "Accept": "application/xml, text/xml, */*; q=0.01",
+    "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
+}
+
+_YACHT_ROW_ID = re.compile(r"y-(\d+)-")
+# PrimeFaces.ab({s:"...",f:"...",p:"...",u:"..."}) içindeki process / update hedefleri
+_AJAX_OPTION = re.compile(r'\b([pu])\s*:\s*"([^"]*)"')
+
+
+class NausysSessionExpired(Exception):
+    """JSF cevabı login sayfasına yönlendirme içeriyorsa fırlatılır."""
+
+
+def parse_yacht_rows(html_text: str) -> Dict[str, str]:
+    """Arama sonucu tablosundaki YachtRow satırlarından {yat adı: yat id} sözlüğü çıkarır."""
+    if not html_text or not html_text.strip():
+        return {}
+    tree = html.fromstring(html_text)
+    yacht_ids = {}
+    for row in tree.xpath("//*[contains(concat(' ', normalize-space(@class), ' '), ' YachtRow ')]"):
+        row_bodies = row.xpath(".//*[starts-with(@id, 'y-')]")
+        names = row.xpath(".//*[contains(concat(' ', normalize-space(@class), ' '), ' yachtName ')]")
+        if not row_bodies or not names:
+            continue
+        match = _YACHT_ROW_ID.search(row_bodies[0].get("id", ""))
+        if match:
+            yacht_ids[names[0].text_content().strip()] = match.group(1)
+    return yacht_ids
+
+
+def parse_partial_response(xml_bytes: bytes) -> Tuple[Dict[str, str], Optional[str]]:
+    """
+    JSF partial-response XML'ini ({update id: içerik}, redirect url) olarak döner.
+    ViewState güncellemesi id'sinde javax.faces.ViewState geçen update ile gelir.
+    """
+    root = etree.fromstring(xml_bytes)
+    redirect = root.find(".//redirect")
+    updates = {update.get("id"): update.text or "" for update in root.iter("update")}
+    return updates, redirect.get("url") if redirect is not None else None
+
+
+def parse_autocomplete_items(fragment: str) -> List[Tuple[str, str]]:
+    """Autocomplete panelindeki <li> öğelerini (değer, etiket) olarak döner."""
+    if not fragment or not fragment.strip():
+        return []
+    tree = html.fromstring(fragment)
+    items = []
+    for li in tree.xpath("//li"):
+        label = li.get("data-item-label") or li.text_content().strip()
+        value = li.get("data-item-value")
+        if value:
+            items.append((value, label))
+    return items
+
+
+class BookingListForm:
+    """Booking list sayfasındaki arama formunun JSF id'leri ve gönderilecek varsayılan alanları."""
+
+    def __init__(self, page_html: str):
+        tree = html.fromstring(page_html)
+        inputs = tree.xpath(f"//input[substring(@id, string-length(@id) - string-length('{AUTOCOMPLETE_SUFFIX}_input') + 1)"
+                            f" = '{AUTOCOMPLETE_SUFFIX}_input']")
+        if not inputs:
+            raise ValueError("Booking list sayfasında charter company autocomplete alanı bulunamadı.")
+        autocomplete_input = inputs[0]
+        form = next((el for el in autocomplete_input.iterancestors() if el.tag == "form"), None)
+        if form is None:
+            raise ValueError("Autocomplete alanının bağlı olduğu form bulunamadı.")
+
+        self.form_id = form.get("id")
+        self.autocomplete_id = autocomplete_input.get("id")[:-len("_input")]
+        buttons = form.xpath(f".//button[substring(@id, string-length(@id) - string-length('{SEARCH_BUTTON_SUFFIX}') + 1)"
+                             f" = '{SEARCH_BUTTON_SUFFIX}']")
+        if not buttons:
+            raise ValueError("Booking list formunda arama butonu bulunamadı.")
+        self.search_button_id = buttons[0].get("id")
+        options = dict(_AJAX_OPTION.findall(buttons[0].get("onclick") or ""))
+        self.search_process = options.get("p") or "@all"
+        self.search_update = options.get("u") or "@all"
+
+        view_states = tree.xpath(f"//input[@name='{VIEW_STATE_NAME}']/@value")
+        self.view_state = view_states[0] if view_states else None
+        self.fields = self._form_fields(form)
+
+    @staticmethod
+    def _form_fields(form) -> Dict[str, str]:
+        fields = {}
+        for element in form.xpath(".//input[@name] | .//select[@name] | .//textarea[@name]"):
+            name = element.get("name")
+            if name == VIEW_STATE_NAME:
+                continue
+            if element.tag == "input":
+                input_type = (element.get("type") or "text").lower()
+                if input_type in ("submit", "button", "image", "file"):
+                    continue
+                if input_type in ("checkbox", "radio") and element.get("checked") is None:
+                    continue
+                fields[name] = element.get("value") or ""
+            elif element.tag == "select":
+                selected = element.xpath(".//option[@selected]/@value") or element.xpath(".//option[1]/@value")
+                fields[name] = selected[0] if selected else ""
+            else:
+                fields[name] = element.text or ""
+        return fields
+
+
+class NausysJsfClient:
+    """
+    Booking list ekranındaki PrimeFaces adımlarını (autocomplete sorgusu, firma seçimi, arama)
+    tarayıcı olmadan JSF partial/AJAX POST'ları olarak uygular. ViewState her cevaptan güncellenir.
+    """
+
+    def __init__(self, cookies: List[Dict], rate_limiter):
+        self.client: httpx.AsyncClient = create_async_client(cookies=cookies)
+        self.rate_limiter = rate_limiter
+        self.form: Optional[BookingListForm] = None
+        self.view_state: Optional[str] = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.client.aclose()
+
+    async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        await self.rate_limiter.acquire()
+        started = time.monotonic()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.TimeoutException:
+            self.rate_limiter.record_timeout()
+            raise
+        self.rate_limiter.observe(response.status_code, time.monotonic() - started, response.headers)
+        if "login" in str(response.url).lower():
+            raise NausysSessionExpired(str(response.url))
+        response.raise_for_status()
+        return response
+
+    async def open_booking_list(self):
+        response = await self._request("GET", BOOKING_LIST_URL)
+        self.form = BookingListForm(response.text)
+        self.view_state = self.form.view_state
+
+    async def _partial(self, source: str, execute: str, render: str, extra: Dict[str, str]) -> Dict[str, str]:
+        data = {
+            **self.form.fields,
+            "javax.faces.partial.ajax": "true",
+            "javax.faces.source": source,
+            "javax.faces.partial.execute": execute,
+            "javax.faces.partial.render": render,
+            self.form.form_id: self.form.form_id,
+            VIEW_STATE_NAME: self.view_state,
+            **extra,
+        }
+        response = await self._request("POST", BOOKING_LIST_URL, data=data, headers=PARTIAL_HEADERS)
+        updates, redirect = parse_partial_response(response.content)
+        if redirect:
+            raise NausysSessionExpired(redirect)
+        for update_id, content in updates.items():
+            if update_id and VIEW_STATE_NAME in update_id:
+                self.view_state = content.strip()
+        return updates
+
+    async def query_companies(self, text: str) -> List[Tuple[str, str]]:
+        component = self.form.autocomplete_id
+        updates = await self._partial(component, component, component, {
+            component: component,
+            f"{component}_query": text,
+            f"{component}_input": text,
+        })
+        return parse_autocomplete_items(updates.get(component, ""))
+
+    async def select_company(self, value: str, label: str):
+        component = self.form.autocomplete_id
+        selection = {f"{component}_input": label, f"{component}_hinput": value}
+        await self._partial(component, component, "@none", {
+            **selection,
+            "javax.faces.behavior.event": "itemSelect",
+            "javax.faces.partial.event": "itemSelect",
+            f"{component}_itemSelect": value,
+        })
+        # Sonraki arama isteği seçili firmayı form alanı olarak göndermeli
+        self.form.fields.update(selection)
+
+    async def search(self) -> Dict[str, str]:
+        button = self.form.search_button_id
+        return await self._partial(button, self.form.search_process, self.form.search_update, {button: button})
+
+    async def discover_yacht_ids(self, company_search_text: str, company_click_text: str) -> Dict[str, str]:
+        """Firma autocomplete'te aranır, etiketi company_click_text içeren öğe seçilir ve sonuç tablosundaki yatlar döner."""
+        await self.open_booking_list()
+        items = await self.query_companies(company_search_text)
+        selected = next((item for item in items if company_click_text.lower() in item[1].lower()), None)
+        if not selected:
+            logger.warning(f"Autocomplete sonuçlarında '{company_click_text}' bulunamadı: {[label for _, label in items]}")
+            return {}
+        await self.select_company(*selected)
+        logger.info(f"Autocomplete: '{company_search_text}' arandı, '{selected[1]}' seçildi.")
+
+        yacht_ids = {}
+        for content in (await self.search()).values():
+            yacht_ids.update(parse_yacht_rows(content))
+        return yacht_ids
@@ -1,55 +1,129 @@
 import asyncio
+from contextlib import asynccontextmanager
 import time
 import logging
 import requests
-import re
-from lxml import html
 from datetime import datetime, timedelta, date
-from selenium import webdriver
+from typing import Tuple
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 
-from src.infra.config.config import COMPETITORS_NAUSY as COMPETITORS
-from src.infra.config.settings import NAUSYS_USERNAME, NAUSYS_PASSWORD
+from src.infra.config.settings import (
+    NAUSYS_USERNAME,
+    NAUSYS_PASSWORD,
+    NAUSYS_REQUEST_INTERVAL_SECONDS,
+    NAUSYS_MIN_REQUEST_INTERVAL_SECONDS,
+    NAUSYS_MAX_REQUEST_INTERVAL_SECONDS,
+    NAUSYS_THROTTLE_COOLDOWN_SECONDS,
+    TRACKER_SESSION_TTL_SECONDS,
+    TRACKER_SESSION_KEEPALIVE_SECONDS,
+)
+from src.core.tracker.nausys_jsf_client import BOOKING_LIST_URL, NausysJsfClient, NausysSessionExpired
+from src.core.tracker.parse_pool import get_parse_pool
+from src.core.tracker.session_keepalive import session_keepalive
+from src.core.tracker.webdriver_pool import get_webdriver_pool
+from src.core.utils.rate_limiter import get_rate_limiter
 from src.infra.config.init_database import init_database
 from src.infra.adapter.competitor_repository import CompetitorRepository
 from src.infra.adapter.booking_data_repository import BookingDataRepository
 from src.infra.adapter.update_log_repository import UpdateLogRepository
+from src.infra.adapter.scrape_plan_repository import ScrapePlanRepository
+from src.infra.adapter.tracker_session_repository import TrackerSessionRepository
+from src.core.tracker.scrape_planner import ScrapePlanner
 
 
-class BaseTracker:
-    def setup_driver(self):
-        pass
+class NausysSession:
+    """Driver'dan bir kez alınan ve istekler arasında tekrar kullanılan Nausys oturum bilgileri."""
+
+    def __init__(self, jsessionid, view_state, nult, bls):
+        self.jsessionid = jsessionid
+        self.view_state = view_state
+        self.nult = nult
+        self.bls = bls
+        self.captured_at = datetime.now()
+
+    def is_complete(self) -> bool:
+        return bool(self.jsessionid and self.view_state and self.nult)
+
+    @property
+    def cookies(self) -> dict:
+        return {
+            "JSESSIONID": self.jsessionid,
+            "nult": self.nult,
+            "bls_5324314": self.bls
+        }
+
+    def cookie_list(self) -> list:
+        return [{"name": name, "value": value} for name, value in self.cookies.items() if value]
+
+    @classmethod
+    def from_record(cls, record: dict) -> "NausysSession":
+        cookies = {cookie["name"]: cookie["value"] for cookie in record.get("cookies", [])}
+        return cls(cookies.get("JSESSIONID"), record.get("view_state"), cookies.get("nult"), cookies.get("bls_5324314"))
+
 
+class NausysRunContext:
+    """Bir Nausys çalıştırması boyunca yatlar arasında paylaşılan repository'ler."""
 
-class NausysTracker(BaseTracker):
-    def __init__(self):
-        super().__init__()
+    def __init__(self, book_repo, update_log_repo, planner, cancel_event=None):
+        self.book_repo = book_repo
+        self.update_log_repo = update_log_repo
+        self.planner = planner
+        self.cancel_event = cancel_event
+
+    def cancelled(self) -> bool:
+        return self.cancel_event is not None and self.cancel_event.is_set()
+
+
+class NausysTracker:
+    # Nausys istekleri tek oturum üzerinden sırayla gönderildiğinden worker başına tek kalem işlenir
+    job_concurrency = 1
+
+    def __init__(self, db_conf=None):
         self.base_url = "https://agency.nausys.com"
         self.driver = None
         self.logger = logging.getLogger(self.__class__.__name__)
         self.logged_in = False
-        self.db_conf = init_database()
+        self.db_conf = db_conf if db_conf is not None else init_database()
+        self.session: NausysSession = None
+        self.session_repo = TrackerSessionRepository(self.db_conf.database)
+        # Keep-alive ile istek akışı aynı anda yeniden login olmasın
+        self._refresh_lock = asyncio.Lock()
+        self.http_session = requests.Session()
+        self.rate_limiter = get_rate_limiter(
+            "agency.nausys.com",
+            interval_seconds=NAUSYS_REQUEST_INTERVAL_SECONDS,
+            min_interval_seconds=NAUSYS_MIN_REQUEST_INTERVAL_SECONDS,
+            max_interval_seconds=NAUSYS_MAX_REQUEST_INTERVAL_SECONDS,
+            cooldown_seconds=NAUSYS_THROTTLE_COOLDOWN_SECONDS,
+        )
 
     def setup_driver(self):
-        try:
-            self.logger.info("Driver kurulumu başlıyor...")
-            service = Service(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service)
-            self.driver.maximize_window()
-            self.logger.info("Driver başarıyla kuruldu ve pencere maximize edildi.")
-        except Exception as e:
-            self.logger.exception("Driver kurulumu sırasında hata:", exc_info=True)
-            raise
+        """Paylaşılan havuzdan headless bir driver kiralar."""
+        if self.driver is None:
+            self.driver = get_webdriver_pool().acquire()
+            self.logged_in = False
+            self.invalidate_session()
+            self.logger.info(f"Driver havuzdan alındı (#{self.driver.instance_id}).")
+
+    def release_driver(self):
+        """Driver'ı havuza iade eder; oturum driver'a bağlı olduğundan sonraki kullanımda yeniden login gerekir."""
+        if self.driver is not None:
+            get_webdriver_pool().release(self.driver)
+            self.driver = None
+            self.logged_in = False
+
+    def cleanup(self):
+        self.release_driver()
 
     def login(self):
         if self.logged_in:
             self.logger.info("Zaten login durumundasınız, tekrar giriş yapılmadı.")
             return True
         try:
+            if self.driver is None:
+                self.setup_driver()
             self.logger.info("Nausys ana sayfası açılıyor...")
             self.driver.get(self.base_url)
             self.logger.info("Login form elementleri bekleniyor...")
@@ -81,124 +155,51 @@ class NausysTracker(BaseTracker):
             self.logger.exception("Nausys login hatası:", exc_info=True)
             return False
 
-    def go_to_booking_list_page(self):
-        try:
-            if not self.logged_in:
-                self.logger.info("Login durumu FALSE, otomatik login deniyor...")
-                if not self.login():
-                    self.logger.error("Login başarısız oldu, booking list sayfasına gidilemiyor.")
-                    return
-            self.logger.info("Booking list sayfasına yönlendiriliyor...")
-            self.driver.get("https://agency.nausys.com/NauSYS-agency/app/bookinglist.xhtml")
-            WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, ".layout-main"))
-            )
-            self.logger.info("Booking list sayfası başarıyla yüklendi.")
-        except Exception as e:
-            self.logger.exception("Booking list sayfasına giderken hata oluştu:", exc_info=True)
-            raise
-
-    def select_autocomplete_item(self, input_css, panel_css, text_to_type, text_to_click):
-        try:
-            input_box = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, input_css))
-            )
-            input_box.clear()
-            input_box.send_keys(text_to_type)
-            time.sleep(1)  # Bloklayıcı; eğer mümkünse bunu await asyncio.sleep(1) ile async hale getirin.
-            panel = WebDriverWait(self.driver, 15).until(
-                EC.visibility_of_element_located((By.CSS_SELECTOR, panel_css))
-            )
-            all_li = panel.find_elements(By.TAG_NAME, "li")
-            desired_li = None
-            for li in all_li:
-                if text_to_click.lower() in li.text.lower():
-                    desired_li = li
-                    break
-
-            if desired_li:
-                WebDriverWait(self.driver, 5).until(EC.element_to_be_clickable(desired_li))
-                desired_li.click()
-                self.logger.info(f"Autocomplete: '{text_to_type}' yazıldı, '{text_to_click}' seçildi.")
-            else:
-                self.logger.warning(f"Panelde '{text_to_click}' metnine sahip li bulunamadı.")
-        except Exception as e:
-            self.logger.exception("Autocomplete item seçerken hata:", exc_info=True)
-            raise
-
-    def select_charter_company_and_search(self, company_search_text, company_click_text):
-        try:
-            self.logger.info(f"Charter company '{company_search_text}' seçiliyor...")
-            self.select_autocomplete_item(
-                input_css="input[id$='charterCompanyAutocompleteComponentId2_input']",
-                panel_css="span[id$='charterCompanyAutocompleteComponentId2_panel']",
-                text_to_type=company_search_text,
-                text_to_click=company_click_text
-            )
-            time.sleep(1)
-            search_button = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, "button[id$='searchBtn']"))
-            )
-            search_button.click()
-            time.sleep(5)
-            self.logger.info(f"'{company_search_text}' için arama işlemi tamamlandı.")
-        except Exception as e:
-            self.logger.exception("Charter firma seçerken hata:", exc_info=True)
-            raise
+    async def scrape_yacht_ids_and_save(self, competitor_name: str, company_search_text: str, company_click_text: str):
+        """
+        Booking list ekranında firmayı seçip sonuç tablosundaki yat ID'lerini toplar ve rakip kaydına yazar.
+        Tarayıcı sadece oturum yoksa login için kullanılır; arama adımları NausysJsfClient ile HTTP üzerinden yapılır.
+        """
+        self.logger.info(f"Scrape süreci başlatıldı: '{company_search_text}' / '{company_click_text}'")
+        if not await self.ensure_session():
+            self.logger.error("Login başarısız, yat ID'leri çekilemedi.")
+            return {}
 
-    def get_yacht_ids_from_page(self) -> dict:
         try:
-            yacht_ids = {}
-            yacht_rows = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_all_elements_located((By.CLASS_NAME, "YachtRow"))
-            )
-            self.logger.info(f"Toplam {len(yacht_rows)} adet 'YachtRow' bulundu.")
-
-            for row in yacht_rows:
-                try:
-                    row_body = row.find_element(By.CSS_SELECTOR, "[id^='y-']")
-                    row_id = row_body.get_attribute('id')
-                    yacht_id_match = re.search(r'y-(\d+)-', row_id)
-                    yacht_name_element = row.find_element(By.CSS_SELECTOR, ".yachtName")
-                    yacht_name = yacht_name_element.text.strip()
-                    if yacht_id_match:
-                        yacht_ids[yacht_name] = yacht_id_match.group(1)
-                except Exception as row_error:
-                    self.logger.exception("YachtRow işleme hatası:", exc_info=True)
-                    continue
-            self.logger.info(f"Toplam {len(yacht_ids)} adet YACHT ID bulundu: {yacht_ids}")
-            return yacht_ids
-        except Exception as e:
+            yacht_ids = await self.discover_yacht_ids(company_search_text, company_click_text)
+        except NausysSessionExpired:
+            self.logger.warning("Booking list isteğinde oturum düştü, yeniden login olunuyor.")
+            if not await self.refresh_expired_session():
+                return {}
+            try:
+                yacht_ids = await self.discover_yacht_ids(company_search_text, company_click_text)
+            except Exception:
+                self.logger.exception("Yeniden login sonrası yacht ID'leri alınırken hata:", exc_info=True)
+                return {}
+        except Exception:
             self.logger.exception("Yacht ID'leri alınırken hata:", exc_info=True)
             return {}
+        self.logger.info(f"Toplam {len(yacht_ids)} adet YACHT ID bulundu: {yacht_ids}")
 
-    async def scrape_yacht_ids_and_save(self, competitor_name: str, company_search_text: str, company_click_text: str):
-        self.logger.info(f"Scrape süreci başlatıldı: '{company_search_text}' / '{company_click_text}'")
-        if not self.logged_in:
-            if not self.login():
-                self.logger.error("Login başarısız, yat ID'leri çekilemedi.")
-                return []
-
-        self.go_to_booking_list_page()
-        self.select_charter_company_and_search(company_search_text, company_click_text)
-        await asyncio.sleep(2)
-
-        yacht_ids = self.get_yacht_ids_from_page()
         try:
-            db_client = self.db_conf.db_session
-            database = db_client["boat_tracker"]
+            database = self.db_conf.database
             comp_repo = CompetitorRepository(database)
             await comp_repo.upsert_competitor_info(
                 competitor_name=competitor_name,
                 yacht_ids=yacht_ids,
                 search_text=company_search_text,
-                click_text=company_click_text
+                click_text=company_click_text,
+                platform="nausys"
             )
             self.logger.info(f"[{competitor_name}] Çekilen YACHT ID'leri DB'ye kaydedildi: {yacht_ids}")
         except Exception as db_e:
             self.logger.exception("Rakip bilgisi güncellenirken hata:", exc_info=True)
         return yacht_ids
 
+    async def discover_yacht_ids(self, company_search_text: str, company_click_text: str) -> dict:
+        async with NausysJsfClient(self.session.cookie_list(), self.rate_limiter) as client:
+            return await client.discover_yacht_ids(company_search_text, company_click_text)
+
     def get_session_data(self):
         try:
             cookies = self.driver.get_cookies()
@@ -213,18 +214,124 @@ class NausysTracker(BaseTracker):
             self.logger.exception("Session data alma hatası:", exc_info=True)
             return None, None, None, None
 
+    def get_cached_session(self, refresh=False):
+        """
+        Oturum bilgilerini önbellekten döner; önbellek boşsa ya da refresh istenirse driver'dan
+        bir kez okuyup saklar. Böylece her istek için WebDriver'a gidilmez.
+        """
+        if (self.session is None or refresh) and self.driver is None:
+            return self.session
+        if self.session is None or refresh:
+            session = NausysSession(*self.get_session_data())
+            if not session.is_complete():
+                self.session = None
+                return None
+            self.session = session
+            self.logger.info("Nausys oturum bilgileri driver'dan alındı ve önbelleğe kaydedildi.")
+        return self.session
+
+    def invalidate_session(self):
+        self.session = None
+
+    @staticmethod
+    def is_session_expired(resp) -> bool:
+        """Login sayfasına yönlendirme ya da dialog formunun olmaması oturumun düştüğünü gösterir."""
+        if "login" in str(resp.url).lower():
+            return True
+        return b"yachtReservationDialogForm" not in resp.content
+
+    def probe_session(self, session: NausysSession) -> bool:
+        """Booking list sayfasına tek bir GET ile oturumun hâlâ geçerli olup olmadığını kontrol eder."""
+        resp = self.http_session.get(BOOKING_LIST_URL, cookies=session.cookies, timeout=30)
+        return resp.ok and "login" not in str(resp.url).lower() and b"layout-main" in resp.content
+
+    async def restore_session(self) -> bool:
+        """Mongo'da saklanan oturumu yükler; HTTP ile doğrulanırsa tarayıcı açmadan kullanır."""
+        try:
+            record = await self.session_repo.load_session("nausys")
+        except Exception as e:
+            self.logger.warning(f"Kayıtlı Nausys oturumu okunamadı: {e}")
+            return False
+        if not record:
+            return False
+        session = NausysSession.from_record(record)
+        if not session.is_complete() or not await asyncio.to_thread(self.probe_session, session):
+            self.logger.info("Kayıtlı Nausys oturumu geçersiz, yeniden login olunacak.")
+            await self.session_repo.delete_session("nausys")
+            return False
+        self.session = session
+        await self.session_repo.extend_session("nausys", TRACKER_SESSION_TTL_SECONDS)
+        self.logger.info("Kayıtlı Nausys oturumu doğrulandı, tarayıcı açılmadan devam ediliyor.")
+        return True
+
+    async def persist_session(self):
+        if not self.session:
+            return
+        try:
+            await self.session_repo.save_session(
+                "nausys", self.session.cookie_list(), TRACKER_SESSION_TTL_SECONDS, view_state=self.session.view_state
+            )
+        except Exception as e:
+            self.logger.warning(f"Nausys oturumu kaydedilemedi: {e}")
+
+    async def ensure_session(self) -> bool:
+        """Geçerli bir HTTP oturumu sağlar: önce bellekteki, sonra kayıtlı oturum; ikisi de yoksa tarayıcıyla login."""
+        if self.session is not None:
+            return True
+        if await self.restore_session():
+            return True
+        if not await asyncio.to_thread(self.login):
+            return False
+        if not await asyncio.to_thread(self.get_cached_session, True):
+            return False
+        await self.persist_session()
+        return True
+
+    async def keep_session_alive(self) -> bool:
+        """
+        Oturumu yoklar; geçerliyse kayıtlı oturumun süresini uzatır. Oturum çalıştırma sırasında düşmüşse
+        yeniden login olur; böylece login maliyeti sıradaki isteğin yoluna düşmez.
+        """
+        if not self.session:
+            return False
+        await self.rate_limiter.acquire()
+        if await asyncio.to_thread(self.probe_session, self.session):
+            await self.session_repo.extend_session("nausys", TRACKER_SESSION_TTL_SECONDS)
+            return True
+        self.logger.warning("Nausys oturumu çalıştırma sırasında düştü, yeniden login olunuyor.")
+        if not await self.refresh_expired_session():
+            self.logger.error("Nausys oturumu yenilenemedi!")
+            return False
+        return True
+
+    async def refresh_expired_session(self):
+        """Düşen oturum için yeniden login olur, güncel bilgileri driver'dan bir kez daha okuyup kaydeder."""
+        async with self._refresh_lock:
+            self.invalidate_session()
+            self.logged_in = False
+            await self.session_repo.delete_session("nausys")
+            if not await asyncio.to_thread(self.login):
+                return None
+            session = await asyncio.to_thread(self.get_cached_session, True)
+            if session:
+                await self.persist_session()
+            return session
+
     async def fetch_booking_details(self, yacht_id, period_from, period_to):
         """
-        Belirtilen parametrelerle istek gönderilir. Eğer 30 saniyeden uzun süre cevap alınmazsa,
-        max_retries (3) deneme yapılır. Her timeout durumunda DB'ye 'max_request_number_reached'
-        hatası loglanır ve 1 saat beklenir. 3 denemeden sonra hala cevap alınamazsa None döndürülür.
+        Belirtilen parametrelerle istek gönderilir. İstekler paylaşılan adaptif hız sınırlayıcıdan izin
+        alınarak gönderilir. Eğer 30 saniyeden uzun süre cevap alınmazsa, max_retries (3) deneme yapılır.
+        Her timeout durumunda DB'ye 'max_request_number_reached' hatası loglanır ve limiter hızı düşürüp
+        bekleme süresi uygular. 3 denemeden sonra hala cevap alınamazsa None döndürülür.
+        Oturum bilgileri önbellekten kullanılır; oturum düşmüşse bir kez yenilenip istek tekrarlanır.
         """
         max_retries = 3
         attempts = 0
+        session_refreshed = False
         while attempts < max_retries:
             try:
-                jsessionid, view_state, nult, bls = self.get_session_data()
-                if not jsessionid or not view_state or not nult:
+                session = self.get_cached_session()
+                if not session:
                     self.logger.error("Session bilgileri alınamadı!")
                     return None
 
@@ -235,11 +342,6 @@ class NausysTracker(BaseTracker):
                     "Accept-Language": "tr-TR,tr;q=0.9",
                     "Connection": "keep-alive",
                 }
-                cookies = {
-                    "JSESSIONID": jsessionid,
-                    "nult": nult,
-                    "bls_5324314": bls
-                }
                 params = [
                     ("YachtReservationId", "-1"),
                     ("action", "newFromBookingList"),
@@ -253,53 +355,42 @@ class NausysTracker(BaseTracker):
                     ("yachtReservationParams", ""),
                     ("yachtReservationParams", ""),
                 ]
+                await self.rate_limiter.acquire()
+                started = time.monotonic()
                 # Bloklayıcı requests.get çağrısını ayrı thread'de çalıştırmak için:
                 resp = await asyncio.to_thread(
-                    requests.get,
+                    self.http_session.get,
                     url,
                     headers=headers,
-                    cookies=cookies,
+                    cookies=session.cookies,
                     params=params,
                     timeout=30
                 )
+                self.rate_limiter.observe(resp.status_code, time.monotonic() - started, resp.headers)
                 if not resp.ok:
                     self.logger.error(f"API isteği başarısız: {resp.status_code}")
                     return None
-                tree = html.fromstring(resp.content)
-                xpaths = {
-                    "discount_name": '//*[@id="yachtReservationDialogForm:tabView:discountGroup:contentTable:0:discountName"]',
-                    "yacht_name": '//*[@id="yachtReservationDialogForm:tabView:j_idt109"]',
-                    "company_name": '//*[@id="yachtReservationDialogForm:tabView:generalPanel"]/tbody/tr[3]/td[2]/div/div[1]/label',
-                    "port_from": '//*[@id="yachtReservationDialogForm:tabView:generalPanel"]/tbody/tr[7]/td[2]/label',
-                    "port_to": '//*[@id="yachtReservationDialogForm:tabView:generalPanel"]/tbody/tr[8]/td[2]/label',
-                    "deposit": '//*[@id="yachtReservationDialogForm:tabView:generalPanel"]/tbody/tr[10]/td[2]/span[1]',
-                    "discount_percent": '//*[@id="yachtReservationDialogForm:tabView:discountGroup:contentTable_data"]/tr/td[5]/span',
-                    "list_price": '//*[@id="yachtReservationDialogForm:tabView:priceCalculationPanelGrid"]/tbody/tr[1]/td[2]/div/div/span[1]',
-                    "discount": '//*[@id="yachtReservationDialogForm:tabView:priceCalculationPanelGrid"]/tbody/tr[1]/td[2]/div/div/span[3]/span[1]',
-                    "total_price": '//*[@id="yachtReservationDialogForm:tabView:priceCalculationPanelGrid"]/tbody/tr[1]/td[2]/div/div/span[4]',
-                    "commission_percent": '//*[@id="yachtReservationDialogForm:tabView:commissionPercent"]',
-                    "commission": '//*[@id="yachtReservationDialogForm:tabView:priceCalculationPanelGrid"]/tbody/tr[2]/td[2]/div/div[2]/span[1]',
-                    "client_price": '//*[@id="yachtReservationDialogForm:tabView:priceCalculationPanelGrid"]/tbody/tr[4]/td[2]/div/div/span[1]',
-                    "agency_price": '//*[@id="yachtReservationDialogForm:tabView:priceCalculationPanelGrid"]/tbody/tr[5]/td[2]/div/div/span[1]',
-                    "agency_income": '//*[@id="yachtReservationDialogForm:tabView:priceCalculationPanelGrid"]/tbody/tr[6]/td[2]/div/div/span[1]',
-                    "total_advanced_payment": '//*[@id="yachtReservationDialogForm:tabView:priceCalculationPanelGrid"]/tbody/tr[7]/td[2]/div/div/span[1]',
-                }
-                results = {}
-                for key, xp in xpaths.items():
-                    elems = tree.xpath(xp)
-                    if elems:
-                        text_content = elems[0].text_content().strip()
-                        results[key] = text_content
-                    else:
-                        results[key] = None
+                if self.is_session_expired(resp):
+                    if session_refreshed:
+                        self.logger.error("Oturum yenilendikten sonra da dialog formu alınamadı.")
+                        return None
+                    self.logger.warning("Nausys oturumu düşmüş görünüyor, oturum bilgileri yenileniyor...")
+                    session_refreshed = True
+                    if not await self.refresh_expired_session():
+                        self.logger.error("Nausys oturumu yenilenemedi!")
+                        return None
+                    continue
+                results = await get_parse_pool().parse("nausys_booking_details", resp.content)
+                for key, value in results.items():
+                    if value is None:
                         self.logger.warning(f"{key} isimli bilgi bulunamadı.")
                 return results
             except requests.exceptions.Timeout:
+                self.rate_limiter.record_timeout()
                 attempts += 1
                 self.logger.error(f"max_request_number_reached for yacht_id {yacht_id}, attempt {attempts}")
                 try:
-                    db_client = self.db_conf.db_session
-                    database = db_client["boat_tracker"]
+                    database = self.db_conf.database
                     update_log_repo = UpdateLogRepository(database)
                     await update_log_repo.create_one(update_log_repo.collection_name, {
                         "competitor": "N/A",
@@ -311,8 +402,6 @@ class NausysTracker(BaseTracker):
                     })
                 except Exception as log_ex:
                     self.logger.exception("Hata loglanırken hata oluştu:", exc_info=True)
-                self.logger.info("1 saat bekleniyor, ardından tekrar denenecek...")
-                await asyncio.sleep(3600)
             except Exception as e:
                 self.logger.exception("Booking detayları çekerken beklenmeyen hata:", exc_info=True)
                 return None
@@ -337,23 +426,32 @@ class NausysTracker(BaseTracker):
             logging.exception("Haftalık periyot oluşturulurken hata:", exc_info=True)
             return []
 
+    def _run_context(self, database, cancel_event=None) -> NausysRunContext:
+        return NausysRunContext(
+            BookingDataRepository(database, "booking_data_nausys"),
+            UpdateLogRepository(database),
+            ScrapePlanner(ScrapePlanRepository(database), "nausys"),
+            cancel_event,
+        )
+
     async def collect_data_and_save(self):
         """
-        Her rakip için:
+        Her rakip için (rakip listesi competitor koleksiyonundan okunur):
           - Aynı gün güncelleme yapılmış yacht ID'ler kontrol edilip atlanır.
-          - Tüm rakipler arasında (global) 7 yat ID güncellendikten sonra 1 saat beklenir.
+          - İstek hızı sabit beklemeler yerine paylaşılan adaptif hız sınırlayıcı ile ayarlanır.
+          - Sadece ScrapePlanner'a göre yenileme vadesi gelen haftalar sorgulanır, diğerleri önceki
+            dokümandan taşınır.
           - Her güncelleme sonucu (başarılı/hata) UpdateLogRepository aracılığıyla loglanır.
+        Kayıtlı oturum geçerliyse tarayıcı açılmaz; çalıştırma boyunca oturum keep-alive ile canlı tutulur.
         """
-        if not self.logged_in:
-            if not self.login():
-                self.logger.error("Login başarısız oldu, data toplanamıyor.")
-                return
+        if not await self.ensure_session():
+            self.logger.error("Login başarısız oldu, data toplanamıyor.")
+            return
 
         try:
-            db_client = self.db_conf.db_session
-            database = db_client["boat_tracker"]
-            book_repo = BookingDataRepository(database)
-            update_log_repo = UpdateLogRepository(database)
+            database = self.db_conf.database
+            run = self._run_context(database)
+            competitors = await CompetitorRepository(database).get_platform_competitors("nausys")
         except Exception as e:
             self.logger.exception("DB bağlantısı oluşturulurken hata:", exc_info=True)
             return
@@ -362,83 +460,129 @@ class NausysTracker(BaseTracker):
         self.logger.info(f"Toplam {len(date_ranges)} haftalık periyot üretildi.")
 
         total_processed = 0
-        today_dt = datetime.combine(date.today(), datetime.min.time())
-
-        for competitor_name, competitor_data in COMPETITORS.items():
-            if not competitor_data:
-                continue
+        async with session_keepalive(self.keep_session_alive, TRACKER_SESSION_KEEPALIVE_SECONDS, "nausys"):
+            for competitor_name, competitor_data in competitors.items():
+                if not competitor_data:
+                    continue
 
-            self.logger.info(f"\nFirma: {competitor_name}, Veriler: {competitor_data}")
-            yacht_ids_dict = competitor_data.get("yacht_ids", {})
+                self.logger.info(f"\nFirma: {competitor_name}, Veriler: {competitor_data}")
+                yacht_ids_dict = competitor_data.get("yacht_ids", {})
 
-            for yid in yacht_ids_dict.values():
-                query = {
-                    "competitor": competitor_name,
-                    "yacht_id": yid,
-                    "last_update_date": today_dt
-                }
-                try:
-                    log_entry = await update_log_repo.find_one(update_log_repo.collection_name, query)
-                except Exception as e:
-                    self.logger.exception("Update log sorgusu sırasında hata:", exc_info=True)
-                    log_entry = None
+                for yid in yacht_ids_dict.values():
+                    status, _ = await self._update_yacht(run, competitor_name, yid, date_ranges)
+                    if status == "skipped":
+                        continue
+                    total_processed += 1
+                    self.logger.info(f"Toplam güncellenen yat ID sayısı: {total_processed}")
 
-                if log_entry:
-                    self.logger.info(f"Yacht id {yid} zaten güncellendi, atlanıyor.")
-                    continue
+        self.logger.info("Tüm rakipler için data toplama işlemi tamamlandı.")
 
-                self.logger.info(f"-- Yat ID: {yid} güncelleniyor.")
-                doc = {
-                    "yacht_id": yid,
-                    "last_update_date": today_dt,
-                    "booking_periods": []
-                }
+    async def _update_yacht(self, run: NausysRunContext, competitor_name: str, yid: str, date_ranges) -> Tuple[str, int]:
+        """
+        Tek bir yatın vadesi gelen haftalarını çekip kaydeder; ('skipped' | 'updated' | 'partial' | 'error',
+        çekilen hafta sayısı) döner. İptal istenirse sıradaki haftaya geçilmez, çekilenler kaydedilir ('partial').
+        """
+        book_repo, update_log_repo, planner = run.book_repo, run.update_log_repo, run.planner
+        today_dt = datetime.combine(date.today(), datetime.min.time())
+        try:
+            # Sadece başarılı kayıt atlatır; hata ya da yarıda kalan güncelleme tekrar denenir
+            updated_today = await update_log_repo.has_success_on(competitor_name, yid, date.today())
+        except Exception as e:
+            self.logger.exception("Update log sorgusu sırasında hata:", exc_info=True)
+            updated_today = False
+
+        if updated_today:
+            self.logger.info(f"Yacht id {yid} zaten güncellendi, atlanıyor.")
+            return "skipped", 0
+
+        due_ranges = await planner.due_periods(competitor_name, yid, date_ranges)
+        if not due_ranges:
+            self.logger.info(f"Yacht id {yid} için yenilenmesi gereken hafta yok, atlanıyor.")
+            return "skipped", 0
+
+        self.logger.info(f"-- Yat ID: {yid} güncelleniyor ({len(due_ranges)} hafta).")
+        doc = {
+            "yacht_id": yid,
+            "last_update_date": today_dt,
+            "booking_periods": []
+        }
+        attempted = 0
+        try:
+            for (p_from, p_to) in due_ranges:
+                if run.cancelled():
+                    self.logger.info(f"Yacht id {yid}: iptal istendi, çekilen haftalar kaydediliyor.")
+                    break
+                attempted += 1
                 try:
-                    for (p_from, p_to) in date_ranges:
-                        try:
-                            time.sleep(30)
-                            details = await self.fetch_booking_details(yid, p_from, p_to)
-                        except Exception as inner_e:
-                            self.logger.exception("fetch_booking_details sırasında hata:", exc_info=True)
-                            details = None
-                        if details:
-                            doc["booking_periods"].append({
-                                "period_from": p_from,
-                                "period_to": p_to,
-                                "details": [details]
-                            })
-                            self.logger.info(f"  * {p_from} -> {p_to} için veri eklendi.")
-                        else:
-                            self.logger.warning(f"  - {p_from} -> {p_to} için veri bulunamadı.")
-                    await book_repo.save_daily_booking_data(competitor_name, [doc])
-                    await update_log_repo.create_one(update_log_repo.collection_name, {
-                        "competitor": competitor_name,
-                        "yacht_id": yid,
-                        "last_update_date": today_dt,
-                        "status": "success",
-                        "timestamp": datetime.now()
+                    details = await self.fetch_booking_details(yid, p_from, p_to)
+                except Exception as inner_e:
+                    self.logger.exception("fetch_booking_details sırasında hata:", exc_info=True)
+                    details = None
+                if details:
+                    doc["booking_periods"].append({
+                        "period_from": p_from,
+                        "period_to": p_to,
+                        "details": [details]
                     })
-                except Exception as update_err:
-                    self.logger.exception(f"Yacht id {yid} güncellenirken hata:", exc_info=True)
-                    await update_log_repo.create_one(update_log_repo.collection_name, {
-                        "competitor": competitor_name,
-                        "yacht_id": yid,
-                        "last_update_date": today_dt,
-                        "status": "error",
-                        "error": str(update_err),
-                        "timestamp": datetime.now()
-                    })
-                total_processed += 1
-                self.logger.info(f"Toplam güncellenen yat ID sayısı: {total_processed}")
-                if total_processed % 7 == 0:
-                    self.logger.info("7 yat ID güncellendi. 1 saat bekleniyor...")
-                    try:
-                        await asyncio.sleep(3600)
-                    except asyncio.CancelledError:
-                        self.logger.info("Sleep işlemi iptal edildi.")
-                        break
+                    self.logger.info(f"  * {p_from} -> {p_to} için veri eklendi.")
+                else:
+                    self.logger.warning(f"  - {p_from} -> {p_to} için veri bulunamadı.")
+            partial = attempted < len(due_ranges)
+            fetched_periods = doc["booking_periods"]
+            previous_doc = await book_repo.find_booking_doc(competitor_name, yid)
+            doc["booking_periods"] = planner.merge_booking_periods(
+                previous_doc, fetched_periods, due_ranges[:attempted])
+            await book_repo.save_daily_booking_data(competitor_name, [doc])
+            await planner.record_results(competitor_name, yid, fetched_periods, due_ranges[:attempted])
+            await update_log_repo.create_one(update_log_repo.collection_name, {
+                "competitor": competitor_name,
+                "yacht_id": yid,
+                "last_update_date": today_dt,
+                "status": "partial" if partial else "success",
+                "timestamp": datetime.now()
+            })
+            return ("partial" if partial else "updated"), len(fetched_periods)
+        except Exception as update_err:
+            self.logger.exception(f"Yacht id {yid} güncellenirken hata:", exc_info=True)
+            await update_log_repo.create_one(update_log_repo.collection_name, {
+                "competitor": competitor_name,
+                "yacht_id": yid,
+                "last_update_date": today_dt,
+                "status": "error",
+                "error": str(update_err),
+                "timestamp": datetime.now()
+            })
+            return "error", 0
+
+    async def build_scrape_jobs(self, competitor_repo):
+        """Dağıtık kuyruk için her (rakip, yat) kalemini bu çalıştırmanın hafta aralığıyla üretir."""
+        competitors = await competitor_repo.get_platform_competitors("nausys")
+        periods = self.generate_weekly_dates()
+        return [
+            {"competitor": competitor_name, "yacht_name": yacht_name, "yacht_id": yacht_id, "periods": periods}
+            for competitor_name, competitor_data in competitors.items()
+            for yacht_name, yacht_id in (competitor_data or {}).get("yacht_ids", {}).items()
+        ]
+
+    @asynccontextmanager
+    async def job_processor(self, database, cancel_event=None):
+        """
+        Kuyruktaki kalemleri işleyecek fonksiyonu verir; oturum worker çalıştığı sürece keep-alive ile tutulur.
+        cancel_event set edilirse işlenen yat o ana kadar çekilen haftalarla kaydedilir.
+        """
+        if not await self.ensure_session():
+            raise RuntimeError("Nausys oturumu açılamadı.")
+        run = self._run_context(database, cancel_event)
 
-        self.logger.info("Tüm rakipler için data toplama işlemi tamamlandı.")
+        async def process(job):
+            date_ranges = [tuple(period) for period in job["periods"]]
+            status, weeks = await self._update_yacht(run, job["competitor"], job["yacht_id"], date_ranges)
+            if status == "error":
+                raise RuntimeError(f"Yacht id {job['yacht_id']} güncellenemedi.")
+            return {"status": status, "weeks": weeks}
+
+        async with session_keepalive(self.keep_session_alive, TRACKER_SESSION_KEEPALIVE_SECONDS, "nausys"):
+            yield process
 
     @staticmethod
     def format_date_for_api(date_str):
@@ -454,8 +598,7 @@ async def test_nausys_bot():
     logging.basicConfig(level=logging.INFO)
     bot = NausysTracker()
     try:
-        await asyncio.to_thread(bot.setup_driver)
-        if not bot.login():
+        if not await bot.ensure_session():
             logging.error("Initial login failed. Exiting test.")
             return
         await bot.collect_data_and_save()
@@ -464,6 +607,7 @@ async def test_nausys_bot():
         logging.exception("Test sırasında hata oluştu:", exc_info=True)
     finally:
         await asyncio.to_thread(time.sleep, 3)
+        await asyncio.to_thread(bot.cleanup)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,200 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from src.core.tracker import mmk_extractor
+from src.core.tracker.nausys_extractor import extract_booking_details
+from src.infra.config.settings import PARSE_POOL_SIZE, PARSE_POOL_MAX_PENDING
+
+logger = logging.getLogger(__name__)
+
+
+def _decode(content: bytes) -> str:
+    # Trackerların response.encoding = 'utf-8' ile okuduğu metinle aynı sonucu verir
+    return content.decode("utf-8", errors="replace")
+
+
+def _parse_mmk_quote(content: bytes, label: str):
+    return mmk_extractor.parse_price_quote(_decode(content), label)
+
+
+def _parse_mmk_quote_queue(content: bytes, expected_entries: int, label: str):
+    return mmk_extractor.parse_price_quote_queue(_decode(content), expected_entries, label)
+
+
+PARSERS = {
+    "nausys_booking_details": extract_booking_details,
+    "mmk_price_quote": _parse_mmk_quote,
+    "mmk_price_quote_queue": _parse_mmk_quote_queue,
+}
+
+
+_WARM_UP_QUOTE = "<div><div>Price:</div><div>1 €</div><div>Commission 0%</div><div></div></div>"
+
+
+def _warm_worker():
+    """Worker açılırken parser modüllerini yükleyip lxml'i bir kez çalıştırır; ilk gerçek iş soğuk başlamaz."""
+    extract_booking_details(b"<html><body></body></html>")
+    mmk_extractor.parse_price_quote_queue(_WARM_UP_QUOTE, 1, "warm-up")
+
+
+def _run_batch(parser: str, batch: Sequence[Tuple], submitted_at: float) -> Tuple[List[Any], float, float]:
+    # time.monotonic sistem genelinde ortak saat olduğundan süreçler arası bekleme süresi ölçülebilir
+    started = time.monotonic()
+    func = PARSERS[parser]
+    results = [func(*args) for args in batch]
+    return results, started - submitted_at, time.monotonic() - started
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+class ParsePool:
+    """
+    HTML/JSON cevaplarını API'nin event loop'u dışında, sınırlı boyutlu bir süreç havuzunda parse eder.
+    Worker'lara ham byte'lar gider, sonuçlar düz dict/list olarak döner. Aynı anda bekleyen iş sayısı
+    max_pending ile sınırlanır. size 0 verilirse parse işlemi bir thread'de yapılır.
+    """
+
+    def __init__(self, size: int, max_pending: int):
+        self.size = size
+        self.max_pending = max_pending
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop = None
+        self._in_flight = 0
+        self._counters = {"submitted": 0, "completed": 0, "failed": 0, "documents": 0, "restarts": 0}
+        self._timings: Dict[str, Dict[str, float]] = {}
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                methods = multiprocessing.get_all_start_methods()
+                # forkserver: worker'lar uygulamanın thread'lerini (motor, uvicorn) kopyalamadan temiz süreçten açılır
+                context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.size,
+                    mp_context=context,
+                    initializer=_warm_worker
+                )
+            return self._executor
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_pending)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    def _restart(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._counters["restarts"] += 1
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def warm_up(self):
+        """Tüm worker süreçlerini önceden açar (ProcessPoolExecutor süreçleri normalde ilk işte açar)."""
+        if self.size <= 0:
+            _warm_worker()
+            return
+        executor = self._get_executor()
+        started = time.monotonic()
+        pids = {future.result() for future in [executor.submit(_ping) for _ in range(self.size * 2)]}
+        logger.info(f"Parse havuzu hazır: {len(pids)} worker ({time.monotonic() - started:.2f}s).")
+
+    def _record(self, parser: str, documents: int, queue_wait: float, parse_time: float):
+        timing = self._timings.setdefault(parser, {
+            "batches": 0, "documents": 0,
+            "queue_wait_seconds_total": 0.0, "queue_wait_seconds_max": 0.0,
+            "parse_seconds_total": 0.0, "parse_seconds_max": 0.0,
+        })
+        timing["batches"] += 1
+        timing["documents"] += documents
+        timing["queue_wait_seconds_total"] += queue_wait
+        timing["queue_wait_seconds_max"] = max(timing["queue_wait_seconds_max"], queue_wait)
+        timing["parse_seconds_total"] += parse_time
+        timing["parse_seconds_max"] = max(timing["parse_seconds_max"], parse_time)
+        self._counters["documents"] += documents
+
+    async def parse_batch(self, parser: str, batch: Sequence[Tuple]) -> List[Any]:
+        """batch'teki her argüman grubu için PARSERS[parser] sonucunu aynı sırayla döner; tek iş olarak gönderilir."""
+        if parser not in PARSERS:
+            raise ValueError(f"Bilinmeyen parser: {parser}")
+        batch = [tuple(args) for args in batch]
+        async with self._get_semaphore():
+            self._counters["submitted"] += 1
+            self._in_flight += 1
+            try:
+                for attempt in (1, 2):
+                    submitted_at = time.monotonic()
+                    try:
+                        if self.size <= 0:
+                            results, queue_wait, parse_time = await asyncio.to_thread(
+                                _run_batch, parser, batch, submitted_at)
+                        else:
+                            results, queue_wait, parse_time = await asyncio.get_running_loop().run_in_executor(
+                                self._get_executor(), _run_batch, parser, batch, submitted_at)
+                        break
+                    except BrokenProcessPool:
+                        # Bir worker çökerse (ör. OOM) havuz yeniden kurulur ve iş bir kez tekrar denenir
+                        logger.error(f"Parse havuzu bozuldu, yeniden başlatılıyor (deneme {attempt}).")
+                        self._restart()
+                        if attempt == 2:
+                            raise
+            except Exception:
+                self._counters["failed"] += 1
+                raise
+            finally:
+                self._in_flight -= 1
+        self._counters["completed"] += 1
+        self._record(parser, len(batch), queue_wait, parse_time)
+        return results
+
+    async def parse(self, parser: str, *args) -> Any:
+        return (await self.parse_batch(parser, [args]))[0]
+
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        parsers = {}
+        for parser, timing in self._timings.items():
+            batches = timing["batches"]
+            parsers[parser] = {
+                **timing,
+                "queue_wait_seconds_avg": timing["queue_wait_seconds_total"] / batches,
+                "parse_seconds_avg": timing["parse_seconds_total"] / batches,
+            }
+        return {
+            "size": self.size,
+            "max_pending": self.max_pending,
+            "mode": "process" if self.size > 0 else "thread",
+            "in_flight": self._in_flight,
+            **self._counters,
+            "parsers": parsers,
+        }
+
+
+_pool: Optional[ParsePool] = None
+_pool_lock = threading.Lock()
+
+
+def get_parse_pool() -> ParsePool:
+    """Süreç genelinde paylaşılan parse havuzunu döner; yoksa ayarlardaki limitlerle oluşturur."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ParsePool(size=PARSE_POOL_SIZE, max_pending=PARSE_POOL_MAX_PENDING)
+        return _pool
@@ -0,0 +1,94 @@
+import asyncio
+import logging
+import os
+import socket
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from src.infra.adapter.scrape_job_repository import ScrapeJobRepository
+from src.infra.config.settings import (
+    SCRAPE_JOB_LEASE_SECONDS,
+    SCRAPE_JOB_HEARTBEAT_SECONDS,
+    SCRAPE_JOB_MAX_ATTEMPTS,
+)
+
+logger = logging.getLogger(__name__)
+
+JobProcessor = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class ScrapeJobWorker:
+    """
+    Bir run'ın kalemlerini scrape_jobs koleksiyonundan kiralayıp verilen process fonksiyonu ile işler.
+    concurrency kadar kiralama döngüsü paralel çalışır; her kalem işlenirken kira heartbeat ile uzatılır.
+    Kira başka bir worker'a geçmişse (heartbeat başarısız) işlem iptal edilir. cancel_event set edilirse yeni
+    kalem kiralanmaz; işlenmekte olanlar (process aynı event ile kısmi sonucu kaydeder) tamamlanır.
+    """
+
+    def __init__(
+            self,
+            job_repo: ScrapeJobRepository,
+            platform: str,
+            worker_id: Optional[str] = None,
+            concurrency: int = 1,
+            cancel_event: Optional[asyncio.Event] = None
+    ):
+        self.job_repo = job_repo
+        self.platform = platform
+        self.worker_id = worker_id or default_worker_id()
+        self.concurrency = max(1, concurrency)
+        self.cancel_event = cancel_event
+        self.counters = {"done": 0, "partial": 0, "failed": 0, "lost": 0, "weeks": 0}
+
+    async def run(self, run_id: str, process: JobProcessor) -> Dict[str, int]:
+        """Alınabilecek kalem kalmayana kadar çalışır; bu worker'ın işlediği kalem sayılarını döner."""
+        logger.info(f"[{self.platform}] Worker {self.worker_id} run {run_id} için başladı ({self.concurrency} paralel).")
+        await asyncio.gather(*[self._claim_loop(run_id, process) for _ in range(self.concurrency)])
+        await self.job_repo.fail_exhausted(self.platform, run_id, SCRAPE_JOB_MAX_ATTEMPTS)
+        logger.info(f"[{self.platform}] Worker {self.worker_id} run {run_id} için bitti: {self.counters}")
+        return dict(self.counters)
+
+    async def _claim_loop(self, run_id: str, process: JobProcessor):
+        while not (self.cancel_event and self.cancel_event.is_set()):
+            job = await self.job_repo.claim(
+                self.platform, run_id, self.worker_id, SCRAPE_JOB_LEASE_SECONDS, SCRAPE_JOB_MAX_ATTEMPTS)
+            if job is None:
+                return
+            await self._process(job, process)
+
+    async def _process(self, job: Dict[str, Any], process: JobProcessor):
+        label = f"{job['competitor']} - {job.get('yacht_name') or job['yacht_id']}"
+        task = asyncio.create_task(process(job))
+        try:
+            while True:
+                done, _ = await asyncio.wait({task}, timeout=SCRAPE_JOB_HEARTBEAT_SECONDS)
+                if done:
+                    break
+                if not await self.job_repo.heartbeat(job["_id"], self.worker_id, SCRAPE_JOB_LEASE_SECONDS):
+                    logger.warning(f"[{self.platform}] {label}: kira kaybedildi, işlem iptal ediliyor.")
+                    task.cancel()
+                    await asyncio.gather(task, return_exceptions=True)
+                    self.counters["lost"] += 1
+                    return
+            result = task.result()
+        except asyncio.CancelledError:
+            # Worker durdurulursa kalem kirası dolunca başka bir worker tarafından yeniden alınır
+            task.cancel()
+            raise
+        except Exception as e:
+            logger.error(f"[{self.platform}] {label} işlenirken hata: {e}", exc_info=True)
+            await self.job_repo.fail(job["_id"], self.worker_id, str(e), SCRAPE_JOB_MAX_ATTEMPTS)
+            self.counters["failed"] += 1
+            return
+        result = result or {}
+        if result.get("status") == "partial":
+            # Kaydedilen haftalar kalıcıdır; kalem bitmiş sayılmaz, kalan haftalar için tekrar kuyruğa döner
+            await self.job_repo.release(job["_id"], self.worker_id, result)
+            self.counters["partial"] += 1
+        else:
+            await self.job_repo.complete(job["_id"], self.worker_id, result)
+            self.counters["done"] += 1
+        self.counters["weeks"] += result.get("weeks", 0)
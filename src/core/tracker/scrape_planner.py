@@ -0,0 +1,163 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from src.infra.adapter.scrape_plan_repository import ScrapePlanRepository
+
+PERIOD_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# (kalkışa kalan gün üst sınırı, temel yenileme aralığı); yakın haftalar daha sık yenilenir
+DISTANCE_INTERVALS = [
+    (14, timedelta(days=1)),
+    (45, timedelta(days=2)),
+    (90, timedelta(days=4)),
+]
+FAR_INTERVAL = timedelta(days=7)
+MIN_INTERVAL = timedelta(days=1)
+MAX_INTERVAL = timedelta(days=14)
+# Sonuç dönmeyen (dolu, müsait değil, parse hatası) haftada her ardışık boş sonuçta aralık bu katsayıyla büyür
+MISS_BACKOFF = 2
+
+
+def period_key(value) -> str:
+    return value if isinstance(value, str) else value.strftime(PERIOD_FORMAT)
+
+
+def period_departure(value) -> datetime:
+    return datetime.strptime(value, PERIOD_FORMAT) if isinstance(value, str) else value
+
+
+class ScrapePlanner:
+    """
+    Her (rakip, yat, hafta) için kalkışa kalan süreye ve fiyatın geçmişte ne sıklıkla değiştiğine göre
+    bir yenileme aralığı belirler ve bir çalışmada sadece vadesi gelen haftaları döner.
+    """
+
+    def __init__(self, plan_repo: ScrapePlanRepository, platform: str):
+        self.plan_repo = plan_repo
+        self.platform = platform
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    @staticmethod
+    def refresh_interval(departure: datetime, observations: int, changes: int, now: datetime) -> timedelta:
+        days_to_departure = (departure - now).days
+        interval = FAR_INTERVAL
+        for max_days, base_interval in DISTANCE_INTERVALS:
+            if days_to_departure <= max_days:
+                interval = base_interval
+                break
+
+        # Laplace düzeltmeli değişim oranı: az gözlemde aralık temel değerde kalır
+        change_ratio = (changes + 1) / (observations + 2)
+        if change_ratio > 0.5:
+            interval = interval / 2
+        elif change_ratio < 0.15 and observations >= 5:
+            interval = interval * 1.5
+        return max(MIN_INTERVAL, min(MAX_INTERVAL, interval))
+
+    @classmethod
+    def miss_interval(cls, departure: datetime, misses: int, now: datetime) -> timedelta:
+        """Art arda misses kez sonuç dönmeyen hafta için, uzaklık aralığından başlayıp katlanarak büyüyen aralık."""
+        interval = cls.refresh_interval(departure, 0, 0, now) * (MISS_BACKOFF ** max(misses - 1, 0))
+        return max(MIN_INTERVAL, min(MAX_INTERVAL, interval))
+
+    async def due_periods(
+            self,
+            competitor: str,
+            yacht_id: str,
+            periods: Sequence[Tuple[Any, Any]],
+            now: Optional[datetime] = None
+    ) -> List[Tuple[Any, Any]]:
+        """Verilen (başlangıç, bitiş) periyotlarından yenilenmesi gerekenleri, sırası korunarak döner."""
+        now = now or datetime.now()
+        states = await self.plan_repo.get_period_states(self.platform, competitor, yacht_id)
+        due = []
+        for period_from, period_to in periods:
+            if period_departure(period_from) < now:
+                continue
+            state = states.get(period_key(period_from))
+            if state is None or state.get("next_due_at") is None or state["next_due_at"] <= now:
+                due.append((period_from, period_to))
+        self.logger.info(
+            f"[{self.platform}] {competitor}/{yacht_id}: {len(due)}/{len(periods)} hafta yenileme için vadesi gelmiş.")
+        return due
+
+    async def record_results(
+            self,
+            competitor: str,
+            yacht_id: str,
+            booking_periods: List[Dict[str, Any]],
+            queried_periods: Sequence[Tuple[Any, Any]] = (),
+            now: Optional[datetime] = None
+    ):
+        """
+        Çekilen haftaların fiyatlarını kaydeder ve bir sonraki vade zamanlarını hesaplar. queried_periods içinde
+        olup sonuç dönmeyen haftalar için boş sonuç (miss) sayılır; böylece dolu haftalar her çalışmada
+        yeniden sorgulanmaz, ardışık boş sonuçlarda aralık MAX_INTERVAL'e kadar katlanır.
+        """
+        now = now or datetime.now()
+        states = await self.plan_repo.get_period_states(self.platform, competitor, yacht_id)
+        updates = []
+        fetched = set()
+        for period in booking_periods:
+            details = period.get("details") or [{}]
+            price = details[0].get("total_price") if details[0] else None
+            key = period_key(period["period_from"])
+            state = states.get(key, {})
+            observations = state.get("observations", 0)
+            changes = state.get("changes", 0)
+            if observations and state.get("last_price") != price:
+                changes += 1
+            observations += 1
+            interval = self.refresh_interval(period_departure(period["period_from"]), observations, changes, now)
+            fetched.add(key)
+            updates.append({
+                "period_from": key,
+                "period_to": period_key(period["period_to"]),
+                "last_price": price,
+                "observations": observations,
+                "changes": changes,
+                "misses": 0,
+                "last_scraped_at": now,
+                "next_due_at": now + interval,
+            })
+        for period_from, period_to in queried_periods:
+            key = period_key(period_from)
+            if key in fetched:
+                continue
+            misses = states.get(key, {}).get("misses", 0) + 1
+            updates.append({
+                "period_from": key,
+                "period_to": period_key(period_to),
+                "misses": misses,
+                "last_scraped_at": now,
+                "next_due_at": now + self.miss_interval(period_departure(period_from), misses, now),
+            })
+        await self.plan_repo.save_period_states(self.platform, competitor, yacht_id, updates)
+
+    @staticmethod
+    def merge_booking_periods(
+            previous_doc: Optional[Dict[str, Any]],
+            fetched_periods: List[Dict[str, Any]],
+            queried_periods: Sequence[Tuple[Any, Any]],
+            now: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Bu çalışmada sorgulanmayan haftaları bir önceki dokümandan taşıyarak tam bir periyot listesi üretir;
+        karşılaştırma ekranı her zaman en güncel dokümanı okuduğundan günlük doküman eksik kalmamalıdır.
+        Sorgulanıp sonuç dönmeyen haftalar (dolu, müsait değil, parse hatası) eski fiyatla taşınmaz,
+        kalkışı geçmiş haftalar ise dokümandan düşülür.
+        """
+        today = (now or datetime.now()).replace(hour=0, minute=0, second=0, microsecond=0)
+        queried = {period_key(period_from) for period_from, _ in queried_periods}
+        merged = {}
+        previous_doc = previous_doc or {}
+        for period in previous_doc.get("booking_periods") or []:
+            key = period_key(period["period_from"])
+            if key in queried or period_departure(period["period_from"]) < today:
+                continue
+            period.setdefault("scraped_at", previous_doc.get("last_update_date"))
+            merged[key] = period
+        for period in fetched_periods:
+            merged[period_key(period["period_from"])] = period
+        return [merged[key] for key in sorted(merged)]
@@ -0,0 +1,238 @@
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Optional
+
+from apscheduler.events import EVENT_JOB_ERROR, EVENT_JOB_EXECUTED, EVENT_JOB_MISSED, EVENT_JOB_SUBMITTED
+from apscheduler.jobstores.memory import MemoryJobStore
+from apscheduler.jobstores.mongodb import MongoDBJobStore
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.triggers.cron import CronTrigger
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+from src.infra.config.settings import (
+    MMK_SCHEDULE_CRON,
+    NAUSYS_SCHEDULE_CRON,
+    SCHEDULER_TIMEZONE,
+    SCHEDULER_JITTER_SECONDS,
+    SCHEDULER_MISFIRE_GRACE_SECONDS,
+    WEBDRIVER_PREWARM_SECONDS,
+    MONGO_SERVER_SELECTION_TIMEOUT_MS,
+)
+
+logger = logging.getLogger(__name__)
+
+SCHEDULER_COLLECTION = "scheduler_jobs"
+# Platform başına son planlı tetiklenme zamanı; yeniden başlatmadan sonra previous_run buradan okunur
+SCHEDULER_RUNS_COLLECTION = "scheduler_runs"
+
+PLATFORM_CRONS = {
+    "mmk": MMK_SCHEDULE_CRON,
+    "nausys": NAUSYS_SCHEDULE_CRON,
+}
+
+PlatformCallback = Callable[[str], Awaitable[None]]
+
+
+def scrape_job_id(platform: str) -> str:
+    return f"scrape-{platform}"
+
+
+def prewarm_job_id(platform: str) -> str:
+    return f"prewarm-{platform}"
+
+
+def build_trigger(cron_expression: str) -> CronTrigger:
+    """Standart 5 alanlı crontab ifadesinden (dk saat gün ay haftanın-günü) jitter'lı tetikleyici oluşturur."""
+    fields = cron_expression.split()
+    if len(fields) != 5:
+        raise ValueError(f"Geçersiz cron ifadesi: {cron_expression!r}")
+    minute, hour, day, month, day_of_week = fields
+    return CronTrigger(
+        minute=minute,
+        hour=hour,
+        day=day,
+        month=month,
+        day_of_week=day_of_week,
+        timezone=SCHEDULER_TIMEZONE or None,
+        jitter=SCHEDULER_JITTER_SECONDS or None
+    )
+
+
+async def run_scheduled_scrape(platform: str):
+    """Mongo job store'a referans olarak yazılan fonksiyon; çalıştırmayı bu süreçteki zamanlayıcıya yönlendirir."""
+    scheduler = get_scrape_scheduler()
+    if scheduler is None:
+        logger.error(f"[{platform}] Zamanlayıcı başlatılmamış, planlı çalıştırma atlandı.")
+        return
+    await scheduler.run_scrape(platform)
+
+
+async def run_scheduled_prewarm(platform: str):
+    scheduler = get_scrape_scheduler()
+    if scheduler is not None:
+        await scheduler.prewarm(platform)
+
+
+class ScrapeScheduler:
+    """
+    Platform çalıştırmalarını cron ifadesine göre APScheduler ile planlar. Planlı job'lar Mongo'daki
+    scheduler_jobs koleksiyonunda saklandığından yeniden başlatmada kaybolmaz; kesinti sırasında kaçırılan
+    çalıştırma misfire_grace_time içinde tek sefer (coalesce) telafi edilir ve aynı job üst üste binmez
+    (max_instances=1). Çalıştırmadan önceki tarayıcı ısıtma job'ı sadece bellekte tutulur.
+    """
+
+    def __init__(self, database_url: str, database_name: str, run_scrape: PlatformCallback, prewarm: PlatformCallback):
+        self.run_scrape = run_scrape
+        self.prewarm = prewarm
+        self.previous_runs: Dict[str, datetime] = {}
+        self._closed = False
+        self._client = MongoClient(
+            database_url, serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS, tz_aware=True)
+        self._runs = self._client[database_name][SCHEDULER_RUNS_COLLECTION]
+        self._scheduler = AsyncIOScheduler(
+            jobstores={
+                "default": MongoDBJobStore(
+                    database=database_name,
+                    collection=SCHEDULER_COLLECTION,
+                    client=self._client
+                ),
+                "memory": MemoryJobStore(),
+            },
+            job_defaults={
+                "coalesce": True,
+                "max_instances": 1,
+                "misfire_grace_time": SCHEDULER_MISFIRE_GRACE_SECONDS,
+            },
+            timezone=SCHEDULER_TIMEZONE or None
+        )
+        self._scheduler.add_listener(self._on_submitted, EVENT_JOB_SUBMITTED)
+        self._scheduler.add_listener(self._on_finished, EVENT_JOB_EXECUTED | EVENT_JOB_ERROR | EVENT_JOB_MISSED)
+
+    def start(self):
+        """
+        Zamanlayıcıyı başlatır; job store'da kayıtlı platform job'larının tetikleyicisini güncel ayarlarla eşitler
+        ve son tetiklenme zamanlarını Mongo'dan yükler.
+        """
+        self._load_previous_runs()
+        self._scheduler.start()
+        for platform in self.scheduled_platforms():
+            self.schedule(platform, reschedule_only=True)
+
+    def shutdown(self):
+        if self._closed:
+            return
+        self._closed = True
+        if self._scheduler.running:
+            self._scheduler.shutdown(wait=False)
+        self._client.close()
+
+    def scheduled_platforms(self):
+        return [
+            job.args[0] for job in self._scheduler.get_jobs(jobstore="default")
+            if job.id == scrape_job_id(job.args[0])
+        ]
+
+    def schedule(self, platform: str, reschedule_only: bool = False):
+        """
+        Platformun cron job'ını ekler. Job zaten kayıtlıysa sadece tetikleyici değiştiyse yeniden planlanır;
+        böylece yeniden başlatma, kaçırılmış çalıştırmanın kayıtlı zamanını silmez.
+        """
+        trigger = build_trigger(PLATFORM_CRONS[platform])
+        job = self._scheduler.get_job(scrape_job_id(platform), jobstore="default")
+        if job is None:
+            if reschedule_only:
+                return
+            self._scheduler.add_job(
+                run_scheduled_scrape,
+                trigger=trigger,
+                args=[platform],
+                id=scrape_job_id(platform),
+                name=f"{platform} scrape",
+                jobstore="default",
+                replace_existing=True
+            )
+            logger.info(f"[{platform}] Planlı çalıştırma eklendi: {PLATFORM_CRONS[platform]}")
+        elif repr(job.trigger) != repr(trigger):
+            self._scheduler.reschedule_job(job.id, jobstore="default", trigger=trigger)
+            logger.info(f"[{platform}] Planlı çalıştırma güncellendi: {PLATFORM_CRONS[platform]}")
+        self._schedule_prewarm(platform)
+
+    def unschedule(self, platform: str):
+        for job_id, jobstore in ((scrape_job_id(platform), "default"), (prewarm_job_id(platform), "memory")):
+            if self._scheduler.get_job(job_id, jobstore=jobstore) is not None:
+                self._scheduler.remove_job(job_id, jobstore=jobstore)
+
+    def next_run(self, platform: str) -> Optional[datetime]:
+        job = self._scheduler.get_job(scrape_job_id(platform), jobstore="default")
+        return job.next_run_time if job is not None else None
+
+    def _schedule_prewarm(self, platform: str):
+        next_run = self.next_run(platform)
+        if next_run is None:
+            return
+        run_date = next_run - timedelta(seconds=WEBDRIVER_PREWARM_SECONDS)
+        if run_date <= datetime.now(run_date.tzinfo):
+            return
+        self._scheduler.add_job(
+            run_scheduled_prewarm,
+            trigger="date",
+            run_date=run_date,
+            args=[platform],
+            id=prewarm_job_id(platform),
+            jobstore="memory",
+            replace_existing=True
+        )
+
+    @staticmethod
+    def _platform_of(job_id: str) -> Optional[str]:
+        prefix = scrape_job_id("")
+        return job_id[len(prefix):] if job_id.startswith(prefix) else None
+
+    def _load_previous_runs(self):
+        try:
+            for doc in self._runs.find({}, {"previous_run": 1}):
+                self.previous_runs[doc["_id"]] = doc["previous_run"].astimezone(self._scheduler.timezone)
+        except PyMongoError as e:
+            logger.warning(f"Son planlı çalıştırma zamanları okunamadı: {e}")
+
+    def _on_submitted(self, event):
+        platform = self._platform_of(event.job_id)
+        if platform and event.scheduled_run_times:
+            previous_run = event.scheduled_run_times[-1]
+            self.previous_runs[platform] = previous_run
+            try:
+                self._runs.update_one({"_id": platform}, {"$set": {"previous_run": previous_run}}, upsert=True)
+            except PyMongoError as e:
+                logger.warning(f"[{platform}] Son planlı çalıştırma zamanı kaydedilemedi: {e}")
+
+    def _on_finished(self, event):
+        platform = self._platform_of(event.job_id)
+        if platform is None:
+            return
+        if event.code == EVENT_JOB_MISSED:
+            logger.warning(f"[{platform}] Planlı çalıştırma kaçırıldı ({event.scheduled_run_time}).")
+        self._schedule_prewarm(platform)
+
+
+_scheduler: Optional[ScrapeScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def init_scrape_scheduler(
+        database_url: str,
+        database_name: str,
+        run_scrape: PlatformCallback,
+        prewarm: PlatformCallback
+) -> ScrapeScheduler:
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is not None:
+            _scheduler.shutdown()
+        _scheduler = ScrapeScheduler(database_url, database_name, run_scrape, prewarm)
+        return _scheduler
+
+
+def get_scrape_scheduler() -> Optional[ScrapeScheduler]:
+    return _scheduler
@@ -0,0 +1,33 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def session_keepalive(probe: Callable[[], Awaitable[bool]], interval_seconds: float, label: str):
+    """
+    Blok süresince oturumu interval_seconds aralıkla probe() ile yoklar; böylece uzun çalıştırmalarda
+    sunucu tarafı oturum zaman aşımına düşmez. probe() düşen oturumu kendisi yeniden login ile yeniler;
+    yenileme de başarısız olursa False döner, durum loglanır ve bir sonraki denemede tekrar yoklanır.
+    """
+    async def _loop():
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                if not await probe():
+                    logger.warning(f"[{label}] Keep-alive: oturum geçersiz görünüyor.")
+            except Exception as e:
+                logger.warning(f"[{label}] Keep-alive isteği başarısız: {e}")
+
+    task = asyncio.create_task(_loop())
+    try:
+        yield
+    finally:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
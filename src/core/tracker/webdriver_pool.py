@@ -0,0 +1,290 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+
+from src.infra.config.settings import (
+    CHROME_BINARY_PATH,
+    CHROMEDRIVER_PATH,
+    WEBDRIVER_POOL_SIZE,
+    WEBDRIVER_MAX_PAGE_LOADS,
+    WEBDRIVER_MAX_RSS_MB,
+    WEBDRIVER_ACQUIRE_TIMEOUT_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def create_chrome_driver():
+    """Tüm trackerların kullandığı ortak headless Chrome kurulumu."""
+    options = webdriver.ChromeOptions()
+    # Docker için gerekli argümanlar
+    options.add_argument('--headless')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument('--disable-gpu')
+    options.add_argument('--window-size=1920,1080')
+    if CHROME_BINARY_PATH and os.path.exists(CHROME_BINARY_PATH):
+        options.binary_location = CHROME_BINARY_PATH
+
+    if CHROMEDRIVER_PATH and os.path.exists(CHROMEDRIVER_PATH):
+        service = Service(CHROMEDRIVER_PATH)
+    else:
+        service = Service(ChromeDriverManager().install())
+    driver = webdriver.Chrome(service=service, options=options)
+    driver.implicitly_wait(10)
+    return driver
+
+
+def _process_tree_rss_bytes(root_pid: int) -> Optional[int]:
+    """root_pid ve tüm alt süreçlerinin (chromedriver -> chrome -> renderer'lar) toplam RSS'ini /proc'tan okur."""
+    if not os.path.isdir("/proc"):
+        return None
+    children: Dict[int, List[int]] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # comm alanı parantez içinde ve boşluk içerebilir; ppid kapanış parantezinden sonraki ikinci alan
+        ppid = int(stat[stat.rfind(")") + 2:].split()[1])
+        children.setdefault(ppid, []).append(int(entry))
+
+    total = 0
+    pending = [root_pid]
+    while pending:
+        pid = pending.pop()
+        pending.extend(children.get(pid, []))
+        try:
+            with open(f"/proc/{pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1]) * 1024
+                        break
+        except OSError:
+            continue
+    return total
+
+
+class PooledDriver:
+    """
+    Havuzdaki bir WebDriver'ı saran vekil nesne. Trackerlar bunu normal driver gibi kullanır;
+    get() çağrıları geri dönüşüm kararı için sayılır.
+    """
+
+    def __init__(self, driver, instance_id: int):
+        self._driver = driver
+        self.instance_id = instance_id
+        self.page_loads = 0
+        self.leases = 0
+        self.created_at = time.time()
+
+    def get(self, url: str):
+        self.page_loads += 1
+        return self._driver.get(url)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._driver, name)
+
+    @property
+    def pid(self) -> Optional[int]:
+        try:
+            return self._driver.service.process.pid
+        except AttributeError:
+            return None
+
+    def rss_bytes(self) -> Optional[int]:
+        return _process_tree_rss_bytes(self.pid) if self.pid else None
+
+    def is_healthy(self) -> bool:
+        try:
+            return self._driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def quit(self):
+        try:
+            self._driver.quit()
+        except Exception as e:
+            logger.warning(f"[webdriver #{self.instance_id}] Kapatılırken hata: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "instance_id": self.instance_id,
+            "page_loads": self.page_loads,
+            "leases": self.leases,
+            "age_seconds": time.time() - self.created_at,
+            "rss_bytes": self.rss_bytes(),
+        }
+
+
+class WebDriverPool:
+    """
+    Önceden açılmış headless Chrome örneklerini kiralama (lease) usulüyle dağıtan havuz.
+    Kiralanırken sağlık kontrolü yapılır; iade edilen örnek max_page_loads sayfa yüklemesini ya da
+    max_rss_bytes bellek sınırını aşmışsa kapatılıp yerine yenisi açılır.
+    Selenium senkron olduğundan metotlar thread-safe ve bloklayıcıdır; async kodda asyncio.to_thread ile çağrılır.
+    """
+
+    def __init__(
+            self,
+            size: int,
+            max_page_loads: int,
+            max_rss_bytes: int,
+            factory: Callable[[], Any] = create_chrome_driver
+    ):
+        self.size = size
+        self.max_page_loads = max_page_loads
+        self.max_rss_bytes = max_rss_bytes
+        self._factory = factory
+        self._idle = deque()
+        self._leased: Dict[int, PooledDriver] = {}
+        self._starting = 0
+        self._next_id = 1
+        self._condition = threading.Condition()
+        self._counters = {"created": 0, "recycled": 0, "health_failures": 0, "acquire_timeouts": 0}
+
+    def _total(self) -> int:
+        return len(self._idle) + len(self._leased) + self._starting
+
+    def _launch(self) -> PooledDriver:
+        with self._condition:
+            instance_id = self._next_id
+            self._next_id += 1
+        started = time.monotonic()
+        driver = PooledDriver(self._factory(), instance_id)
+        logger.info(f"[webdriver #{instance_id}] Başlatıldı ({time.monotonic() - started:.1f}s).")
+        with self._condition:
+            self._counters["created"] += 1
+        return driver
+
+    def _needs_recycle(self, driver: PooledDriver) -> Optional[str]:
+        if driver.page_loads >= self.max_page_loads:
+            return f"{driver.page_loads} sayfa yüklemesi"
+        rss = driver.rss_bytes()
+        if rss is not None and rss > self.max_rss_bytes:
+            return f"RSS {rss // (1024 * 1024)} MB"
+        return None
+
+    def acquire(self, timeout: float = WEBDRIVER_ACQUIRE_TIMEOUT_SECONDS) -> PooledDriver:
+        deadline = time.monotonic() + timeout
+        while True:
+            launch = False
+            with self._condition:
+                while not self._idle and self._total() >= self.size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._counters["acquire_timeouts"] += 1
+                        raise TimeoutError(f"{timeout}s içinde boş WebDriver bulunamadı.")
+                    self._condition.wait(remaining)
+                if self._idle:
+                    driver = self._idle.popleft()
+                else:
+                    self._starting += 1
+                    launch = True
+
+            if launch:
+                try:
+                    driver = self._launch()
+                finally:
+                    with self._condition:
+                        self._starting -= 1
+            elif not driver.is_healthy():
+                logger.warning(f"[webdriver #{driver.instance_id}] Sağlık kontrolü başarısız, yenisi açılıyor.")
+                driver.quit()
+                with self._condition:
+                    self._counters["health_failures"] += 1
+                    self._condition.notify()
+                continue
+
+            with self._condition:
+                driver.leases += 1
+                self._leased[driver.instance_id] = driver
+            return driver
+
+    def release(self, driver: PooledDriver):
+        reason = self._needs_recycle(driver)
+        if reason:
+            logger.info(f"[webdriver #{driver.instance_id}] Geri dönüştürülüyor: {reason}.")
+            driver.quit()
+        with self._condition:
+            self._leased.pop(driver.instance_id, None)
+            if reason:
+                self._counters["recycled"] += 1
+            else:
+                self._idle.append(driver)
+            self._condition.notify()
+
+    def warm_up(self, count: Optional[int] = None):
+        """Havuzu verilen sayıya (varsayılan: size) kadar boşta bekleyen örnekle doldurur."""
+        target = min(self.size, count if count is not None else self.size)
+        while True:
+            with self._condition:
+                if len(self._idle) >= target or self._total() >= self.size:
+                    return
+                self._starting += 1
+            try:
+                driver = self._launch()
+            finally:
+                with self._condition:
+                    self._starting -= 1
+            with self._condition:
+                self._idle.append(driver)
+                self._condition.notify()
+
+    def close_idle(self) -> int:
+        """Boşta bekleyen örnekleri kapatır; çalıştırmalar arasında bellek tutulmaz."""
+        with self._condition:
+            idle = list(self._idle)
+            self._idle.clear()
+        for driver in idle:
+            driver.quit()
+        return len(idle)
+
+    def close(self):
+        with self._condition:
+            drivers = list(self._idle) + list(self._leased.values())
+            self._idle.clear()
+            self._leased.clear()
+        for driver in drivers:
+            driver.quit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            idle = list(self._idle)
+            leased = list(self._leased.values())
+            counters = dict(self._counters)
+        return {
+            "size": self.size,
+            "max_page_loads": self.max_page_loads,
+            "max_rss_bytes": self.max_rss_bytes,
+            "idle": [driver.stats() for driver in idle],
+            "leased": [driver.stats() for driver in leased],
+            **counters,
+        }
+
+
+_pool: Optional[WebDriverPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_webdriver_pool() -> WebDriverPool:
+    """Süreç genelinde paylaşılan havuzu döner; yoksa ayarlardaki limitlerle oluşturur."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = WebDriverPool(
+                size=WEBDRIVER_POOL_SIZE,
+                max_page_loads=WEBDRIVER_MAX_PAGE_LOADS,
+                max_rss_bytes=WEBDRIVER_MAX_RSS_MB * 1024 * 1024,
+            )
+        return _pool
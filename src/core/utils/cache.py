@@ -0,0 +1,78 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class LRUTTLCache:
+    """
+    En fazla max_entries kayıt tutan, her kaydı ttl_seconds sonra geçersiz sayan LRU önbellek.
+    Kapasite dolduğunda en uzun süredir kullanılmayan kayıt atılır.
+    """
+
+    def __init__(self, name: str, max_entries: int, ttl_seconds: float):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self._counters["expirations"] += 1
+                self._counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counters["hits"] += 1
+            return value
+
+    def set(self, key: Hashable, value: Any):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def invalidate(self, predicate: Optional[Callable[[Hashable], bool]] = None) -> int:
+        """predicate verilmezse tüm kayıtları, verilirse sadece eşleşen anahtarları siler."""
+        with self._lock:
+            keys = [key for key in self._entries if predicate is None or predicate(key)]
+            for key in keys:
+                del self._entries[key]
+            self._counters["invalidations"] += len(keys)
+            return len(keys)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                "name": self.name,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hit_ratio": self._counters["hits"] / lookups if lookups else None,
+                **self._counters,
+            }
+
+
+_caches: Dict[str, LRUTTLCache] = {}
+
+
+def get_cache(name: str, max_entries: int, ttl_seconds: float) -> LRUTTLCache:
+    """İsim için paylaşılan önbelleği döner; yoksa verilen limitlerle oluşturur."""
+    if name not in _caches:
+        _caches[name] = LRUTTLCache(name, max_entries, ttl_seconds)
+    return _caches[name]
+
+
+def get_cache_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: cache.stats() for name, cache in _caches.items()}
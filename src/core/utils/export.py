@@ -0,0 +1,138 @@
+import csv
+import io
+from typing import Any, AsyncIterator, Dict, Iterable, List
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+}
+
+EXPORT_COLUMNS = (
+    ("scrape_date", "timestamp"),
+    ("competitor", "string"),
+    ("yacht_id", "string"),
+    ("yacht_name", "string"),
+    ("period_from", "string"),
+    ("period_to", "string"),
+    ("total_price_cents", "int"),
+    ("list_price_cents", "int"),
+    ("discount_cents", "int"),
+    ("commission_cents", "int"),
+    ("deposit_cents", "int"),
+    ("discount_percent_value", "float"),
+    ("commission_percent_value", "float"),
+)
+
+
+async def iter_batches(rows: AsyncIterator[Dict[str, Any]], batch_size: int) -> AsyncIterator[List[Dict[str, Any]]]:
+    batch = []
+    async for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class _StreamSink(io.RawIOBase):
+    """
+    Yazılan byte'ları biriktirip drain() ile teslim eden çıktı. tell() toplam yazılan miktarı döner;
+    Parquet footer'ındaki offset'ler bu değere göre hesaplandığından buffer boşaltılsa da doğru kalır.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _arrow_schema():
+    import pyarrow as pa
+
+    types = {"timestamp": pa.timestamp("ms"), "string": pa.string(), "int": pa.int64(), "float": pa.float64()}
+    return pa.schema([(name, types[kind]) for name, kind in EXPORT_COLUMNS])
+
+
+def _arrow_table(schema, batch: Iterable[Dict[str, Any]]):
+    import pyarrow as pa
+
+    return pa.Table.from_pylist(list(batch), schema=schema)
+
+
+async def _csv_chunks(batches: AsyncIterator[List[Dict[str, Any]]]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=[name for name, _ in EXPORT_COLUMNS], extrasaction="ignore")
+    writer.writeheader()
+    async for batch in batches:
+        writer.writerows(batch)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+async def _parquet_chunks(batches: AsyncIterator[List[Dict[str, Any]]]) -> AsyncIterator[bytes]:
+    import pyarrow.parquet as pq
+
+    schema = _arrow_schema()
+    sink = _StreamSink()
+    writer = pq.ParquetWriter(sink, schema, compression="snappy")
+    try:
+        # Her batch ayrı bir row group olarak yazılır ve hemen gönderilir
+        async for batch in batches:
+            writer.write_table(_arrow_table(schema, batch))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+async def _arrow_chunks(batches: AsyncIterator[List[Dict[str, Any]]]) -> AsyncIterator[bytes]:
+    import pyarrow as pa
+
+    schema = _arrow_schema()
+    sink = _StreamSink()
+    writer = pa.ipc.new_stream(sink, schema)
+    try:
+        async for batch in batches:
+            writer.write_table(_arrow_table(schema, batch))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def stream_export(
+        rows: AsyncIterator[Dict[str, Any]],
+        export_format: str,
+        batch_size: int
+) -> AsyncIterator[bytes]:
+    """Satırları batch_size'lık gruplar halinde istenen formatta byte parçalarına çevirir."""
+    batches = iter_batches(rows, batch_size)
+    if export_format == "csv":
+        return _csv_chunks(batches)
+    if export_format == "parquet":
+        return _parquet_chunks(batches)
+    if export_format == "arrow":
+        return _arrow_chunks(batches)
+    raise ValueError(f"Desteklenmeyen export formatı: {export_format}")
@@ -0,0 +1,34 @@
+from typing import Dict, List, Optional
+import httpx
+
+from src.infra.config.settings import (
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    HTTP_KEEPALIVE_EXPIRY_SECONDS,
+    HTTP_TIMEOUT_SECONDS,
+)
+
+
+def create_async_client(
+        cookies: Optional[List[Dict]] = None,
+        headers: Optional[Dict[str, str]] = None
+) -> httpx.AsyncClient:
+    """
+    Keep-alive bağlantı havuzu kullanan asenkron HTTP client oluşturur.
+    `cookies` Selenium'un get_cookies() çıktısı formatında verilebilir.
+    """
+    jar = httpx.Cookies()
+    for cookie in cookies or []:
+        jar.set(cookie["name"], cookie["value"])
+
+    return httpx.AsyncClient(
+        cookies=jar,
+        headers=headers,
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+        timeout=httpx.Timeout(HTTP_TIMEOUT_SECONDS),
+        follow_redirects=True,
+    )
@@ -0,0 +1,85 @@
+import re
+from typing import Any, Dict, Optional
+
+# Detay sözlüklerindeki tutar alanları (tam sayı kuruş olarak saklanır) ve yüzde alanları
+MONEY_FIELDS = (
+    "deposit",
+    "list_price",
+    "discount",
+    "total_price",
+    "commission",
+    "client_price",
+    "agency_price",
+    "agency_income",
+    "total_advanced_payment",
+)
+PERCENT_FIELDS = ("discount_percent", "commission_percent")
+
+_NON_NUMERIC = re.compile(r"[^\d,\.]")
+_SEPARATORS = re.compile(r"[,\.]")
+
+
+def _split_number(text: str):
+    """'1.234,56' / '1,234.56' / '1234' metnini (tam kısım, ondalık kısım) olarak ayırır."""
+    digits = _NON_NUMERIC.sub("", text)
+    if not re.search(r"\d", digits):
+        return None
+    last_sep = max(digits.rfind(","), digits.rfind("."))
+    # Son ayraçtan sonra 1-2 hane varsa ondalık ayraçtır; 3 hane binlik ayraç demektir
+    if last_sep != -1 and len(digits) - last_sep - 1 in (1, 2):
+        return _SEPARATORS.sub("", digits[:last_sep]) or "0", digits[last_sep + 1:]
+    return _SEPARATORS.sub("", digits) or "0", ""
+
+
+def parse_amount_cents(value: Any) -> Optional[int]:
+    """Sayı ya da Avrupa/ABD formatlı tutar metnini tam sayı kuruşa çevirir."""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(round(value * 100))
+    text = str(value).strip()
+    parts = _split_number(text)
+    if parts is None:
+        return None
+    integer, fraction = parts
+    cents = int(integer) * 100 + int(fraction.ljust(2, "0"))
+    return -cents if text.startswith("-") else cents
+
+
+def parse_percent(value: Any) -> Optional[float]:
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).strip()
+    parts = _split_number(text)
+    if parts is None:
+        return None
+    integer, fraction = parts
+    percent = float(f"{integer}.{fraction or '0'}")
+    return -percent if text.startswith("-") else percent
+
+
+def format_cents(cents: Optional[int]) -> str:
+    """Kuruş değerini ekranda gösterilecek '1.234,56' formatına çevirir."""
+    if cents is None:
+        return ""
+    s = "{:,.2f}".format(cents / 100)
+    return s.replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+def normalize_details(details: Dict[str, Any]) -> Dict[str, Any]:
+    """Detay sözlüğüne tutarlar için '<alan>_cents', yüzdeler için '<alan>_value' sayısal alanlarını ekler."""
+    for field in MONEY_FIELDS:
+        details[f"{field}_cents"] = parse_amount_cents(details.get(field))
+    for field in PERCENT_FIELDS:
+        details[f"{field}_value"] = parse_percent(details.get(field))
+    return details
+
+
+def normalize_booking_periods(booking_periods):
+    for period in booking_periods:
+        for details in period.get("details") or []:
+            if details:
+                normalize_details(details)
+    return booking_periods
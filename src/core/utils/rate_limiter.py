@@ -0,0 +1,156 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+THROTTLE_STATUS_CODES = (429, 503)
+
+
+class AdaptiveRateLimiter:
+    """
+    Host başına token-bucket hız sınırlayıcı.
+    Sağlıklı cevaplarda hızı kademeli (toplamsal) artırır; yavaşlama, hata ve timeout'larda
+    çarpımsal olarak düşürür. Throttling sinyallerinde (429/503, timeout) ayrıca bir süre tamamen bekler.
+    """
+
+    def __init__(
+            self,
+            host: str,
+            rate: float,
+            min_rate: float,
+            max_rate: float,
+            cooldown_seconds: float,
+            burst: float = 1.0,
+            increase_ratio: float = 0.05,
+            decrease_factor: float = 0.5,
+            latency_factor: float = 2.0,
+    ):
+        self.host = host
+        self.initial_rate = rate
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.cooldown_seconds = cooldown_seconds
+        self.burst = burst
+        self.increase_step = rate * increase_ratio
+        self.decrease_factor = decrease_factor
+        self.latency_factor = latency_factor
+
+        self._tokens = burst
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+        self._latency_ewma: Optional[float] = None
+        self._latency_baseline: Optional[float] = None
+        self._counters = {"requests": 0, "successes": 0, "errors": 0, "throttled": 0, "timeouts": 0}
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    async def acquire(self):
+        """Bir istek hakkı alınana kadar bekler."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    self._counters["requests"] += 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def _decrease(self, factor: float):
+        self.rate = max(self.min_rate, self.rate * factor)
+
+    def _pause(self, seconds: float):
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = 0
+
+    def record_success(self, latency: float):
+        self._counters["successes"] += 1
+        if self._latency_ewma is None:
+            self._latency_ewma = latency
+            self._latency_baseline = latency
+        else:
+            self._latency_ewma = 0.3 * latency + 0.7 * self._latency_ewma
+            self._latency_baseline = min(self._latency_baseline * 1.01, self._latency_ewma)
+
+        if self._latency_ewma > self._latency_baseline * self.latency_factor:
+            self._decrease(0.9)
+        else:
+            self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+    def record_error(self, status_code: int, retry_after: Optional[float] = None):
+        if status_code in THROTTLE_STATUS_CODES:
+            self._counters["throttled"] += 1
+            self._decrease(self.decrease_factor ** 2)
+            self._pause(retry_after if retry_after is not None else self.cooldown_seconds)
+            logger.warning(
+                f"[{self.host}] Throttling ({status_code}); hız {self.rate:.4f} req/s, "
+                f"{retry_after if retry_after is not None else self.cooldown_seconds}s bekleniyor."
+            )
+        elif status_code >= 500:
+            self._counters["errors"] += 1
+            self._decrease(self.decrease_factor)
+        else:
+            self._counters["errors"] += 1
+
+    def record_timeout(self):
+        self._counters["timeouts"] += 1
+        self._decrease(self.decrease_factor)
+        self._pause(self.cooldown_seconds)
+        logger.warning(f"[{self.host}] Timeout; hız {self.rate:.4f} req/s, {self.cooldown_seconds}s bekleniyor.")
+
+    def observe(self, status_code: int, latency: float, headers: Optional[Dict[str, str]] = None):
+        """HTTP cevabına göre uygun record_* metodunu çağırır."""
+        if status_code < 400:
+            self.record_success(latency)
+            return
+        retry_after = None
+        if headers and headers.get("Retry-After", "").isdigit():
+            retry_after = float(headers["Retry-After"])
+        self.record_error(status_code, retry_after)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "host": self.host,
+            "rate": self.rate,
+            "initial_rate": self.initial_rate,
+            "paused_for_seconds": max(0.0, self._paused_until - time.monotonic()),
+            "latency_ewma": self._latency_ewma,
+            **self._counters,
+        }
+
+
+_limiters: Dict[str, AdaptiveRateLimiter] = {}
+
+
+def get_rate_limiter(
+        host: str,
+        interval_seconds: float,
+        min_interval_seconds: float,
+        max_interval_seconds: float,
+        cooldown_seconds: float,
+        burst: float = 1.0
+) -> AdaptiveRateLimiter:
+    """Host için paylaşılan limiter'ı döner; yoksa verilen başlangıç değerleriyle oluşturur."""
+    if host not in _limiters:
+        _limiters[host] = AdaptiveRateLimiter(
+            host=host,
+            rate=1.0 / interval_seconds,
+            min_rate=1.0 / max_interval_seconds,
+            max_rate=1.0 / min_interval_seconds,
+            cooldown_seconds=cooldown_seconds,
+            burst=burst,
+        )
+    return _limiters[host]
+
+
+def get_rate_limiter_stats() -> Dict[str, Dict[str, Any]]:
+    return {host: limiter.stats() for host, limiter in _limiters.items()}
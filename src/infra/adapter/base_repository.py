@@ -1,11 +1,52 @@
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from typing import Any, Dict, List
+from pymongo import IndexModel, ReturnDocument
+from pymongo.results import BulkWriteResult, UpdateResult
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from src.infra.adapter.query_plan import assert_indexed_aggregate, assert_indexed_query
+from src.infra.config.settings import MONGO_EXPLAIN_QUERIES, MONGO_CURSOR_BATCH_SIZE
 
 
 class BaseRepository:
+    # Alt sınıflar koleksiyonlarında ihtiyaç duydukları index'leri burada tanımlar.
+    indexes: List[IndexModel] = []
+    # Yerine yenisi tanımlanan eski index'lerin adları; ensure_indexes sırasında varsa silinir.
+    obsolete_indexes: List[str] = []
+
     def __init__(self, db: AsyncIOMotorDatabase):
         self._db = db
 
+    async def ensure_indexes(self) -> List[str]:
+        await self.drop_obsolete_indexes()
+        if not self.indexes:
+            return []
+        return await self._db[self.collection_name].create_indexes(self.indexes)
+
+    async def drop_obsolete_indexes(self) -> List[str]:
+        if not self.obsolete_indexes:
+            return []
+        collection = self._db[self.collection_name]
+        existing = await collection.index_information()
+        dropped = []
+        for index_name in self.obsolete_indexes:
+            if index_name in existing:
+                await collection.drop_index(index_name)
+                dropped.append(index_name)
+        return dropped
+
+    async def _check_query_plan(
+            self,
+            collection_name: str,
+            query: Dict[str, Any],
+            sort: Optional[List[Tuple[str, int]]] = None
+    ):
+        if MONGO_EXPLAIN_QUERIES:
+            await assert_indexed_query(self._db[collection_name], query, sort)
+
+    async def _check_aggregate_plan(self, collection_name: str, pipeline: List[Dict[str, Any]]):
+        if MONGO_EXPLAIN_QUERIES:
+            await assert_indexed_aggregate(self._db, collection_name, pipeline)
+
     async def create_one(self, collection_name: str, document: Dict[str, Any]) -> str:
         result = await self._db[collection_name].insert_one(document)
         return str(result.inserted_id)
@@ -14,21 +55,167 @@ class BaseRepository:
         result = await self._db[collection_name].insert_many(documents)
         return [str(inserted_id) for inserted_id in result.inserted_ids]
 
-    async def find_one(self, collection_name: str, query: Dict[str, Any]) -> Dict[str, Any]:
-        doc = await self._db[collection_name].find_one(query)
+    async def find_one(
+            self,
+            collection_name: str,
+            query: Dict[str, Any],
+            sort: Optional[List[Tuple[str, int]]] = None,
+            projection: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        await self._check_query_plan(collection_name, query, sort)
+        doc = await self._db[collection_name].find_one(query, projection, sort=sort)
         return doc
 
-    async def find_many(self, collection_name: str, query: Dict[str, Any]) -> List[Dict[str, Any]]:
-        cursor = self._db[collection_name].find(query)
-        results = []
+    async def iter_many(
+            self,
+            collection_name: str,
+            query: Dict[str, Any],
+            projection: Optional[Dict[str, Any]] = None,
+            sort: Optional[List[Tuple[str, int]]] = None,
+            batch_size: int = MONGO_CURSOR_BATCH_SIZE,
+            limit: int = 0,
+            max_time_ms: Optional[int] = None,
+            full_scan: bool = False
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Dokümanları cursor üzerinden batch_size'lık gruplar halinde çekip tek tek döner.
+        full_scan, tüm koleksiyonu bilerek gezen (migration gibi) sorgularda plan kontrolünü kapatır.
+        """
+        if not full_scan:
+            await self._check_query_plan(collection_name, query, sort)
+        cursor = self._db[collection_name].find(
+            query,
+            projection,
+            sort=sort,
+            limit=limit,
+            batch_size=batch_size,
+            max_time_ms=max_time_ms
+        )
         async for document in cursor:
-            results.append(document)
-        return results
+            yield document
+
+    async def find_many(
+            self,
+            collection_name: str,
+            query: Dict[str, Any],
+            projection: Optional[Dict[str, Any]] = None,
+            sort: Optional[List[Tuple[str, int]]] = None,
+            limit: int = 0,
+            max_time_ms: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        return [
+            document
+            async for document in self.iter_many(
+                collection_name, query, projection, sort=sort, limit=limit, max_time_ms=max_time_ms
+            )
+        ]
+
+    async def find_one_and_update(
+            self,
+            collection_name: str,
+            query: Dict[str, Any],
+            update_data: Dict[str, Any],
+            sort: Optional[List[Tuple[str, int]]] = None,
+            projection: Optional[Dict[str, Any]] = None,
+            upsert: bool = False,
+            return_document: bool = ReturnDocument.BEFORE
+    ) -> Optional[Dict[str, Any]]:
+        await self._check_query_plan(collection_name, query, sort)
+        return await self._db[collection_name].find_one_and_update(
+            query,
+            update_data,
+            projection,
+            sort=sort,
+            upsert=upsert,
+            return_document=return_document
+        )
+
+    async def apply_update(
+            self,
+            collection_name: str,
+            query: Dict[str, Any],
+            update_data: Dict[str, Any],
+            upsert: bool = False,
+            many: bool = False,
+            full_scan: bool = False
+    ) -> UpdateResult:
+        """update_one/update_many sonucunu (matched/modified/upserted) olduğu gibi döner."""
+        if not full_scan:
+            await self._check_query_plan(collection_name, query)
+        collection = self._db[collection_name]
+        if many:
+            return await collection.update_many(query, update_data, upsert=upsert)
+        return await collection.update_one(query, update_data, upsert=upsert)
 
     async def update_one(self, collection_name: str, query: Dict[str, Any], update_data: Dict[str, Any]):
-        result = await self._db[collection_name].update_one(query, update_data)
+        result = await self.apply_update(collection_name, query, update_data)
         return result.modified_count
 
+    async def replace_one(
+            self,
+            collection_name: str,
+            query: Dict[str, Any],
+            document: Dict[str, Any],
+            upsert: bool = False
+    ) -> UpdateResult:
+        await self._check_query_plan(collection_name, query)
+        return await self._db[collection_name].replace_one(query, document, upsert=upsert)
+
+    async def bulk_write(
+            self,
+            collection_name: str,
+            operations: List[Any],
+            ordered: bool = False,
+            query: Optional[Dict[str, Any]] = None
+    ) -> BulkWriteResult:
+        """
+        Toplu yazmayı çalıştırır. Aynı toplu yazmadaki işlemler aynı alanlara göre filtrelendiğinden çağıran,
+        oluşturduğu filtrelerden birini query olarak verir ve plan kontrolü bu filtre için bir kez yapılır.
+        Sadece _id ile filtrelenen toplu yazmalarda query verilmez.
+        """
+        if query:
+            await self._check_query_plan(collection_name, query)
+        return await self._db[collection_name].bulk_write(operations, ordered=ordered)
+
+    async def iter_aggregate(
+            self,
+            collection_name: str,
+            pipeline: List[Dict[str, Any]],
+            allow_disk_use: bool = False,
+            batch_size: int = MONGO_CURSOR_BATCH_SIZE,
+            full_scan: bool = False
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Pipeline'ı çalıştırıp sonuçları cursor üzerinden tek tek döner; ilk $match aşaması index'ten okunmalıdır."""
+        if not full_scan:
+            await self._check_aggregate_plan(collection_name, pipeline)
+        cursor = self._db[collection_name].aggregate(pipeline, allowDiskUse=allow_disk_use, batchSize=batch_size)
+        async for document in cursor:
+            yield document
+
+    async def aggregate(
+            self,
+            collection_name: str,
+            pipeline: List[Dict[str, Any]],
+            allow_disk_use: bool = False,
+            full_scan: bool = False
+    ) -> List[Dict[str, Any]]:
+        return [
+            document
+            async for document in self.iter_aggregate(
+                collection_name, pipeline, allow_disk_use=allow_disk_use, full_scan=full_scan
+            )
+        ]
+
+    async def distinct(self, collection_name: str, key: str, query: Dict[str, Any]) -> List[Any]:
+        await self._check_query_plan(collection_name, query)
+        return await self._db[collection_name].distinct(key, query)
+
     async def delete_one(self, collection_name: str, query: Dict[str, Any]):
+        await self._check_query_plan(collection_name, query)
         result = await self._db[collection_name].delete_one(query)
         return result.deleted_count
+
+    async def delete_many(self, collection_name: str, query: Dict[str, Any]) -> int:
+        await self._check_query_plan(collection_name, query)
+        result = await self._db[collection_name].delete_many(query)
+        return result.deleted_count
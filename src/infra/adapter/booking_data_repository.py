@@ -1,48 +1,100 @@
 from datetime import datetime, date
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import IndexModel, ASCENDING, DESCENDING, UpdateOne
 
+from src.core.utils.cache import get_cache
+from src.core.utils.money import normalize_booking_periods
 from src.infra.adapter.base_repository import BaseRepository
+from src.infra.adapter.competitor_repository import SEED_MARKER_COLLECTION as APP_META_COLLECTION
+from src.infra.adapter.price_history_repository import PriceHistoryRepository
+from src.infra.adapter.price_point_repository import PricePointRepository
+from src.infra.config.settings import PRICE_CACHE_MAX_ENTRIES, PRICE_CACHE_TTL_SECONDS
+
+
+def get_price_query_cache():
+    """Fiyat sorgu sonuçları için paylaşılan önbellek; anahtarların ilk elemanı platformdur."""
+    return get_cache("price_queries", PRICE_CACHE_MAX_ENTRIES, PRICE_CACHE_TTL_SECONDS)
+
+
+# Fiyat karşılaştırmasında detaylardan okunan alanlar
+COMPARE_DETAIL_FIELDS = (
+    "port_from",
+    "discount_name",
+    "discount_percent",
+    "commission_percent",
+    "total_price",
+    "list_price",
+    "commission",
+    "total_price_cents",
+    "list_price_cents",
+    "commission_cents",
+)
 
 
 class BookingDataRepository(BaseRepository):
+    indexes = [
+        IndexModel(
+            [("competitor", ASCENDING), ("yacht_id", ASCENDING), ("last_update_date", DESCENDING)],
+            name="competitor_yacht_last_update"
+        ),
+    ]
+
     def __init__(self, db: AsyncIOMotorDatabase, collection_name: None = "booking_data"):
         super().__init__(db)
         self.collection_name = collection_name
+        self.history = PriceHistoryRepository(db, collection_name.replace("booking_data", "price_history", 1))
+        self.price_points = PricePointRepository(db)
+        # 'booking_data_mmk' -> 'mmk'; time-series noktaları bu platform etiketiyle yazılır
+        self.platform = collection_name.replace("booking_data", "", 1).strip("_") or None
+        self._compacted = False
 
     async def save_daily_booking_data(
             self,
             competitor: str,
             booking_docs: List[Dict[str, Any]]
     ):
-        docs_to_insert = []
+        """
+        Her yat için tek bir güncel doküman tutulur (üzerine yazılır); değişen (yat, periyot)
+        değerleri ayrıca fiyat geçmişine eklenir. Fiyat metinleri kaydedilmeden önce sayısal
+        alanlara (kuruş / yüzde) çevrilir. Bu kayıtta çekilen periyotlar ayrıca time-series
+        koleksiyonuna ölçüm noktası olarak yazılır.
+        Koleksiyon henüz fiyat geçmişine aktarılmadıysa (compact_snapshots) eski günlük snapshot'lar
+        kaybolmasın diye üzerine yazılmaz, yeni snapshot eklenir.
+        """
+        replace = await self.is_compacted()
         for doc in booking_docs:
+            scraped_at = datetime.now()
             doc["competitor"] = competitor
-            doc["last_update_date"] = datetime.now()
+            doc["last_update_date"] = scraped_at
+            for period in doc.get("booking_periods", []):
+                period.setdefault("scraped_at", scraped_at)
+            normalize_booking_periods(doc.get("booking_periods", []))
 
-            docs_to_insert.append(doc)
+            if replace:
+                await self.replace_one(
+                    self.collection_name,
+                    {"competitor": competitor, "yacht_id": doc["yacht_id"]},
+                    doc,
+                    upsert=True
+                )
+            else:
+                doc.pop("_id", None)
+                await self.create_one(self.collection_name, doc)
+            await self.history.record_changes(
+                competitor,
+                doc["yacht_id"],
+                doc.get("booking_periods", []),
+                doc["last_update_date"]
+            )
+            if self.platform:
+                await self.price_points.record_booking_doc(self.platform, competitor, doc, scraped_at)
 
-        if docs_to_insert:
-            await self._db[self.collection_name].insert_many(docs_to_insert)
+        if booking_docs:
+            self.invalidate_cached_queries()
 
-    async def get_daily_booking_data(
-            self,
-            competitor: str,
-            yacht_id: str,
-            query_date: date
-    ) -> Dict[str, Any]:
-        start_dt = datetime(query_date.year, query_date.month, query_date.day, 0, 0, 0)
-        end_dt = datetime(query_date.year, query_date.month, query_date.day, 23, 59, 59)
-        filter_ = {
-            "competitor": competitor,
-            "yacht_id": yacht_id,
-            "last_update_date": {
-                "$gte": start_dt,
-                "$lte": end_dt
-            }
-        }
-        doc = await self.find_one(self.collection_name, filter_)
-        return doc
+    def invalidate_cached_queries(self) -> int:
+        return get_price_query_cache().invalidate(lambda key: key[0] == self.platform)
 
     async def get_booking_data_in_date_range(
             self,
@@ -51,17 +103,18 @@ class BookingDataRepository(BaseRepository):
             start_date: date,
             end_date: date
     ) -> List[Dict[str, Any]]:
+        """Aralıktaki her gün için, o günün sonundaki durumu fiyat geçmişinden oluşturur."""
+        return [
+            doc async for doc in self.history.iter_daily_booking_docs(competitor, yacht_id, start_date, end_date)
+        ]
 
-        filter_ = {
-            "competitor": competitor,
-            "yacht_id": yacht_id,
-            "last_update_date": {
-                "$gte": datetime(start_date.year, start_date.month, start_date.day, 0, 0, 0),
-                "$lte": datetime(end_date.year, end_date.month, end_date.day, 23, 59, 59)
-            }
-        }
-        docs = await self.find_many(self.collection_name, filter_)
-        return docs
+    async def get_booking_doc_as_of(
+            self,
+            competitor: str,
+            yacht_id: str,
+            as_of: datetime
+    ) -> Optional[Dict[str, Any]]:
+        return await self.history.get_booking_doc_as_of(competitor, yacht_id, as_of)
 
     async def find_booking_doc(
             self,
@@ -74,9 +127,201 @@ class BookingDataRepository(BaseRepository):
             "yacht_id": yacht_id
         }
 
-        doc = await self._db[self.collection_name].find_one(
-            filter=query,
+        doc = await self.find_one(
+            self.collection_name,
+            query,
             sort=[("last_update_date", -1)]
         )
 
         return doc
+
+    async def latest_update_date(self, competitor: str, yacht_id: str) -> Optional[datetime]:
+        """Önbellek anahtarlarında sürüm olarak kullanılır; sadece index'ten okunur."""
+        doc = await self.find_one(
+            self.collection_name,
+            {"competitor": competitor, "yacht_id": yacht_id},
+            sort=[("last_update_date", -1)],
+            projection={"_id": 0, "last_update_date": 1}
+        )
+        return doc.get("last_update_date") if doc else None
+
+    def _latest_doc_pipeline(self, competitor: str, yacht_id: str, side: str) -> List[Dict[str, Any]]:
+        return [
+            {"$match": {"competitor": competitor, "yacht_id": yacht_id}},
+            {"$sort": {"last_update_date": -1}},
+            {"$limit": 1},
+            {"$project": {"_id": 0, "side": {"$literal": side}, "booking_periods": 1}},
+        ]
+
+    async def compare_latest(
+            self,
+            competitor: str,
+            yacht_id: str,
+            sailamor_yacht_id: str
+    ) -> List[Dict[str, Any]]:
+        """
+        Rakip ve Sailamor yatlarının en güncel dokümanlarını tek bir aggregation ile seçer, periyotları
+        açar, sadece karşılaştırma için gereken alanları alır ve (period_from, period_to) üzerinden birleştirir.
+        """
+        detail_projection = {field: f"$detail.{field}" for field in COMPARE_DETAIL_FIELDS}
+        pipeline = self._latest_doc_pipeline(competitor, yacht_id, "competitor") + [
+            {"$unionWith": {
+                "coll": self.collection_name,
+                "pipeline": self._latest_doc_pipeline("sailamor", sailamor_yacht_id, "sailamor")
+            }},
+            {"$unwind": "$booking_periods"},
+            {"$project": {
+                "side": 1,
+                "period_from": "$booking_periods.period_from",
+                "period_to": "$booking_periods.period_to",
+                "detail": {"$arrayElemAt": ["$booking_periods.details", 0]},
+            }},
+            {"$project": {"side": 1, "period_from": 1, "period_to": 1, "detail": detail_projection}},
+            {"$group": {
+                "_id": {"period_from": "$period_from", "period_to": "$period_to"},
+                "competitor": {"$max": {"$cond": [{"$eq": ["$side", "competitor"]}, "$detail", None]}},
+                "sailamor": {"$max": {"$cond": [{"$eq": ["$side", "sailamor"]}, "$detail", None]}},
+            }},
+            {"$sort": {"_id.period_from": 1, "_id.period_to": 1}},
+            {"$project": {
+                "_id": 0,
+                "period_from": "$_id.period_from",
+                "period_to": "$_id.period_to",
+                "competitor": 1,
+                "sailamor": 1,
+            }},
+        ]
+        return await self.aggregate(self.collection_name, pipeline)
+
+    async def iter_latest_comparison_docs(
+            self,
+            competitor: Optional[str] = None,
+            exclude_competitor: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Her (rakip, yat) için en güncel dokümanı, periyotları sadece karşılaştırma alanlarına
+        indirgenmiş olarak sırayla döner. Sıralama competitor_yacht_last_update index'i ile yapılır,
+        böylece cursor belleğe toplanmadan akıtılabilir.
+        """
+        match: Dict[str, Any] = {}
+        if competitor:
+            match["competitor"] = competitor
+        elif exclude_competitor:
+            match["competitor"] = {"$ne": exclude_competitor}
+
+        pipeline = [
+            {"$match": match},
+            {"$sort": {"competitor": 1, "yacht_id": 1, "last_update_date": -1}},
+            {"$project": {
+                "_id": 0,
+                "competitor": 1,
+                "yacht_id": 1,
+                "booking_periods": {"$map": {
+                    "input": "$booking_periods",
+                    "as": "p",
+                    "in": {
+                        "period_from": "$$p.period_from",
+                        "period_to": "$$p.period_to",
+                        "detail": {"$let": {
+                            "vars": {"d": {"$arrayElemAt": ["$$p.details", 0]}},
+                            "in": {field: f"$$d.{field}" for field in COMPARE_DETAIL_FIELDS},
+                        }},
+                    },
+                }},
+            }},
+        ]
+        previous_key = None
+        async for doc in self.iter_aggregate(self.collection_name, pipeline, allow_disk_use=True):
+            key = (doc["competitor"], doc["yacht_id"])
+            # Compaction öncesinden kalan eski snapshot'lar atlanır
+            if key == previous_key:
+                continue
+            previous_key = key
+            yield doc
+
+    def _compaction_marker_id(self) -> str:
+        return f"price_history_compacted_{self.collection_name}"
+
+    async def is_compacted(self) -> bool:
+        """Snapshot'lar fiyat geçmişine aktarıldıysa True; işaret app_meta koleksiyonunda tutulur."""
+        if not self._compacted:
+            marker = await self.find_one(APP_META_COLLECTION, {"_id": self._compaction_marker_id()})
+            self._compacted = marker is not None
+        return self._compacted
+
+    async def ensure_compacted(self) -> Optional[Dict[str, int]]:
+        """Koleksiyon henüz aktarılmadıysa snapshot'ları silmeden fiyat geçmişine aktarır; aktarıldıysa None döner."""
+        if await self.is_compacted():
+            return None
+        return await self.compact_snapshots()
+
+    async def compact_snapshots(self, drop_snapshots: bool = False) -> Dict[str, int]:
+        """
+        Eski günlük snapshot'ları tarih sırasıyla fiyat geçmişine aktarır. Tekrar çalıştırılabilir:
+        aynı tarihteki değer zaten geçmişte varsa yeni kayıt eklenmez. drop_snapshots verilirse
+        her yat için sadece en güncel snapshot bırakılır. Bitince app_meta'ya işaret yazılır;
+        sonraki kayıtlar yat başına tek dokümanın üzerine yazar.
+        """
+        stats = {"snapshots": 0, "changes": 0, "deleted": 0}
+        pairs = await self.aggregate(
+            self.collection_name,
+            [{"$group": {"_id": {"competitor": "$competitor", "yacht_id": "$yacht_id"}}}],
+            full_scan=True
+        )
+
+        for pair in pairs:
+            competitor = pair["_id"]["competitor"]
+            yacht_id = pair["_id"]["yacht_id"]
+            latest_id = None
+            async for snapshot in self.iter_many(
+                    self.collection_name,
+                    {"competitor": competitor, "yacht_id": yacht_id},
+                    {"booking_periods": 1, "last_update_date": 1},
+                    sort=[("last_update_date", ASCENDING)]
+            ):
+                stats["snapshots"] += 1
+                stats["changes"] += await self.history.record_changes(
+                    competitor,
+                    yacht_id,
+                    snapshot.get("booking_periods", []),
+                    snapshot["last_update_date"]
+                )
+                latest_id = snapshot["_id"]
+
+            if drop_snapshots and latest_id is not None:
+                stats["deleted"] += await self.delete_many(self.collection_name, {
+                    "competitor": competitor,
+                    "yacht_id": yacht_id,
+                    "_id": {"$ne": latest_id}
+                })
+
+        await self.apply_update(
+            APP_META_COLLECTION,
+            {"_id": self._compaction_marker_id()},
+            {"$set": {"compacted_at": datetime.now(), "stats": stats}},
+            upsert=True
+        )
+        self._compacted = True
+        return stats
+
+    async def backfill_numeric_prices(self, batch_size: int = 500) -> int:
+        """Sayısal fiyat alanları olmayan eski dokümanları cursor ile gezip toplu olarak günceller."""
+        operations = []
+        updated = 0
+        async for doc in self.iter_many(
+                self.collection_name,
+                {"booking_periods.details.total_price_cents": {"$exists": False}},
+                {"booking_periods": 1},
+                batch_size=batch_size,
+                full_scan=True
+        ):
+            booking_periods = normalize_booking_periods(doc.get("booking_periods", []))
+            operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"booking_periods": booking_periods}}))
+            if len(operations) >= batch_size:
+                await self.bulk_write(self.collection_name, operations)
+                updated += len(operations)
+                operations = []
+        if operations:
+            await self.bulk_write(self.collection_name, operations)
+            updated += len(operations)
+        return updated
@@ -1,10 +1,36 @@
-from typing import Any, Dict, List
+from datetime import datetime
+from typing import Any, Dict, List, Optional
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import IndexModel, ASCENDING, UpdateOne
 
+from src.core.utils.cache import get_cache
 from src.infra.adapter.base_repository import BaseRepository
+from src.infra.config.settings import COMPETITOR_REGISTRY_TTL_SECONDS
+
+PLATFORMS = ("mmk", "nausys")
+SEED_MARKER_COLLECTION = "app_meta"
+
+
+def get_competitor_registry_cache():
+    """Platform başına rakip listesini tutan süreç içi önbellek; süre dolunca DB'den yeniden okunur."""
+    return get_cache("competitor_registry", len(PLATFORMS), COMPETITOR_REGISTRY_TTL_SECONDS)
 
 
 class CompetitorRepository(BaseRepository):
+    """
+    Rakip ve yat listesinin asıl kaynağı. Her doküman (platform, competitor_name) ile tekildir;
+    trackerlar ve /competitor/* endpoint'leri listeyi get_platform_competitors üzerinden okur.
+    """
+    indexes = [
+        IndexModel(
+            [("platform", ASCENDING), ("competitor_name", ASCENDING)],
+            name="platform_competitor_name",
+            unique=True
+        ),
+    ]
+    # platform_competitor_name'in ön eki olmayan, platform alanı eklenmeden önceki tek alanlı index
+    obsolete_indexes = ["competitor_name"]
+
     def __init__(self, db: AsyncIOMotorDatabase):
         super().__init__(db)
         self.collection_name = "competitor"
@@ -14,35 +40,112 @@ class CompetitorRepository(BaseRepository):
         competitor_name: str,
         yacht_ids: Dict[str, str],
         search_text: str,
-        click_text: str
+        click_text: str,
+        platform: str = "nausys"
     ):
-        existing_doc = await self.find_one(self.collection_name, {"competitor_name": competitor_name})
-        if existing_doc:
-            update_data = {
+        now = datetime.now()
+        await self.apply_update(
+            self.collection_name,
+            {"platform": platform, "competitor_name": competitor_name},
+            {
                 "$set": {
                     "yacht_ids": yacht_ids,
                     "search_text": search_text,
-                    "click_text": click_text
-                }
-            }
-            await self.update_one(self.collection_name, {"competitor_name": competitor_name}, update_data)
-        else:
-            doc = {
-                "competitor_name": competitor_name,
-                "yacht_ids": yacht_ids,
-                "search_text": search_text,
-                "click_text": click_text
-            }
-            await self.create_one(self.collection_name, doc)
-
-    async def get_competitor_doc(self, competitor_name: str) -> Dict[str, Any]:
-        return await self.find_one(self.collection_name, {"competitor_name": competitor_name})
-
-    async def get_all_competitors_and_yacht_ids(self) -> Dict[str, List[str]]:
-        docs = await self.find_many(self.collection_name, {})
+                    "click_text": click_text,
+                    "updated_at": now
+                },
+                "$setOnInsert": {"created_at": now}
+            },
+            upsert=True
+        )
+        get_competitor_registry_cache().invalidate(lambda key: key == platform)
+
+    async def get_competitor_doc(self, competitor_name: str, platform: str = "nausys") -> Dict[str, Any]:
+        return await self.find_one(self.collection_name, {"platform": platform, "competitor_name": competitor_name})
+
+    async def get_all_competitors_and_yacht_ids(self, platform: str = "nausys") -> Dict[str, List[str]]:
         result = {}
-        for doc in docs:
+        async for doc in self.iter_many(
+                self.collection_name,
+                {"platform": platform},
+                {"_id": 0, "competitor_name": 1, "yacht_ids": 1}
+        ):
             cname = doc["competitor_name"]
             yids = doc.get("yacht_ids", [])
             result[cname] = yids
         return result
+
+    async def get_platform_competitors(self, platform: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Platformdaki rakipleri eski COMPETITORS_* sözlükleriyle aynı şekilde ({isim: doküman}) döner.
+        Sonuç önbellekten okunur; DB'deki değişiklikler en geç COMPETITOR_REGISTRY_TTL_SECONDS içinde görünür.
+        Dönen sözlük paylaşıldığından değiştirilmemelidir.
+        """
+        cache = get_competitor_registry_cache()
+        competitors = cache.get(platform)
+        if competitors is not None:
+            return competitors
+
+        competitors = {}
+        async for doc in self.iter_many(
+                self.collection_name,
+                {"platform": platform},
+                {"_id": 0, "created_at": 0, "updated_at": 0},
+                sort=[("competitor_name", ASCENDING)]
+        ):
+            competitors[doc["competitor_name"]] = doc
+        cache.set(platform, competitors)
+        return competitors
+
+    async def sync_from_config(
+            self,
+            platform: str,
+            competitors: Dict[str, Dict[str, Any]],
+            overwrite: bool = False
+    ) -> Dict[str, int]:
+        """
+        Config sözlüğündeki rakipleri koleksiyona aktarır. Varsayılan olarak sadece eksik olanlar eklenir
+        ($setOnInsert), DB'de yapılmış değişikliklere dokunulmaz; overwrite verilirse alanlar config'ten yazılır.
+        """
+        now = datetime.now()
+        operations = []
+        query = None
+        for competitor_name, comp_data in competitors.items():
+            fields = {**comp_data, "competitor_name": competitor_name, "platform": platform}
+            if overwrite:
+                update = {"$set": {**fields, "updated_at": now}, "$setOnInsert": {"created_at": now}}
+            else:
+                update = {"$setOnInsert": {**fields, "created_at": now, "updated_at": now}}
+            query = {"platform": platform, "competitor_name": competitor_name}
+            operations.append(UpdateOne(query, update, upsert=True))
+        if not operations:
+            return {"inserted": 0, "updated": 0}
+        result = await self.bulk_write(self.collection_name, operations, query=query)
+        get_competitor_registry_cache().invalidate(lambda key: key == platform)
+        return {"inserted": result.upserted_count, "updated": result.modified_count}
+
+    async def assign_legacy_platform(self, platform: str = "nausys") -> int:
+        """platform alanı olmayan eski dokümanlar (Nausys create-update akışından) için platformu doldurur."""
+        result = await self.apply_update(
+            self.collection_name,
+            {"platform": {"$exists": False}},
+            {"$set": {"platform": platform}},
+            many=True,
+            full_scan=True
+        )
+        return result.modified_count
+
+    async def seed_once(self, platform: str, competitors: Dict[str, Dict[str, Any]]) -> Optional[Dict[str, int]]:
+        """
+        Config sözlüğünü platform başına sadece bir kez aktarır; sonrasında liste DB üzerinden yönetilir.
+        İşaret dokümanı upsert ile atomik olarak alındığından birden fazla süreç aynı anda başlasa da tek aktarım yapılır.
+        """
+        result = await self.apply_update(
+            SEED_MARKER_COLLECTION,
+            {"_id": f"competitor_seed_{platform}"},
+            {"$setOnInsert": {"seeded_at": datetime.now()}},
+            upsert=True
+        )
+        if result.upserted_id is None:
+            return None
+        return await self.sync_from_config(platform, competitors)
@@ -1,10 +1,11 @@
 # src/infra/adapter/nausys_repository.py
 
 import datetime
-from typing import Any, Dict, List
+from typing import Any, AsyncIterator, Dict, List, Optional
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
 from src.infra.adapter.base_repository import BaseRepository
+from src.infra.adapter.competitor_repository import CompetitorRepository
 
 
 class NausysRepository(BaseRepository):
@@ -25,16 +26,24 @@ class NausysRepository(BaseRepository):
             return inserted_ids
         return None
 
-    async def get_booking_data(
+    def iter_booking_data(
             self,
             competitor_name: str,
-            query: Dict[str, Any]
-    ) -> List[Dict[str, Any]]:
+            query: Dict[str, Any],
+            projection: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
 
         today_str = datetime.datetime.now().strftime("%Y%m%d")
         collection_name = f"nausys_{competitor_name}_{today_str}"
-        booking_data = await self.find_many(collection_name, query)
-        return booking_data
+        return self.iter_many(collection_name, query, projection)
+
+    async def get_booking_data(
+            self,
+            competitor_name: str,
+            query: Dict[str, Any],
+            projection: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        return [doc async for doc in self.iter_booking_data(competitor_name, query, projection)]
 
     async def upsert_competitor_info(
         self,
@@ -43,41 +52,15 @@ class NausysRepository(BaseRepository):
         search_text: str,
         click_text: str
     ):
-
-        collection_name = "competitor"
-        existing_doc = await self.find_one(collection_name, {"competitor_name": competitor_name})
-        if existing_doc:
-            await self.update_one(
-                collection_name,
-                {"competitor_name": competitor_name},
-                {
-                    "$set": {
-                        "yacht_ids": yacht_ids,
-                        "search_text": search_text,
-                        "click_text": click_text
-                    }
-                }
-            )
-        else:
-            doc = {
-                "competitor_name": competitor_name,
-                "yacht_ids": yacht_ids,
-                "search_text": search_text,
-                "click_text": click_text
-            }
-            await self.create_one(collection_name, doc)
+        await CompetitorRepository(self._db).upsert_competitor_info(
+            competitor_name, yacht_ids, search_text, click_text, platform="nausys"
+        )
 
     async def get_competitor_doc(self, competitor_name: str) -> Dict[str, Any]:
-        return await self.find_one("competitor", {"competitor_name": competitor_name})
+        return await CompetitorRepository(self._db).get_competitor_doc(competitor_name, platform="nausys")
 
     async def get_all_competitors_and_yacht_ids(self) -> Dict[str, List[str]]:
-        docs = await self.find_many("competitor", {})
-        result = {}
-        for doc in docs:
-            cname = doc["competitor_name"]
-            yids = doc.get("yacht_ids", [])
-            result[cname] = yids
-        return result
+        return await CompetitorRepository(self._db).get_all_competitors_and_yacht_ids(platform="nausys")
 
     async def get_competitors_missing_data_for_today(self) -> Dict[str, List[str]]:
         today_str = datetime.datetime.now().strftime("%Y%m%d")
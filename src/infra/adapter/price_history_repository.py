@@ -0,0 +1,180 @@
+from datetime import date, datetime, timedelta
+from typing import Any, AsyncIterator, Dict, List, Optional
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import IndexModel, ASCENDING, DESCENDING, UpdateOne
+
+from src.core.utils.money import normalize_details
+from src.infra.adapter.base_repository import BaseRepository
+
+
+class PriceHistoryRepository(BaseRepository):
+    """
+    Olay tabanlı fiyat geçmişi: bir (yat, periyot) için yeni kayıt sadece değer değiştiğinde yazılır.
+    Snapshot'tan kaybolan periyot için removed=True işaretli kapanış kaydı (tombstone) yazılır.
+    Herhangi bir tarihteki durum, o tarihe kadarki en son kayıtlardan (tombstone'lar hariç) yeniden oluşturulur.
+    """
+    indexes = [
+        IndexModel(
+            [("competitor", ASCENDING), ("yacht_id", ASCENDING), ("period_from", ASCENDING), ("valid_from", DESCENDING)],
+            name="competitor_yacht_period_valid_from"
+        ),
+        IndexModel(
+            [("competitor", ASCENDING), ("yacht_id", ASCENDING), ("valid_from", ASCENDING)],
+            name="competitor_yacht_valid_from"
+        ),
+    ]
+
+    def __init__(self, db: AsyncIOMotorDatabase, collection_name: str = "price_history"):
+        super().__init__(db)
+        self.collection_name = collection_name
+
+    async def get_records_as_of(
+            self,
+            competitor: str,
+            yacht_id: str,
+            as_of: datetime
+    ) -> List[Dict[str, Any]]:
+        """Her periyot için as_of anında geçerli olan (en son) kaydı döner; tombstone kayıtlar da dahildir."""
+        pipeline = [
+            {"$match": {"competitor": competitor, "yacht_id": yacht_id, "valid_from": {"$lte": as_of}}},
+            {"$sort": {"period_from": 1, "valid_from": -1}},
+            {"$group": {"_id": "$period_from", "record": {"$first": "$$ROOT"}}},
+            {"$replaceRoot": {"newRoot": "$record"}},
+            {"$sort": {"period_from": 1}},
+        ]
+        return await self.aggregate(self.collection_name, pipeline)
+
+    async def record_changes(
+            self,
+            competitor: str,
+            yacht_id: str,
+            booking_periods: List[Dict[str, Any]],
+            valid_from: datetime
+    ) -> int:
+        """
+        Sadece valid_from anındaki son değerden farklı olan periyotlar için kayıt ekler. Önceki durumda olup
+        booking_periods içinde olmayan periyotlar için tombstone yazılır.
+        """
+        booking_periods = booking_periods or []
+        current = {
+            record["period_from"]: record
+            for record in await self.get_records_as_of(competitor, yacht_id, valid_from)
+        }
+        changes = []
+        for period in booking_periods:
+            previous = current.get(period["period_from"])
+            if previous and not previous.get("removed") and previous.get("details") == period.get("details"):
+                continue
+            changes.append({
+                "competitor": competitor,
+                "yacht_id": yacht_id,
+                "period_from": period["period_from"],
+                "period_to": period.get("period_to"),
+                "details": period.get("details", []),
+                "valid_from": valid_from
+            })
+        present = {period["period_from"] for period in booking_periods}
+        for period_from, previous in current.items():
+            if period_from in present or previous.get("removed"):
+                continue
+            changes.append({
+                "competitor": competitor,
+                "yacht_id": yacht_id,
+                "period_from": period_from,
+                "period_to": previous.get("period_to"),
+                "details": [],
+                "removed": True,
+                "valid_from": valid_from
+            })
+        if changes:
+            await self.create_many(self.collection_name, changes)
+        return len(changes)
+
+    async def get_booking_doc_as_of(
+            self,
+            competitor: str,
+            yacht_id: str,
+            as_of: datetime
+    ) -> Optional[Dict[str, Any]]:
+        """Günlük snapshot dokümanıyla aynı şekilde, as_of tarihindeki durumu yeniden oluşturur."""
+        records = [
+            record for record in await self.get_records_as_of(competitor, yacht_id, as_of)
+            if not record.get("removed")
+        ]
+        if not records:
+            return None
+        return self._build_booking_doc(competitor, yacht_id, records)
+
+    async def iter_daily_booking_docs(
+            self,
+            competitor: str,
+            yacht_id: str,
+            start_date: date,
+            end_date: date
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Aralıktaki her günün sonundaki durumu sırayla döner. Gün başına ayrı sorgu yerine kayıtlar
+        valid_from sırasıyla tek cursor'dan okunur; bellekte sadece periyot başına son kayıt tutulur.
+        """
+        def end_of(day: date) -> datetime:
+            return datetime(day.year, day.month, day.day, 23, 59, 59)
+
+        current: Dict[str, Dict[str, Any]] = {}
+        day = start_date
+        async for record in self.iter_many(
+                self.collection_name,
+                {"competitor": competitor, "yacht_id": yacht_id, "valid_from": {"$lte": end_of(end_date)}},
+                {"_id": 0, "period_from": 1, "period_to": 1, "details": 1, "valid_from": 1, "removed": 1},
+                sort=[("valid_from", ASCENDING)]
+        ):
+            while record["valid_from"] > end_of(day):
+                if current:
+                    yield self._build_booking_doc(competitor, yacht_id, current.values())
+                day += timedelta(days=1)
+            if record.get("removed"):
+                current.pop(record["period_from"], None)
+            else:
+                current[record["period_from"]] = record
+
+        while day <= end_date:
+            if current:
+                yield self._build_booking_doc(competitor, yacht_id, current.values())
+            day += timedelta(days=1)
+
+    @staticmethod
+    def _build_booking_doc(competitor: str, yacht_id: str, records) -> Dict[str, Any]:
+        records = sorted(records, key=lambda record: record["period_from"])
+        return {
+            "competitor": competitor,
+            "yacht_id": yacht_id,
+            "last_update_date": max(record["valid_from"] for record in records),
+            "booking_periods": [
+                {
+                    "period_from": record["period_from"],
+                    "period_to": record["period_to"],
+                    "details": record["details"]
+                }
+                for record in records
+            ]
+        }
+
+    async def backfill_numeric_prices(self, batch_size: int = 500) -> int:
+        operations = []
+        updated = 0
+        async for record in self.iter_many(
+                self.collection_name,
+                {"details.total_price_cents": {"$exists": False}},
+                {"details": 1},
+                batch_size=batch_size,
+                full_scan=True
+        ):
+            details = [normalize_details(item) for item in record.get("details") or [] if item]
+            operations.append(UpdateOne({"_id": record["_id"]}, {"$set": {"details": details}}))
+            if len(operations) >= batch_size:
+                await self.bulk_write(self.collection_name, operations)
+                updated += len(operations)
+                operations = []
+        if operations:
+            await self.bulk_write(self.collection_name, operations)
+            updated += len(operations)
+        return updated
@@ -0,0 +1,326 @@
+import logging
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import IndexModel, ASCENDING
+from pymongo.errors import CollectionInvalid
+
+from src.infra.adapter.base_repository import BaseRepository
+
+logger = logging.getLogger(__name__)
+
+# Time-series dokümanlarında ölçüm olarak tutulan sayısal alanlar
+MEASUREMENT_FIELDS = (
+    "total_price_cents",
+    "list_price_cents",
+    "discount_cents",
+    "commission_cents",
+    "deposit_cents",
+    "discount_percent_value",
+    "commission_percent_value",
+)
+
+
+class PricePointRepository(BaseRepository):
+    """
+    Her haftalık fiyat teklifini bir ölçüm noktası olarak tutan MongoDB time-series koleksiyonu.
+    timeField: scraped_at, metaField: meta (platform, competitor, yacht_id, period_from).
+    Günlük veri için 'hours' granularity, seri başına ~30 günlük bucket'lar üretir.
+    """
+    indexes = [
+        IndexModel(
+            [
+                ("meta.platform", ASCENDING),
+                ("meta.competitor", ASCENDING),
+                ("meta.yacht_id", ASCENDING),
+                ("meta.period_from", ASCENDING),
+                ("scraped_at", ASCENDING),
+            ],
+            name="meta_scraped_at"
+        ),
+    ]
+
+    def __init__(self, db: AsyncIOMotorDatabase, collection_name: str = "price_points"):
+        super().__init__(db)
+        self.collection_name = collection_name
+        self._collection_ready = False
+
+    async def ensure_collection(self):
+        """
+        Koleksiyonu time-series olarak oluşturur. İlk insert koleksiyonu normal koleksiyon olarak
+        oluşturacağından her yazmadan önce (repository başına bir kez) çağrılır. Koleksiyon time-series
+        olmadan oluşturulmuşsa otomatik düzeltilemez; hata loglanır.
+        """
+        if self._collection_ready:
+            return
+        cursor = await self._db.list_collections(filter={"name": self.collection_name})
+        existing = await cursor.to_list(length=None)
+        if not existing:
+            try:
+                await self._db.create_collection(
+                    self.collection_name,
+                    timeseries={"timeField": "scraped_at", "metaField": "meta", "granularity": "hours"}
+                )
+            except CollectionInvalid:
+                # Başka bir süreç aynı anda oluşturdu
+                pass
+        elif "timeseries" not in existing[0].get("options", {}):
+            logger.error(
+                f"'{self.collection_name}' time-series koleksiyonu değil; koleksiyon silinip "
+                f"backfill_price_points ile yeniden oluşturulmalı."
+            )
+        self._collection_ready = True
+
+    async def _insert_points(self, points: List[Dict[str, Any]]):
+        await self.ensure_collection()
+        await self.create_many(self.collection_name, points)
+
+    async def ensure_indexes(self) -> List[str]:
+        await self.ensure_collection()
+        return await super().ensure_indexes()
+
+    @staticmethod
+    def build_points(
+            platform: str,
+            competitor: str,
+            doc: Dict[str, Any],
+            scraped_at: datetime
+    ) -> List[Dict[str, Any]]:
+        """Günlük dokümandaki, scraped_at anında çekilmiş periyotları ölçüm noktalarına çevirir."""
+        points = []
+        for period in doc.get("booking_periods", []):
+            if period.get("scraped_at", scraped_at) != scraped_at:
+                continue
+            details = (period.get("details") or [None])[0]
+            if not details:
+                continue
+            point = {
+                "scraped_at": scraped_at,
+                "meta": {
+                    "platform": platform,
+                    "competitor": competitor,
+                    "yacht_id": doc["yacht_id"],
+                    "period_from": period["period_from"],
+                    "period_to": period.get("period_to"),
+                },
+            }
+            for field in MEASUREMENT_FIELDS:
+                point[field] = details.get(field)
+            points.append(point)
+        return points
+
+    async def record_booking_doc(
+            self,
+            platform: str,
+            competitor: str,
+            doc: Dict[str, Any],
+            scraped_at: datetime
+    ) -> int:
+        points = self.build_points(platform, competitor, doc, scraped_at)
+        if points:
+            await self._insert_points(points)
+        return len(points)
+
+    @staticmethod
+    def _match_stage(
+            platform: str,
+            competitor: str,
+            yacht_id: str,
+            start: datetime,
+            end: datetime,
+            period_from: Optional[str] = None
+    ) -> Dict[str, Any]:
+        match = {
+            "meta.platform": platform,
+            "meta.competitor": competitor,
+            "meta.yacht_id": yacht_id,
+            "scraped_at": {"$gte": start, "$lte": end},
+        }
+        if period_from:
+            match["meta.period_from"] = period_from
+        return {"$match": match}
+
+    async def get_price_range(
+            self,
+            platform: str,
+            competitor: str,
+            yacht_id: str,
+            start: datetime,
+            end: datetime,
+            period_from: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Tarih aralığında her hafta için min/max/ortalama ve ilk/son fiyatı sunucu tarafında hesaplar."""
+        pipeline = [
+            self._match_stage(platform, competitor, yacht_id, start, end, period_from),
+            {"$sort": {"scraped_at": 1}},
+            {"$group": {
+                "_id": {"period_from": "$meta.period_from", "period_to": "$meta.period_to"},
+                "samples": {"$sum": 1},
+                "min_total_price_cents": {"$min": "$total_price_cents"},
+                "max_total_price_cents": {"$max": "$total_price_cents"},
+                "avg_total_price_cents": {"$avg": "$total_price_cents"},
+                "first_total_price_cents": {"$first": "$total_price_cents"},
+                "last_total_price_cents": {"$last": "$total_price_cents"},
+                "first_scraped_at": {"$first": "$scraped_at"},
+                "last_scraped_at": {"$last": "$scraped_at"},
+            }},
+            {"$project": {
+                "_id": 0,
+                "period_from": "$_id.period_from",
+                "period_to": "$_id.period_to",
+                "samples": 1,
+                "min_total_price_cents": 1,
+                "max_total_price_cents": 1,
+                "avg_total_price_cents": 1,
+                "first_total_price_cents": 1,
+                "last_total_price_cents": 1,
+                "first_scraped_at": 1,
+                "last_scraped_at": 1,
+            }},
+            {"$sort": {"period_from": 1}},
+        ]
+        return await self.aggregate(self.collection_name, pipeline)
+
+    async def get_price_window(
+            self,
+            platform: str,
+            competitor: str,
+            yacht_id: str,
+            start: datetime,
+            end: datetime,
+            window_days: int = 7,
+            period_from: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Her hafta serisi için hareketli ortalama ve bir önceki ölçüme göre değişimi ($setWindowFields) döner."""
+        pipeline = [
+            self._match_stage(platform, competitor, yacht_id, start, end, period_from),
+            {"$setWindowFields": {
+                "partitionBy": "$meta.period_from",
+                "sortBy": {"scraped_at": 1},
+                "output": {
+                    "moving_avg_total_price_cents": {
+                        "$avg": "$total_price_cents",
+                        "window": {"range": [-window_days, 0], "unit": "day"}
+                    },
+                    "previous_total_price_cents": {
+                        "$shift": {"output": "$total_price_cents", "by": -1}
+                    },
+                }
+            }},
+            {"$project": {
+                "_id": 0,
+                "scraped_at": 1,
+                "period_from": "$meta.period_from",
+                "period_to": "$meta.period_to",
+                "total_price_cents": 1,
+                "moving_avg_total_price_cents": 1,
+                "change_cents": {"$subtract": ["$total_price_cents", "$previous_total_price_cents"]},
+            }},
+            {"$sort": {"period_from": 1, "scraped_at": 1}},
+        ]
+        return await self.aggregate(self.collection_name, pipeline)
+
+    async def iter_export_rows(
+            self,
+            platform: str,
+            start: datetime,
+            end: datetime,
+            competitors: Optional[List[str]] = None,
+            yacht_ids: Optional[List[str]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Ölçüm noktalarını meta alanları açılmış düz satırlar olarak cursor üzerinden akıtır."""
+        query: Dict[str, Any] = {"meta.platform": platform, "scraped_at": {"$gte": start, "$lte": end}}
+        if competitors:
+            query["meta.competitor"] = {"$in": competitors}
+        if yacht_ids:
+            query["meta.yacht_id"] = {"$in": yacht_ids}
+
+        async for point in self.iter_many(
+                self.collection_name,
+                query,
+                {"_id": 0, "meta": 1, "scraped_at": 1, **{field: 1 for field in MEASUREMENT_FIELDS}},
+                sort=[("meta.competitor", ASCENDING), ("meta.yacht_id", ASCENDING),
+                      ("meta.period_from", ASCENDING), ("scraped_at", ASCENDING)]
+        ):
+            meta = point.get("meta", {})
+            yield {
+                "scrape_date": point["scraped_at"],
+                "competitor": meta.get("competitor"),
+                "yacht_id": meta.get("yacht_id"),
+                "period_from": meta.get("period_from"),
+                "period_to": meta.get("period_to"),
+                **{field: point.get(field) for field in MEASUREMENT_FIELDS},
+            }
+
+    async def _backfill_doc(self, platform: str, competitor: str, doc: Dict[str, Any], scraped_at: datetime) -> int:
+        """Aynı yat ve zaman için nokta yoksa dokümandaki periyotları ekler; eklenen nokta sayısını döner."""
+        exists = await self.find_one(self.collection_name, {
+            "meta.platform": platform,
+            "meta.competitor": competitor,
+            "meta.yacht_id": doc["yacht_id"],
+            "scraped_at": scraped_at,
+        }, projection={"_id": 1})
+        if exists:
+            return 0
+        # Periyot bazında çekim zamanı olmayan eski dokümanlarda tüm periyotlar doküman zamanında sayılır
+        points = self.build_points(platform, competitor, doc, scraped_at)
+        if points:
+            await self._insert_points(points)
+        return len(points)
+
+    async def backfill_from_snapshots(self, platform: str, snapshot_collection: str) -> int:
+        """Mevcut günlük snapshot'lardan ölçüm noktası üretir; aynı yat ve zaman için nokta varsa atlar."""
+        inserted = 0
+        async for doc in self.iter_many(
+                snapshot_collection,
+                {},
+                {"competitor": 1, "yacht_id": 1, "last_update_date": 1, "booking_periods": 1},
+                sort=[("last_update_date", ASCENDING)],
+                full_scan=True
+        ):
+            scraped_at = doc.get("last_update_date")
+            if not scraped_at or not doc.get("yacht_id"):
+                continue
+            inserted += await self._backfill_doc(platform, doc.get("competitor"), doc, scraped_at)
+        return inserted
+
+    async def backfill_from_history(self, platform: str, history_collection: str) -> int:
+        """
+        Fiyat geçmişi kayıtlarından ölçüm noktası üretir. compact_snapshots(drop_snapshots=True) sonrası
+        silinen günlük snapshot'ların fiyatları sadece geçmişte kaldığından, her değişim anı (valid_from)
+        o anda değişen periyotlar için bir nokta olarak eklenir; tombstone kayıtlar atlanır.
+        Aynı yat ve zaman için (örneğin snapshot'lardan) nokta varsa o an atlanır.
+        """
+        inserted = 0
+        group_key = None
+        periods: List[Dict[str, Any]] = []
+
+        async def flush() -> int:
+            if group_key is None or not periods:
+                return 0
+            competitor, yacht_id, valid_from = group_key
+            doc = {"yacht_id": yacht_id, "booking_periods": periods}
+            return await self._backfill_doc(platform, competitor, doc, valid_from)
+
+        async for record in self.iter_many(
+                history_collection,
+                {},
+                {"_id": 0, "competitor": 1, "yacht_id": 1, "period_from": 1, "period_to": 1,
+                 "details": 1, "removed": 1, "valid_from": 1},
+                sort=[("competitor", ASCENDING), ("yacht_id", ASCENDING), ("valid_from", ASCENDING)],
+                full_scan=True
+        ):
+            key = (record.get("competitor"), record.get("yacht_id"), record.get("valid_from"))
+            if key != group_key:
+                inserted += await flush()
+                group_key = key
+                periods = []
+            if record.get("removed") or not record.get("yacht_id") or not record.get("valid_from"):
+                continue
+            periods.append({
+                "period_from": record["period_from"],
+                "period_to": record.get("period_to"),
+                "details": record.get("details") or [],
+            })
+        inserted += await flush()
+        return inserted
@@ -0,0 +1,82 @@
+from typing import Any, Dict, List, Optional, Tuple
+from motor.motor_asyncio import AsyncIOMotorCollection, AsyncIOMotorDatabase
+
+
+class CollectionScanError(Exception):
+    """Bir sorgunun kazanan planı COLLSCAN içerdiğinde fırlatılır."""
+
+
+def find_collscan_stages(plan: Any) -> List[Dict[str, Any]]:
+    """explain() çıktısında COLLSCAN aşamalarını (iç içe planlar dahil) bulur."""
+    stages = []
+    if isinstance(plan, dict):
+        if plan.get("stage") == "COLLSCAN":
+            stages.append(plan)
+        for value in plan.values():
+            stages.extend(find_collscan_stages(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            stages.extend(find_collscan_stages(item))
+    return stages
+
+
+def find_winning_plans(explanation: Any) -> List[Any]:
+    """
+    explain çıktısındaki tüm kazanan planları toplar. Aggregation explain'inde planlar $cursor,
+    $unionWith/$lookup alt pipeline'ları ya da shard'lar altında olabileceğinden çıktı baştan sona gezilir.
+    """
+    plans = []
+    if isinstance(explanation, dict):
+        for key, value in explanation.items():
+            if key == "winningPlan":
+                plans.append(value)
+            elif key != "rejectedPlans":
+                plans.extend(find_winning_plans(value))
+    elif isinstance(explanation, list):
+        for item in explanation:
+            plans.extend(find_winning_plans(item))
+    return plans
+
+
+async def assert_indexed_query(
+        collection: AsyncIOMotorCollection,
+        query: Dict[str, Any],
+        sort: Optional[List[Tuple[str, int]]] = None
+):
+    """
+    Sorguyu explain() ile çalıştırır ve kazanan plan COLLSCAN ise CollectionScanError fırlatır.
+    Filtresi boş sorgular (tüm koleksiyonu okumak zaten amaçlanan) kontrol edilmez.
+    """
+    if not query:
+        return
+    cursor = collection.find(query)
+    if sort:
+        cursor = cursor.sort(sort)
+    explanation = await cursor.explain()
+    winning_plan = explanation.get("queryPlanner", {}).get("winningPlan", {})
+    if find_collscan_stages(winning_plan):
+        raise CollectionScanError(
+            f"COLLSCAN on '{collection.name}' for query={query} sort={sort}"
+        )
+
+
+async def assert_indexed_aggregate(
+        db: AsyncIOMotorDatabase,
+        collection_name: str,
+        pipeline: List[Dict[str, Any]]
+):
+    """
+    Aggregation pipeline'ını explain komutuyla planlar ve herhangi bir kazanan plan (alt pipeline'lar dahil)
+    COLLSCAN ise CollectionScanError fırlatır. $match ile başlamayan ya da boş $match'li pipeline'lar
+    tüm koleksiyonu okumayı amaçladığından kontrol edilmez.
+    """
+    if not pipeline or not pipeline[0].get("$match"):
+        return
+    explanation = await db.command({
+        "explain": {"aggregate": collection_name, "pipeline": pipeline, "cursor": {}},
+        "verbosity": "queryPlanner",
+    })
+    if any(find_collscan_stages(plan) for plan in find_winning_plans(explanation)):
+        raise CollectionScanError(
+            f"COLLSCAN on '{collection_name}' for pipeline={pipeline}"
+        )
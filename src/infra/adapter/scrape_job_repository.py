@@ -0,0 +1,254 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import IndexModel, ASCENDING, DESCENDING, ReturnDocument, UpdateOne
+
+from src.infra.adapter.base_repository import BaseRepository
+from src.infra.config.settings import SCRAPE_JOB_RETENTION_DAYS
+
+JOB_STATUSES = ("pending", "leased", "done", "failed")
+
+
+class ScrapeJobRepository(BaseRepository):
+    """
+    Bir platform çalıştırmasının (run) iş kalemlerini tutar: her kalem bir (rakip, yat) ve sorgulanacak hafta aralığıdır.
+    Worker'lar kalemleri find_one_and_update ile kiralar (lease) ve heartbeat ile uzatır; süresi dolan kiralar
+    başka bir worker tarafından yeniden alınır. Böylece birden fazla API/worker süreci aynı çalıştırmayı paylaşır.
+    """
+    indexes = [
+        IndexModel(
+            [("platform", ASCENDING), ("run_id", ASCENDING), ("status", ASCENDING)],
+            name="platform_run_status"
+        ),
+        IndexModel(
+            [("platform", ASCENDING), ("status", ASCENDING), ("lease_expires_at", ASCENDING)],
+            name="platform_status_lease"
+        ),
+        IndexModel([("platform", ASCENDING), ("created_at", DESCENDING)], name="platform_created_at"),
+        IndexModel(
+            [("created_at", ASCENDING)],
+            name="created_at_ttl",
+            expireAfterSeconds=SCRAPE_JOB_RETENTION_DAYS * 24 * 3600
+        ),
+    ]
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        super().__init__(db)
+        self.collection_name = "scrape_jobs"
+
+    @staticmethod
+    def daily_run_id(platform: str, day: Optional[datetime] = None) -> str:
+        """Aynı gün başlatılan çalıştırmalar (farklı süreçlerden de olsa) aynı run'a yazılır."""
+        return f"{platform}-{(day or datetime.now()):%Y-%m-%d}"
+
+    @staticmethod
+    def _claimable(now: datetime) -> Dict[str, Any]:
+        return {"$or": [
+            {"status": "pending"},
+            {"status": "leased", "lease_expires_at": {"$lt": now}},
+        ]}
+
+    async def enqueue_run(self, platform: str, run_id: str, items: List[Dict[str, Any]]) -> int:
+        """
+        Kalemleri deterministik _id ile $setOnInsert kullanarak ekler; aynı run'ı birden fazla süreç
+        oluşturmaya çalışsa da her kalem bir kez yazılır. Yeni eklenen kalem sayısını döner.
+        """
+        if not items:
+            return 0
+        now = datetime.now()
+        operations = []
+        for item in items:
+            periods = [list(period) for period in item["periods"]]
+            operations.append(UpdateOne(
+                {"_id": f"{run_id}:{item['competitor']}:{item['yacht_id']}"},
+                {"$setOnInsert": {
+                    "run_id": run_id,
+                    "platform": platform,
+                    "competitor": item["competitor"],
+                    "yacht_name": item.get("yacht_name"),
+                    "yacht_id": item["yacht_id"],
+                    "periods": periods,
+                    "week_from": periods[0][0] if periods else None,
+                    "week_to": periods[-1][1] if periods else None,
+                    "status": "pending",
+                    "attempts": 0,
+                    "lease_owner": None,
+                    "lease_expires_at": None,
+                    "created_at": now,
+                }},
+                upsert=True
+            ))
+        result = await self.bulk_write(self.collection_name, operations)
+        return result.upserted_count
+
+    async def claim(
+            self,
+            platform: str,
+            run_id: str,
+            worker_id: str,
+            lease_seconds: float,
+            max_attempts: int
+    ) -> Optional[Dict[str, Any]]:
+        """Bekleyen ya da kirası dolmuş bir kalemi atomik olarak bu worker'a kiralar; yoksa None döner."""
+        now = datetime.now()
+        return await self.find_one_and_update(
+            self.collection_name,
+            {
+                "platform": platform,
+                "run_id": run_id,
+                "attempts": {"$lt": max_attempts},
+                **self._claimable(now),
+            },
+            {
+                "$set": {
+                    "status": "leased",
+                    "lease_owner": worker_id,
+                    "lease_expires_at": now + timedelta(seconds=lease_seconds),
+                    "heartbeat_at": now,
+                    "started_at": now,
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("_id", ASCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def heartbeat(self, job_id: str, worker_id: str, lease_seconds: float) -> bool:
+        """Kirayı uzatır; kalem artık bu worker'da değilse (kira dolup başkasına geçtiyse) False döner."""
+        now = datetime.now()
+        result = await self.apply_update(
+            self.collection_name,
+            {"_id": job_id, "status": "leased", "lease_owner": worker_id},
+            {"$set": {"heartbeat_at": now, "lease_expires_at": now + timedelta(seconds=lease_seconds)}}
+        )
+        return result.matched_count == 1
+
+    async def complete(self, job_id: str, worker_id: str, result: Dict[str, Any]) -> bool:
+        update = await self.apply_update(
+            self.collection_name,
+            {"_id": job_id, "status": "leased", "lease_owner": worker_id},
+            {"$set": {
+                "status": "done",
+                "result": result,
+                "error": None,
+                "lease_expires_at": None,
+                "finished_at": datetime.now(),
+            }}
+        )
+        return update.matched_count == 1
+
+    async def release(self, job_id: str, worker_id: str, result: Dict[str, Any]) -> bool:
+        """
+        İptal ile yarıda kalan kalemi deneme hakkını geri vererek bekleyen duruma alır; kalan haftalar
+        aynı run'ı işleyen başka bir worker ya da yeniden başlatılan çalıştırma tarafından çekilir.
+        """
+        update = await self.apply_update(
+            self.collection_name,
+            {"_id": job_id, "status": "leased", "lease_owner": worker_id},
+            {
+                "$set": {
+                    "status": "pending",
+                    "result": result,
+                    "lease_owner": None,
+                    "lease_expires_at": None,
+                },
+                "$inc": {"attempts": -1},
+            }
+        )
+        return update.matched_count == 1
+
+    async def fail(self, job_id: str, worker_id: str, error: str, max_attempts: int) -> bool:
+        """Hatalı kalemi deneme hakkı kaldıysa tekrar bekleyen duruma, kalmadıysa failed durumuna alır."""
+        job = await self.find_one(self.collection_name, {"_id": job_id}, projection={"attempts": 1})
+        exhausted = job is not None and job.get("attempts", 0) >= max_attempts
+        update = await self.apply_update(
+            self.collection_name,
+            {"_id": job_id, "status": "leased", "lease_owner": worker_id},
+            {"$set": {
+                "status": "failed" if exhausted else "pending",
+                "error": error,
+                "lease_owner": None,
+                "lease_expires_at": None,
+                "finished_at": datetime.now() if exhausted else None,
+            }}
+        )
+        return update.matched_count == 1
+
+    async def fail_exhausted(self, platform: str, run_id: str, max_attempts: int) -> int:
+        """Deneme hakkı bittiği halde kirası dolmuş (worker'ı ölmüş) kalemleri failed olarak kapatır."""
+        now = datetime.now()
+        result = await self.apply_update(
+            self.collection_name,
+            {
+                "platform": platform,
+                "run_id": run_id,
+                "status": "leased",
+                "lease_expires_at": {"$lt": now},
+                "attempts": {"$gte": max_attempts},
+            },
+            {"$set": {"status": "failed", "error": "lease_expired", "lease_owner": None, "finished_at": now}},
+            many=True
+        )
+        return result.modified_count
+
+    async def claimable_run_id(self, platform: str) -> Optional[str]:
+        """Alınabilecek kalemi olan en yeni run'ı döner (worker süreçleri hangi çalıştırmaya katılacağını buradan bulur)."""
+        doc = await self.find_one(
+            self.collection_name,
+            {"platform": platform, **self._claimable(datetime.now())},
+            sort=[("created_at", DESCENDING)],
+            projection={"run_id": 1}
+        )
+        return doc["run_id"] if doc else None
+
+    async def latest_run_id(self, platform: str) -> Optional[str]:
+        doc = await self.find_one(
+            self.collection_name,
+            {"platform": platform},
+            sort=[("created_at", DESCENDING)],
+            projection={"run_id": 1}
+        )
+        return doc["run_id"] if doc else None
+
+    async def run_progress(self, platform: str, run_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Run'daki kalemlerin durum dağılımını ve o an kira tutan worker'ları tüm süreçler için toplu olarak döner."""
+        run_id = run_id or await self.latest_run_id(platform)
+        if run_id is None:
+            return None
+        progress: Dict[str, Any] = {
+            "run_id": run_id,
+            "total": 0,
+            "weeks_total": 0,
+            "weeks_done": 0,
+            "started_at": None,
+            "last_finished_at": None,
+            **{status: 0 for status in JOB_STATUSES},
+        }
+        async for group in self.iter_aggregate(self.collection_name, [
+            {"$match": {"platform": platform, "run_id": run_id}},
+            {"$group": {
+                "_id": "$status",
+                "count": {"$sum": 1},
+                "weeks": {"$sum": {"$size": "$periods"}},
+                "first_created": {"$min": "$created_at"},
+                "last_finished": {"$max": "$finished_at"},
+            }},
+        ]):
+            progress[group["_id"]] = group["count"]
+            progress["total"] += group["count"]
+            progress["weeks_total"] += group["weeks"]
+            if group["_id"] == "done":
+                progress["weeks_done"] = group["weeks"]
+            if progress["started_at"] is None or group["first_created"] < progress["started_at"]:
+                progress["started_at"] = group["first_created"]
+            if group["last_finished"] and (
+                    progress["last_finished_at"] is None or group["last_finished"] > progress["last_finished_at"]):
+                progress["last_finished_at"] = group["last_finished"]
+
+        progress["active_workers"] = sorted(await self.distinct(
+            self.collection_name,
+            "lease_owner",
+            {"platform": platform, "run_id": run_id, "status": "leased", "lease_expires_at": {"$gte": datetime.now()}}
+        ))
+        return progress
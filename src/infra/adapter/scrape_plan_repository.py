@@ -0,0 +1,55 @@
+from datetime import datetime
+from typing import Any, Dict, List
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import IndexModel, ASCENDING, UpdateOne
+
+from src.infra.adapter.base_repository import BaseRepository
+
+
+class ScrapePlanRepository(BaseRepository):
+    indexes = [
+        IndexModel(
+            [("platform", ASCENDING), ("competitor", ASCENDING), ("yacht_id", ASCENDING), ("period_from", ASCENDING)],
+            name="platform_competitor_yacht_period",
+            unique=True
+        ),
+    ]
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        super().__init__(db)
+        self.collection_name = "scrape_plan"
+
+    async def get_period_states(
+            self,
+            platform: str,
+            competitor: str,
+            yacht_id: str
+    ) -> Dict[str, Dict[str, Any]]:
+        states = {}
+        async for doc in self.iter_many(
+                self.collection_name,
+                {"platform": platform, "competitor": competitor, "yacht_id": yacht_id},
+                {"_id": 0}
+        ):
+            states[doc["period_from"]] = doc
+        return states
+
+    async def save_period_states(
+            self,
+            platform: str,
+            competitor: str,
+            yacht_id: str,
+            states: List[Dict[str, Any]]
+    ):
+        if not states:
+            return
+        operations = []
+        for state in states:
+            key = {
+                "platform": platform,
+                "competitor": competitor,
+                "yacht_id": yacht_id,
+                "period_from": state["period_from"]
+            }
+            operations.append(UpdateOne(key, {"$set": {**state, "updated_at": datetime.now()}}, upsert=True))
+        await self.bulk_write(self.collection_name, operations, query=key)
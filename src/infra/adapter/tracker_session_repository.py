@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import IndexModel, ASCENDING
+
+from src.infra.adapter.base_repository import BaseRepository
+
+
+class TrackerSessionRepository(BaseRepository):
+    """
+    Tracker başına (platform) son geçerli oturumu (cookie'ler, Nausys için ViewState) saklar.
+    expires_at geçen dokümanlar TTL index ile Mongo tarafından silinir.
+    """
+    indexes = [
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+    ]
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        super().__init__(db)
+        self.collection_name = "tracker_sessions"
+
+    @staticmethod
+    def session_expiry(cookies: List[Dict[str, Any]], ttl_seconds: float) -> datetime:
+        """Oturumun geçerlilik sonu: ttl ile cookie'lerin en erken 'expiry' değerinden küçük olanı."""
+        expires_at = datetime.now() + timedelta(seconds=ttl_seconds)
+        cookie_expiries = [
+            datetime.fromtimestamp(cookie["expiry"]) for cookie in cookies if cookie.get("expiry")
+        ]
+        if cookie_expiries:
+            expires_at = min(expires_at, min(cookie_expiries))
+        return expires_at
+
+    async def save_session(
+            self,
+            platform: str,
+            cookies: List[Dict[str, Any]],
+            ttl_seconds: float,
+            view_state: Optional[str] = None
+    ):
+        now = datetime.now()
+        await self.replace_one(
+            self.collection_name,
+            {"_id": platform},
+            {
+                "cookies": cookies,
+                "view_state": view_state,
+                "captured_at": now,
+                "validated_at": now,
+                "expires_at": self.session_expiry(cookies, ttl_seconds),
+            },
+            upsert=True
+        )
+
+    async def load_session(self, platform: str) -> Optional[Dict[str, Any]]:
+        """Süresi dolmamış oturumu döner; TTL index'in silme gecikmesi için expires_at ayrıca kontrol edilir."""
+        doc = await self.find_one(self.collection_name, {"_id": platform})
+        if not doc or doc.get("expires_at") is None or doc["expires_at"] <= datetime.now():
+            return None
+        return doc
+
+    async def extend_session(self, platform: str, ttl_seconds: float):
+        """Başarılı bir doğrulama/keep-alive sonrası oturumun geçerliliğini uzatır."""
+        doc = await self.find_one(self.collection_name, {"_id": platform})
+        if not doc:
+            return
+        now = datetime.now()
+        await self.update_one(
+            self.collection_name,
+            {"_id": platform},
+            {"$set": {"validated_at": now, "expires_at": self.session_expiry(doc.get("cookies", []), ttl_seconds)}}
+        )
+
+    async def delete_session(self, platform: str):
+        await self.delete_one(self.collection_name, {"_id": platform})
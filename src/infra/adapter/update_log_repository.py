@@ -1,8 +1,32 @@
+from datetime import date, datetime, timedelta
+
 from src.infra.adapter.base_repository import BaseRepository
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import IndexModel, ASCENDING, DESCENDING
 
 
 class UpdateLogRepository(BaseRepository):
+    indexes = [
+        IndexModel(
+            [("competitor", ASCENDING), ("yacht_id", ASCENDING), ("last_update_date", DESCENDING)],
+            name="competitor_yacht_last_update"
+        ),
+    ]
+
     def __init__(self, db: AsyncIOMotorDatabase):
         super().__init__(db)
         self.collection_name = "update_log"
+
+    async def has_success_on(self, competitor: str, yacht_id: str, day: date) -> bool:
+        """
+        Yat o gün başarıyla güncellendiyse True döner. Hatalı ya da iptalle yarıda kalan ('partial')
+        kayıtlar sayılmaz; böylece kuyruktaki yeniden deneme yatı atlamaz.
+        """
+        start_dt = datetime(day.year, day.month, day.day)
+        doc = await self.find_one(self.collection_name, {
+            "competitor": competitor,
+            "yacht_id": yacht_id,
+            "last_update_date": {"$gte": start_dt, "$lt": start_dt + timedelta(days=1)},
+            "status": "success",
+        }, projection={"_id": 1})
+        return doc is not None
@@ -1,11 +1,89 @@
-from motor.motor_asyncio import AsyncIOMotorClient
-from typing import List
+import asyncio
+import threading
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import monitoring
+from typing import Any, Dict, List
+
+from src.infra.config.settings import (
+    MONGO_MIN_POOL_SIZE,
+    MONGO_MAX_POOL_SIZE,
+    MONGO_MAX_IDLE_TIME_MS,
+    MONGO_WAIT_QUEUE_TIMEOUT_MS,
+    MONGO_SERVER_SELECTION_TIMEOUT_MS,
+)
+
+
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """Connection pool olaylarını sayarak havuz istatistiklerini tutar."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {
+            "connections_created": 0,
+            "connections_closed": 0,
+            "checked_out": 0,
+            "check_outs": 0,
+            "check_out_failures": 0,
+            "pools_cleared": 0,
+        }
+
+    def _incr(self, key: str, value: int = 1):
+        with self._lock:
+            self._stats[key] += value
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["open_connections"] = stats["connections_created"] - stats["connections_closed"]
+        return stats
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._incr("pools_cleared")
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._incr("connections_created")
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._incr("connections_closed")
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self._incr("check_out_failures")
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self._stats["checked_out"] += 1
+            self._stats["check_outs"] += 1
+
+    def connection_checked_in(self, event):
+        self._incr("checked_out", -1)
 
 
 class DatabaseConfig:
     def __init__(self):
         self._database_url = None
+        self._database_name = "boat_tracker"
         self._db_client = None
+        self.min_pool_size = MONGO_MIN_POOL_SIZE
+        self.max_pool_size = MONGO_MAX_POOL_SIZE
+        self.max_idle_time_ms = MONGO_MAX_IDLE_TIME_MS
+        self.wait_queue_timeout_ms = MONGO_WAIT_QUEUE_TIMEOUT_MS
+        self.server_selection_timeout_ms = MONGO_SERVER_SELECTION_TIMEOUT_MS
+        self.pool_listener = PoolStatsListener()
 
     @property
     def database_url(self) -> str:
@@ -15,13 +93,53 @@ class DatabaseConfig:
     def database_url(self, value: str):
         self._database_url = value
 
+    @property
+    def database_name(self) -> str:
+        return self._database_name
+
+    @database_name.setter
+    def database_name(self, value: str):
+        self._database_name = value
+
     @property
     def db_session(self):
         if not self._db_client:
-            self._db_client = AsyncIOMotorClient(self._database_url)
+            self._db_client = AsyncIOMotorClient(
+                self._database_url,
+                minPoolSize=self.min_pool_size,
+                maxPoolSize=self.max_pool_size,
+                maxIdleTimeMS=self.max_idle_time_ms,
+                waitQueueTimeoutMS=self.wait_queue_timeout_ms,
+                serverSelectionTimeoutMS=self.server_selection_timeout_ms,
+                event_listeners=[self.pool_listener],
+            )
 
         return self._db_client
 
+    @property
+    def database(self) -> AsyncIOMotorDatabase:
+        return self.db_session[self._database_name]
+
+    async def warm_up(self):
+        """Havuzu açılışta min_pool_size kadar bağlantıyla doldurur."""
+        await self.db_session.admin.command("ping")
+        await asyncio.gather(*[
+            self.db_session.admin.command("ping") for _ in range(max(self.min_pool_size - 1, 0))
+        ])
+
+    def pool_stats(self) -> Dict[str, Any]:
+        return {
+            "min_pool_size": self.min_pool_size,
+            "max_pool_size": self.max_pool_size,
+            "max_idle_time_ms": self.max_idle_time_ms,
+            **self.pool_listener.snapshot(),
+        }
+
+    def close(self):
+        if self._db_client:
+            self._db_client.close()
+            self._db_client = None
+
     def check(self) -> List[str]:
         errors = []
         if not self._database_url:
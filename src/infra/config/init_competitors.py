@@ -0,0 +1,24 @@
+import logging
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from src.infra.adapter.competitor_repository import CompetitorRepository
+from src.infra.config.config import COMPETITORS_MMK, COMPETITORS_NAUSY
+
+logger = logging.getLogger(__name__)
+
+# İlk açılışta platform başına bir kez aktarılan config sözlükleri
+SEED_COMPETITORS = {
+    "mmk": COMPETITORS_MMK,
+    "nausys": COMPETITORS_NAUSY,
+}
+
+
+async def init_competitors(database: AsyncIOMotorDatabase):
+    repo = CompetitorRepository(database)
+    migrated = await repo.assign_legacy_platform("nausys")
+    if migrated:
+        logger.info(f"{migrated} eski rakip dokümanına platform='nausys' atandı.")
+    for platform, competitors in SEED_COMPETITORS.items():
+        result = await repo.seed_once(platform, competitors)
+        if result:
+            logger.info(f"[{platform}] Rakip listesi config'ten oluşturuldu: {result}")
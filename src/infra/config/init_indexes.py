@@ -0,0 +1,40 @@
+import logging
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import OperationFailure
+
+from src.infra.adapter.booking_data_repository import BookingDataRepository
+from src.infra.adapter.update_log_repository import UpdateLogRepository
+from src.infra.adapter.competitor_repository import CompetitorRepository
+from src.infra.adapter.scrape_plan_repository import ScrapePlanRepository
+from src.infra.adapter.scrape_job_repository import ScrapeJobRepository
+from src.infra.adapter.price_history_repository import PriceHistoryRepository
+from src.infra.adapter.price_point_repository import PricePointRepository
+from src.infra.adapter.tracker_session_repository import TrackerSessionRepository
+
+logger = logging.getLogger(__name__)
+
+# Index'i yönetilen repository'ler; her biri ihtiyaç duyduğu index'leri `indexes` ile tanımlar.
+INDEXED_REPOSITORIES = [
+    lambda db: BookingDataRepository(db, "booking_data_mmk"),
+    lambda db: BookingDataRepository(db, "booking_data_nausys"),
+    lambda db: BookingDataRepository(db),
+    UpdateLogRepository,
+    CompetitorRepository,
+    ScrapePlanRepository,
+    ScrapeJobRepository,
+    lambda db: PriceHistoryRepository(db, "price_history_mmk"),
+    lambda db: PriceHistoryRepository(db, "price_history_nausys"),
+    lambda db: PriceHistoryRepository(db),
+    PricePointRepository,
+    TrackerSessionRepository,
+]
+
+
+async def init_indexes(database: AsyncIOMotorDatabase):
+    for repo_factory in INDEXED_REPOSITORIES:
+        repo = repo_factory(database)
+        try:
+            created = await repo.ensure_indexes()
+            logger.info(f"Indexes ensured on '{repo.collection_name}': {created}")
+        except OperationFailure as e:
+            logger.error(f"Failed to ensure indexes on '{repo.collection_name}': {str(e)}")
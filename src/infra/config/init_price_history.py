@@ -0,0 +1,22 @@
+import logging
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from src.infra.adapter.booking_data_repository import BookingDataRepository
+
+logger = logging.getLogger(__name__)
+
+# Günlük snapshot'ları fiyat geçmişine aktarılması gereken koleksiyonlar
+SNAPSHOT_COLLECTIONS = ["booking_data_mmk", "booking_data_nausys"]
+
+
+async def init_price_history(database: AsyncIOMotorDatabase):
+    """
+    Snapshot'ları henüz fiyat geçmişine aktarılmamış koleksiyonları ilk açılışta bir kez aktarır; böylece
+    geçmiş sorguları eski veriyi de görür. Snapshot'lar silinmez, bunun için compact_price_history
+    migration'ı --drop-snapshots ile çalıştırılabilir.
+    """
+    for collection_name in SNAPSHOT_COLLECTIONS:
+        book_repo = BookingDataRepository(database, collection_name)
+        stats = await book_repo.ensure_compacted()
+        if stats is not None:
+            logger.info(f"[{collection_name}] Snapshot'lar '{book_repo.history.collection_name}' koleksiyonuna aktarıldı: {stats}")
@@ -23,6 +23,18 @@ MONGO_DB: str = config('MONGO_DB', cast=str, default='boat_tracker')
 MONGO_USERNAME: Optional[str] = config('MONGO_USERNAME', cast=str, default='')
 MONGO_PASSWORD: Optional[str] = config('MONGO_PASSWORD', cast=str, default='')
 
+# MongoDB connection pool settings
+MONGO_MIN_POOL_SIZE: int = config('MONGO_MIN_POOL_SIZE', cast=int, default=5)
+MONGO_MAX_POOL_SIZE: int = config('MONGO_MAX_POOL_SIZE', cast=int, default=50)
+MONGO_MAX_IDLE_TIME_MS: int = config('MONGO_MAX_IDLE_TIME_MS', cast=int, default=300000)
+MONGO_WAIT_QUEUE_TIMEOUT_MS: int = config('MONGO_WAIT_QUEUE_TIMEOUT_MS', cast=int, default=10000)
+MONGO_SERVER_SELECTION_TIMEOUT_MS: int = config('MONGO_SERVER_SELECTION_TIMEOUT_MS', cast=int, default=10000)
+
+# Test ortamında repository sorgularını explain() ile kontrol eder, COLLSCAN görürse hata fırlatır
+MONGO_EXPLAIN_QUERIES: bool = config('MONGO_EXPLAIN_QUERIES', cast=bool, default=False)
+# Repository cursor'larında sunucudan tek seferde çekilecek doküman sayısı
+MONGO_CURSOR_BATCH_SIZE: int = config('MONGO_CURSOR_BATCH_SIZE', cast=int, default=500)
+
 # Authentication settings
 ADMIN_USERNAME: str = config('ADMIN_USERNAME', cast=str, default=None)
 ADMIN_PASSWORD: str = config('ADMIN_PASSWORD', cast=str, default=None)
@@ -33,6 +45,74 @@ JWT_EXPIRE_MINUTES: int = config('JWT_EXPIRE_MINUTES', cast=int, default=1440)
 MMK_USERNAME: str = config('MMK_USERNAME', cast=str, default="")
 MMK_PASSWORD: str = config('MMK_PASSWORD', cast=str, default="")
 
+# Outbound HTTP client settings
+HTTP_MAX_CONNECTIONS: int = config('HTTP_MAX_CONNECTIONS', cast=int, default=20)
+HTTP_MAX_KEEPALIVE_CONNECTIONS: int = config('HTTP_MAX_KEEPALIVE_CONNECTIONS', cast=int, default=10)
+HTTP_KEEPALIVE_EXPIRY_SECONDS: float = config('HTTP_KEEPALIVE_EXPIRY_SECONDS', cast=float, default=60.0)
+HTTP_TIMEOUT_SECONDS: float = config('HTTP_TIMEOUT_SECONDS', cast=float, default=30.0)
+
+# Adaptif hız sınırlayıcı başlangıç değerleri (istekler arası saniye); hız çalışma sırasında ayarlanır
+MMK_REQUEST_INTERVAL_SECONDS: float = config('MMK_REQUEST_INTERVAL_SECONDS', cast=float, default=7.5)
+MMK_MIN_REQUEST_INTERVAL_SECONDS: float = config('MMK_MIN_REQUEST_INTERVAL_SECONDS', cast=float, default=1.0)
+MMK_MAX_REQUEST_INTERVAL_SECONDS: float = config('MMK_MAX_REQUEST_INTERVAL_SECONDS', cast=float, default=120.0)
+MMK_THROTTLE_COOLDOWN_SECONDS: float = config('MMK_THROTTLE_COOLDOWN_SECONDS', cast=float, default=300.0)
+NAUSYS_REQUEST_INTERVAL_SECONDS: float = config('NAUSYS_REQUEST_INTERVAL_SECONDS', cast=float, default=30.0)
+NAUSYS_MIN_REQUEST_INTERVAL_SECONDS: float = config('NAUSYS_MIN_REQUEST_INTERVAL_SECONDS', cast=float, default=5.0)
+NAUSYS_MAX_REQUEST_INTERVAL_SECONDS: float = config('NAUSYS_MAX_REQUEST_INTERVAL_SECONDS', cast=float, default=300.0)
+NAUSYS_THROTTLE_COOLDOWN_SECONDS: float = config('NAUSYS_THROTTLE_COOLDOWN_SECONDS', cast=float, default=3600.0)
+
+# MMK tracker'da aynı anda işlenebilecek en fazla yat sayısı
+MMK_MAX_CONCURRENCY: int = config('MMK_MAX_CONCURRENCY', cast=int, default=4)
+# Tek PriceQuoteQueue cevabında okunacak hafta sayısı; 1 verilirse haftalık tekil sorguya dönülür
+MMK_QUEUE_BATCH_SIZE: int = config('MMK_QUEUE_BATCH_SIZE', cast=int, default=13)
+
+# Fiyat karşılaştırma / geçmiş sorguları için sonuç önbelleği
+PRICE_CACHE_MAX_ENTRIES: int = config('PRICE_CACHE_MAX_ENTRIES', cast=int, default=512)
+PRICE_CACHE_TTL_SECONDS: float = config('PRICE_CACHE_TTL_SECONDS', cast=float, default=3600.0)
+
+# Fiyat export'unda tek seferde işlenip gönderilen satır sayısı
+EXPORT_BATCH_SIZE: int = config('EXPORT_BATCH_SIZE', cast=int, default=5000)
+
+# Rakip listesinin DB'den yeniden okunma aralığı; değişiklikler restart gerekmeden bu süre içinde görünür
+COMPETITOR_REGISTRY_TTL_SECONDS: float = config('COMPETITOR_REGISTRY_TTL_SECONDS', cast=float, default=60.0)
+
+# Paylaşılan headless Chrome havuzu
+CHROME_BINARY_PATH: str = config('CHROME_BINARY_PATH', cast=str, default='/usr/bin/chromium')
+CHROMEDRIVER_PATH: str = config('CHROMEDRIVER_PATH', cast=str, default='/usr/bin/chromedriver')
+WEBDRIVER_POOL_SIZE: int = config('WEBDRIVER_POOL_SIZE', cast=int, default=2)
+# Bu kadar sayfa yüklemesinden ya da bellek sınırı aşıldıktan sonra örnek kapatılıp yenisi açılır
+WEBDRIVER_MAX_PAGE_LOADS: int = config('WEBDRIVER_MAX_PAGE_LOADS', cast=int, default=200)
+WEBDRIVER_MAX_RSS_MB: int = config('WEBDRIVER_MAX_RSS_MB', cast=int, default=1024)
+WEBDRIVER_ACQUIRE_TIMEOUT_SECONDS: float = config('WEBDRIVER_ACQUIRE_TIMEOUT_SECONDS', cast=float, default=120.0)
+# Gece çalıştırmasından bu kadar saniye önce havuz ısıtılır
+WEBDRIVER_PREWARM_SECONDS: int = config('WEBDRIVER_PREWARM_SECONDS', cast=int, default=120)
+
+# HTML parse işlerinin gönderildiği süreç havuzu; 0 verilirse parse bir thread'de yapılır
+PARSE_POOL_SIZE: int = config('PARSE_POOL_SIZE', cast=int, default=2)
+# Havuza aynı anda gönderilebilecek en fazla iş; aşılırsa tracker yeni işi göndermeden önce bekler
+PARSE_POOL_MAX_PENDING: int = config('PARSE_POOL_MAX_PENDING', cast=int, default=32)
+
+# Dağıtık scrape kuyruğu (scrape_jobs): kira süresi, heartbeat aralığı, kalem başına deneme sayısı,
+# worker süreçlerinin yeni iş arama aralığı ve tamamlanan run'ların saklanma süresi
+SCRAPE_JOB_LEASE_SECONDS: float = config('SCRAPE_JOB_LEASE_SECONDS', cast=float, default=300.0)
+SCRAPE_JOB_HEARTBEAT_SECONDS: float = config('SCRAPE_JOB_HEARTBEAT_SECONDS', cast=float, default=60.0)
+SCRAPE_JOB_MAX_ATTEMPTS: int = config('SCRAPE_JOB_MAX_ATTEMPTS', cast=int, default=3)
+SCRAPE_JOB_POLL_SECONDS: float = config('SCRAPE_JOB_POLL_SECONDS', cast=float, default=30.0)
+SCRAPE_JOB_RETENTION_DAYS: int = config('SCRAPE_JOB_RETENTION_DAYS', cast=int, default=14)
+
+# Planlı çalıştırmalar (APScheduler, job'lar Mongo'daki scheduler_jobs koleksiyonunda saklanır): platform başına
+# crontab ifadesi (dk saat gün ay haftanın-günü), başlangıç jitter'ı ve kesintide kaçırılan çalıştırmanın
+# telafi edileceği en fazla gecikme. SCHEDULER_TIMEZONE boşsa sunucunun yerel saat dilimi kullanılır
+MMK_SCHEDULE_CRON: str = config('MMK_SCHEDULE_CRON', cast=str, default='0 0 * * *')
+NAUSYS_SCHEDULE_CRON: str = config('NAUSYS_SCHEDULE_CRON', cast=str, default='30 0 * * *')
+SCHEDULER_TIMEZONE: str = config('SCHEDULER_TIMEZONE', cast=str, default='')
+SCHEDULER_JITTER_SECONDS: int = config('SCHEDULER_JITTER_SECONDS', cast=int, default=600)
+SCHEDULER_MISFIRE_GRACE_SECONDS: int = config('SCHEDULER_MISFIRE_GRACE_SECONDS', cast=int, default=6 * 3600)
+
+# Kalıcı tracker oturumları: geçerlilik süresi (her başarılı doğrulamada uzatılır) ve keep-alive aralığı
+TRACKER_SESSION_TTL_SECONDS: float = config('TRACKER_SESSION_TTL_SECONDS', cast=float, default=6 * 3600.0)
+TRACKER_SESSION_KEEPALIVE_SECONDS: float = config('TRACKER_SESSION_KEEPALIVE_SECONDS', cast=float, default=600.0)
+
 # Nausys settings
 NAUSYS_USERNAME: str = config('NAUSYS_USERNAME', cast=str, default="")
 NAUSYS_PASSWORD: str = config('NAUSYS_PASSWORD', cast=str, default="")
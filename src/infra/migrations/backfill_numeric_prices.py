@@ -0,0 +1,32 @@
+import argparse
+import asyncio
+import logging
+
+from src.infra.config.init_database import init_database
+from src.infra.adapter.booking_data_repository import BookingDataRepository
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_COLLECTIONS = ["booking_data_mmk", "booking_data_nausys"]
+
+
+async def backfill_numeric_prices(batch_size: int = 500):
+    db_conf = init_database()
+    try:
+        database = db_conf.database
+        for collection_name in SNAPSHOT_COLLECTIONS:
+            book_repo = BookingDataRepository(database, collection_name)
+            updated = await book_repo.backfill_numeric_prices(batch_size=batch_size)
+            logger.info(f"[{collection_name}] {updated} doküman güncellendi.")
+            updated = await book_repo.history.backfill_numeric_prices(batch_size=batch_size)
+            logger.info(f"[{book_repo.history.collection_name}] {updated} kayıt güncellendi.")
+    finally:
+        db_conf.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Eski fiyat metinlerini sayısal alanlara çevirir.")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(backfill_numeric_prices(batch_size=args.batch_size))
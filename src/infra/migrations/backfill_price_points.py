@@ -0,0 +1,41 @@
+"""
+price_points time-series koleksiyonunu eski verilerden doldurur.
+
+Kaynaklar sırasıyla okunur:
+1. Günlük snapshot'lar (booking_data_*): silinmemiş her günün tüm periyotları.
+2. Fiyat geçmişi (price_history_*): compact_price_history --drop-snapshots ile snapshot'ları silinmiş
+   günlerin fiyatları sadece burada kalır; her değişim anı, o anda değişen periyotlar için nokta olarak eklenir.
+
+Aynı yat ve zaman için nokta varsa tekrar eklenmez; script compact_price_history'den önce ya da sonra
+çalıştırılabilir. Değişmeyen günlerin ölçümleri de istenirse --drop-snapshots'tan önce çalıştırılmalıdır.
+"""
+import asyncio
+import logging
+
+from src.infra.config.init_database import init_database
+from src.infra.adapter.price_point_repository import PricePointRepository
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_COLLECTIONS = {"mmk": "booking_data_mmk", "nausys": "booking_data_nausys"}
+HISTORY_COLLECTIONS = {"mmk": "price_history_mmk", "nausys": "price_history_nausys"}
+
+
+async def backfill_price_points():
+    db_conf = init_database()
+    try:
+        price_points = PricePointRepository(db_conf.database)
+        await price_points.ensure_indexes()
+        for platform, collection_name in SNAPSHOT_COLLECTIONS.items():
+            inserted = await price_points.backfill_from_snapshots(platform, collection_name)
+            logger.info(f"[{collection_name}] -> '{price_points.collection_name}': {inserted} nokta eklendi.")
+        for platform, collection_name in HISTORY_COLLECTIONS.items():
+            inserted = await price_points.backfill_from_history(platform, collection_name)
+            logger.info(f"[{collection_name}] -> '{price_points.collection_name}': {inserted} nokta eklendi.")
+    finally:
+        db_conf.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(backfill_price_points())
@@ -0,0 +1,36 @@
+import argparse
+import asyncio
+import logging
+
+from src.infra.config.init_database import init_database
+from src.infra.config.init_indexes import init_indexes
+from src.infra.adapter.booking_data_repository import BookingDataRepository
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_COLLECTIONS = ["booking_data_mmk", "booking_data_nausys"]
+
+
+async def compact_price_history(drop_snapshots: bool = False):
+    db_conf = init_database()
+    try:
+        database = db_conf.database
+        await init_indexes(database)
+        for collection_name in SNAPSHOT_COLLECTIONS:
+            book_repo = BookingDataRepository(database, collection_name)
+            stats = await book_repo.compact_snapshots(drop_snapshots=drop_snapshots)
+            logger.info(f"[{collection_name}] -> '{book_repo.history.collection_name}': {stats}")
+    finally:
+        db_conf.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Günlük snapshot'ları değişim tabanlı fiyat geçmişine dönüştürür.")
+    parser.add_argument(
+        "--drop-snapshots",
+        action="store_true",
+        help="Aktarımdan sonra her yat için sadece en güncel snapshot'ı bırakır."
+    )
+    args = parser.parse_args()
+    asyncio.run(compact_price_history(drop_snapshots=args.drop_snapshots))
@@ -0,0 +1,34 @@
+import argparse
+import asyncio
+import logging
+
+from src.infra.config.init_database import init_database
+from src.infra.config.init_competitors import SEED_COMPETITORS
+from src.infra.adapter.competitor_repository import CompetitorRepository
+
+logger = logging.getLogger(__name__)
+
+
+async def sync_competitors(overwrite: bool):
+    db_conf = init_database()
+    try:
+        repo = CompetitorRepository(db_conf.database)
+        await repo.assign_legacy_platform("nausys")
+        await repo.ensure_indexes()
+        for platform, competitors in SEED_COMPETITORS.items():
+            result = await repo.sync_from_config(platform, competitors, overwrite=overwrite)
+            logger.info(f"[{platform}] -> '{repo.collection_name}': {result}")
+    finally:
+        db_conf.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Config'teki rakip listelerini competitor koleksiyonuna aktarır.")
+    parser.add_argument(
+        "--overwrite",
+        action="store_true",
+        help="Var olan rakiplerin alanlarını da config'teki değerlerle günceller"
+    )
+    args = parser.parse_args()
+    asyncio.run(sync_competitors(args.overwrite))
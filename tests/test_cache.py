@@ -0,0 +1,59 @@
+from src.core.utils import cache as cache_module
+from src.core.utils.cache import LRUTTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _cache(monkeypatch, max_entries=2, ttl_seconds=60):
+    clock = FakeClock()
+    monkeypatch.setattr(cache_module.time, "monotonic", clock)
+    return LRUTTLCache("test", max_entries, ttl_seconds), clock
+
+
+def test_get_returns_cached_value_and_counts_hits(monkeypatch):
+    cache, _ = _cache(monkeypatch)
+    assert cache.get("a") is None
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_ratio"]) == (1, 1, 0.5)
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    cache, clock = _cache(monkeypatch)
+    cache.set("a", 1)
+    clock.now += 59
+    assert cache.get("a") == 1
+    clock.now += 1
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted(monkeypatch):
+    cache, _ = _cache(monkeypatch)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_invalidate_with_predicate(monkeypatch):
+    cache, _ = _cache(monkeypatch, max_entries=10)
+    cache.set(("mmk", 1), 1)
+    cache.set(("mmk", 2), 2)
+    cache.set(("nausys", 1), 3)
+    assert cache.invalidate(lambda key: key[0] == "mmk") == 2
+    assert cache.get(("nausys", 1)) == 3
+    assert cache.invalidate() == 1
+    assert cache.stats()["invalidations"] == 3
@@ -0,0 +1,24 @@
+import pytest
+
+from src.core.utils.money import parse_amount_cents
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("1.234,56 €", 123456),
+    ("1,234.56", 123456),
+    ("1.234", 123400),
+    ("1,234", 123400),
+    ("12,5", 1250),
+    ("€ 2.500,00", 250000),
+    ("-1.000,00", -100000),
+    ("1.234.567,89", 123456789),
+    (1234.5, 123450),
+    (1000, 100000),
+])
+def test_parse_amount_cents(value, expected):
+    assert parse_amount_cents(value) == expected
+
+
+@pytest.mark.parametrize("value", [None, True, "", "N/A", "€"])
+def test_parse_amount_cents_returns_none_for_non_amounts(value):
+    assert parse_amount_cents(value) is None
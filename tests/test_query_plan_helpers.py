@@ -0,0 +1,65 @@
+"""
+query_plan yardımcılarını MongoDB olmadan, hazır explain çıktılarıyla test eder.
+"""
+import asyncio
+
+import pytest
+
+from src.infra.adapter.query_plan import (
+    CollectionScanError,
+    assert_indexed_aggregate,
+    find_collscan_stages,
+    find_winning_plans,
+)
+
+IXSCAN_PLAN = {"stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": "yacht_id_1"}}
+COLLSCAN_PLAN = {"stage": "SORT", "inputStage": {"stage": "COLLSCAN", "direction": "forward"}}
+
+
+class FakeDatabase:
+    """command() çağrısında verilen explain çıktısını döner ve gönderilen komutları saklar."""
+
+    def __init__(self, explanation):
+        self.explanation = explanation
+        self.commands = []
+
+    async def command(self, command):
+        self.commands.append(command)
+        return self.explanation
+
+
+def test_find_collscan_stages_finds_nested_stages():
+    plan = {"stage": "OR", "inputStages": [IXSCAN_PLAN, COLLSCAN_PLAN]}
+    assert find_collscan_stages(plan) == [COLLSCAN_PLAN["inputStage"]]
+    assert find_collscan_stages(IXSCAN_PLAN) == []
+
+
+def test_find_winning_plans_skips_rejected_plans():
+    explanation = {
+        "stages": [
+            {"$cursor": {"queryPlanner": {"winningPlan": IXSCAN_PLAN, "rejectedPlans": [COLLSCAN_PLAN]}}},
+            {"$unionWith": {"pipeline": [{"$cursor": {"queryPlanner": {"winningPlan": COLLSCAN_PLAN}}}]}},
+        ]
+    }
+    assert find_winning_plans(explanation) == [IXSCAN_PLAN, COLLSCAN_PLAN]
+
+
+def test_assert_indexed_aggregate_raises_on_collscan():
+    db = FakeDatabase({"stages": [{"$cursor": {"queryPlanner": {"winningPlan": COLLSCAN_PLAN}}}]})
+    pipeline = [{"$match": {"yacht_id": "1001"}}]
+    with pytest.raises(CollectionScanError):
+        asyncio.run(assert_indexed_aggregate(db, "booking_data_mmk", pipeline))
+    assert db.commands[0]["explain"]["aggregate"] == "booking_data_mmk"
+    assert db.commands[0]["explain"]["pipeline"] == pipeline
+
+
+def test_assert_indexed_aggregate_passes_indexed_plan():
+    db = FakeDatabase({"queryPlanner": {"winningPlan": IXSCAN_PLAN, "rejectedPlans": [COLLSCAN_PLAN]}})
+    asyncio.run(assert_indexed_aggregate(db, "booking_data_mmk", [{"$match": {"yacht_id": "1001"}}]))
+
+
+@pytest.mark.parametrize("pipeline", [[], [{"$match": {}}], [{"$group": {"_id": "$yacht_id"}}]])
+def test_assert_indexed_aggregate_skips_full_scans(pipeline):
+    db = FakeDatabase({"queryPlanner": {"winningPlan": COLLSCAN_PLAN}})
+    asyncio.run(assert_indexed_aggregate(db, "booking_data_mmk", pipeline))
+    assert db.commands == []
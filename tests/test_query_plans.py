@@ -0,0 +1,181 @@
+"""
+Repository sorgularını MONGO_EXPLAIN_QUERIES açıkken gerçek bir MongoDB üzerinde çalıştırır; herhangi bir
+sorgu ya da aggregation COLLSCAN ile planlanırsa CollectionScanError ile test düşer.
+
+MongoDB adresi MONGO_TEST_URL ile verilir (varsayılan mongodb://localhost:27017); erişilemezse testler atlanır.
+Her test kendi geçici veritabanını oluşturup siler.
+
+    MONGO_TEST_URL=mongodb://localhost:27017 python -m pytest tests/test_query_plans.py
+"""
+import asyncio
+import os
+import uuid
+from datetime import date, datetime, timedelta
+
+import pytest
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+from src.infra.adapter import base_repository
+from src.infra.adapter.booking_data_repository import BookingDataRepository
+from src.infra.adapter.competitor_repository import CompetitorRepository, get_competitor_registry_cache
+from src.infra.adapter.price_point_repository import PricePointRepository
+from src.infra.adapter.scrape_job_repository import ScrapeJobRepository
+from src.infra.adapter.scrape_plan_repository import ScrapePlanRepository
+from src.infra.adapter.tracker_session_repository import TrackerSessionRepository
+from src.infra.adapter.update_log_repository import UpdateLogRepository
+from src.infra.config.init_indexes import init_indexes
+
+MONGO_TEST_URL = os.environ.get("MONGO_TEST_URL", "mongodb://localhost:27017")
+
+COMPETITOR = "rakip"
+YACHT_ID = "1001"
+PERIOD_FROM = "2030-06-01 00:00:00"
+PERIOD_TO = "2030-06-08 00:00:00"
+
+
+def _mongo_available() -> bool:
+    client = MongoClient(MONGO_TEST_URL, serverSelectionTimeoutMS=1000)
+    try:
+        client.admin.command("ping")
+        return True
+    except PyMongoError:
+        return False
+    finally:
+        client.close()
+
+
+pytestmark = pytest.mark.skipif(not _mongo_available(), reason=f"MongoDB erişilemiyor: {MONGO_TEST_URL}")
+
+
+def _booking_doc(yacht_id: str, price: str):
+    return {
+        "yacht_id": yacht_id,
+        "booking_periods": [{
+            "period_from": PERIOD_FROM,
+            "period_to": PERIOD_TO,
+            "details": [{"total_price": price, "list_price": price, "discount_percent": "10%"}],
+        }],
+    }
+
+
+async def _seed(db):
+    await init_indexes(db)
+    booking = BookingDataRepository(db, "booking_data_mmk")
+    await booking.save_daily_booking_data(COMPETITOR, [_booking_doc(YACHT_ID, "1.000,00 €")])
+    await booking.save_daily_booking_data("sailamor", [_booking_doc("2002", "1.100,00 €")])
+    await CompetitorRepository(db).sync_from_config("mmk", {COMPETITOR: {"yacht_ids": {"Yat": YACHT_ID}}})
+    await ScrapeJobRepository(db).enqueue_run("mmk", "mmk-run", [
+        {"competitor": COMPETITOR, "yacht_id": YACHT_ID, "periods": [(PERIOD_FROM, PERIOD_TO)]},
+    ])
+    await ScrapePlanRepository(db).save_period_states("mmk", COMPETITOR, YACHT_ID, [{"period_from": PERIOD_FROM}])
+    await TrackerSessionRepository(db).save_session("mmk", [], 3600)
+    await UpdateLogRepository(db).create_one("update_log", {
+        "competitor": COMPETITOR, "yacht_id": YACHT_ID, "last_update_date": datetime.now(), "status": "success",
+    })
+
+
+async def _booking_queries(db):
+    booking = BookingDataRepository(db, "booking_data_mmk")
+    today = date.today()
+    await booking.is_compacted()
+    await booking.find_booking_doc(COMPETITOR, YACHT_ID)
+    await booking.latest_update_date(COMPETITOR, YACHT_ID)
+    await booking.compare_latest(COMPETITOR, YACHT_ID, "2002")
+    [doc async for doc in booking.iter_latest_comparison_docs(competitor=COMPETITOR)]
+    [doc async for doc in booking.iter_latest_comparison_docs(exclude_competitor="sailamor")]
+    await booking.get_booking_data_in_date_range(COMPETITOR, YACHT_ID, today - timedelta(days=1), today)
+    await booking.get_booking_doc_as_of(COMPETITOR, YACHT_ID, datetime.now())
+    await booking.compact_snapshots(drop_snapshots=True)
+    await booking.backfill_numeric_prices()
+    await booking.history.backfill_numeric_prices()
+
+
+async def _price_point_queries(db):
+    points = PricePointRepository(db)
+    end = datetime.now()
+    start = end - timedelta(days=30)
+    await points.get_price_range("mmk", COMPETITOR, YACHT_ID, start, end)
+    await points.get_price_range("mmk", COMPETITOR, YACHT_ID, start, end, period_from=PERIOD_FROM)
+    await points.get_price_window("mmk", COMPETITOR, YACHT_ID, start, end)
+    [row async for row in points.iter_export_rows("mmk", start, end, competitors=[COMPETITOR], yacht_ids=[YACHT_ID])]
+    await points.backfill_from_snapshots("mmk", "booking_data_mmk")
+    await points.backfill_from_history("mmk", "price_history_mmk")
+
+
+async def _competitor_queries(db):
+    competitors = CompetitorRepository(db)
+    get_competitor_registry_cache().invalidate(lambda key: True)
+    await competitors.upsert_competitor_info(COMPETITOR, {"Yat": YACHT_ID}, "rakip", "Rakip", platform="mmk")
+    await competitors.get_competitor_doc(COMPETITOR, platform="mmk")
+    await competitors.get_all_competitors_and_yacht_ids(platform="mmk")
+    await competitors.get_platform_competitors("mmk")
+    await competitors.sync_from_config("mmk", {COMPETITOR: {"yacht_ids": {"Yat": YACHT_ID}}}, overwrite=True)
+    await competitors.assign_legacy_platform()
+    await competitors.seed_once("nausys", {})
+
+
+async def _scrape_job_queries(db):
+    jobs = ScrapeJobRepository(db)
+    assert await jobs.claimable_run_id("mmk") == "mmk-run"
+    job = await jobs.claim("mmk", "mmk-run", "worker-1", 60, 3)
+    assert job is not None
+    await jobs.heartbeat(job["_id"], "worker-1", 60)
+    await jobs.release(job["_id"], "worker-1", {"status": "partial"})
+    job = await jobs.claim("mmk", "mmk-run", "worker-1", 60, 3)
+    await jobs.fail(job["_id"], "worker-1", "hata", 3)
+    job = await jobs.claim("mmk", "mmk-run", "worker-1", 60, 3)
+    await jobs.complete(job["_id"], "worker-1", {"status": "success"})
+    await jobs.fail_exhausted("mmk", "mmk-run", 3)
+    await jobs.latest_run_id("mmk")
+    await jobs.run_progress("mmk")
+
+
+async def _scrape_plan_queries(db):
+    plans = ScrapePlanRepository(db)
+    await plans.get_period_states("mmk", COMPETITOR, YACHT_ID)
+    await plans.save_period_states("mmk", COMPETITOR, YACHT_ID, [{"period_from": PERIOD_FROM, "misses": 1}])
+
+
+async def _tracker_session_queries(db):
+    sessions = TrackerSessionRepository(db)
+    await sessions.load_session("mmk")
+    await sessions.extend_session("mmk", 3600)
+    await sessions.delete_session("mmk")
+
+
+async def _update_log_queries(db):
+    assert await UpdateLogRepository(db).has_success_on(COMPETITOR, YACHT_ID, date.today())
+
+
+QUERY_GROUPS = {
+    "booking_data": _booking_queries,
+    "price_points": _price_point_queries,
+    "competitor": _competitor_queries,
+    "scrape_jobs": _scrape_job_queries,
+    "scrape_plan": _scrape_plan_queries,
+    "tracker_sessions": _tracker_session_queries,
+    "update_log": _update_log_queries,
+}
+
+
+@pytest.fixture
+def explain_queries(monkeypatch):
+    monkeypatch.setattr(base_repository, "MONGO_EXPLAIN_QUERIES", True)
+
+
+@pytest.mark.parametrize("group", sorted(QUERY_GROUPS))
+def test_repository_queries_use_indexes(group, explain_queries):
+    async def run():
+        client = AsyncIOMotorClient(MONGO_TEST_URL, serverSelectionTimeoutMS=5000)
+        db_name = f"query_plan_test_{uuid.uuid4().hex[:8]}"
+        try:
+            db = client[db_name]
+            await _seed(db)
+            await QUERY_GROUPS[group](db)
+        finally:
+            await client.drop_database(db_name)
+            client.close()
+
+    asyncio.run(run())
@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta
+
+from src.core.tracker.scrape_planner import MAX_INTERVAL, MIN_INTERVAL, ScrapePlanner
+
+NOW = datetime(2030, 5, 1, 12, 0)
+
+
+def _period(period_from, price="1.000,00 €"):
+    period_to = (datetime.strptime(period_from, "%Y-%m-%d %H:%M:%S") + timedelta(days=7)).strftime("%Y-%m-%d %H:%M:%S")
+    return {"period_from": period_from, "period_to": period_to, "details": [{"total_price": price}]}
+
+
+def test_refresh_interval_by_distance_to_departure():
+    assert ScrapePlanner.refresh_interval(NOW + timedelta(days=7), 0, 0, NOW) == timedelta(days=1)
+    assert ScrapePlanner.refresh_interval(NOW + timedelta(days=30), 0, 0, NOW) == timedelta(days=2)
+    assert ScrapePlanner.refresh_interval(NOW + timedelta(days=60), 0, 0, NOW) == timedelta(days=4)
+    assert ScrapePlanner.refresh_interval(NOW + timedelta(days=200), 0, 0, NOW) == timedelta(days=7)
+
+
+def test_refresh_interval_by_change_ratio():
+    departure = NOW + timedelta(days=60)
+    # Sık değişen fiyat aralığı yarıya indirir, uzun süre sabit kalan fiyat 1.5 katına çıkarır
+    assert ScrapePlanner.refresh_interval(departure, 6, 6, NOW) == timedelta(days=2)
+    assert ScrapePlanner.refresh_interval(departure, 10, 0, NOW) == timedelta(days=6)
+    # Az gözlemde sabit fiyat aralığı uzatmaz
+    assert ScrapePlanner.refresh_interval(departure, 2, 0, NOW) == timedelta(days=4)
+
+
+def test_refresh_interval_never_drops_below_min():
+    assert ScrapePlanner.refresh_interval(NOW + timedelta(days=3), 6, 6, NOW) == MIN_INTERVAL
+
+
+def test_miss_interval_backs_off_up_to_max():
+    departure = NOW + timedelta(days=30)
+    assert ScrapePlanner.miss_interval(departure, 1, NOW) == timedelta(days=2)
+    assert ScrapePlanner.miss_interval(departure, 2, NOW) == timedelta(days=4)
+    assert ScrapePlanner.miss_interval(departure, 3, NOW) == timedelta(days=8)
+    assert ScrapePlanner.miss_interval(departure, 10, NOW) == MAX_INTERVAL
+
+
+def test_merge_booking_periods_carries_unqueried_weeks():
+    previous_doc = {
+        "last_update_date": datetime(2030, 4, 30),
+        "booking_periods": [
+            _period("2030-04-20 00:00:00"),
+            _period("2030-06-01 00:00:00", "900,00 €"),
+            _period("2030-06-08 00:00:00", "900,00 €"),
+            _period("2030-06-15 00:00:00", "900,00 €"),
+        ],
+    }
+    fetched = [_period("2030-06-01 00:00:00", "1.100,00 €")]
+    queried = [
+        ("2030-06-01 00:00:00", "2030-06-08 00:00:00"),
+        ("2030-06-08 00:00:00", "2030-06-15 00:00:00"),
+    ]
+    merged = ScrapePlanner.merge_booking_periods(previous_doc, fetched, queried, NOW)
+
+    # Geçmiş hafta düşer, sorgulanıp sonuç dönmeyen hafta taşınmaz, sorgulanmayan hafta eski fiyatla kalır
+    assert [period["period_from"] for period in merged] == ["2030-06-01 00:00:00", "2030-06-15 00:00:00"]
+    assert merged[0]["details"][0]["total_price"] == "1.100,00 €"
+    assert merged[1]["details"][0]["total_price"] == "900,00 €"
+    assert merged[1]["scraped_at"] == datetime(2030, 4, 30)
+
+
+def test_merge_booking_periods_without_previous_doc():
+    fetched = [_period("2030-06-08 00:00:00"), _period("2030-06-01 00:00:00")]
+    merged = ScrapePlanner.merge_booking_periods(None, fetched, [], NOW)
+    assert [period["period_from"] for period in merged] == ["2030-06-01 00:00:00", "2030-06-08 00:00:00"]
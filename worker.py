@@ -0,0 +1,82 @@
+"""
+Dağıtık scrape worker'ı. API'nin başlattığı (ya da bu süreçte bulunan) run'ların kalemlerini scrape_jobs
+koleksiyonundan kiralayıp işler; istenen sayıda worker süreci/konteyneri aynı run'ı paylaşabilir.
+
+Kullanım:
+    python worker.py --platform mmk --platform nausys
+    python worker.py --platform mmk --once   # alınabilecek kalem kalmayınca çık
+"""
+import argparse
+import asyncio
+import logging
+
+from src.core.tracker.mmk_tracker import MMKTracker
+from src.core.tracker.nausys_tracker import NausysTracker
+from src.core.tracker.parse_pool import get_parse_pool
+from src.core.tracker.scrape_job_worker import ScrapeJobWorker, default_worker_id
+from src.core.tracker.webdriver_pool import get_webdriver_pool
+from src.infra.adapter.scrape_job_repository import ScrapeJobRepository
+from src.infra.adapter.tracker_session_repository import TrackerSessionRepository
+from src.infra.config.init_database import init_database
+from src.infra.config.init_indexes import init_indexes
+from src.infra.config.init_price_history import init_price_history
+from src.infra.config.settings import SCRAPE_JOB_POLL_SECONDS
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("worker")
+
+TRACKER_FACTORIES = {
+    "mmk": lambda db: MMKTracker(TrackerSessionRepository(db.database)),
+    "nausys": lambda db: NausysTracker(db),
+}
+
+
+async def run_worker(platforms, worker_id: str, once: bool):
+    db = init_database()
+    await db.warm_up()
+    await init_indexes(db.database)
+    await init_price_history(db.database)
+    await asyncio.to_thread(get_parse_pool().warm_up)
+    job_repo = ScrapeJobRepository(db.database)
+    trackers = {}
+    try:
+        while True:
+            for platform in platforms:
+                run_id = await job_repo.claimable_run_id(platform)
+                if run_id is None:
+                    continue
+                tracker = trackers.get(platform) or TRACKER_FACTORIES[platform](db)
+                trackers[platform] = tracker
+                try:
+                    async with tracker.job_processor(db.database) as process:
+                        worker = ScrapeJobWorker(job_repo, platform, worker_id, tracker.job_concurrency)
+                        await worker.run(run_id, process)
+                except Exception as e:
+                    logger.error(f"[{platform}] Run {run_id} could not be processed: {e}", exc_info=True)
+                finally:
+                    await asyncio.to_thread(tracker.release_driver)
+                    await asyncio.to_thread(get_webdriver_pool().close_idle)
+            if once:
+                break
+            await asyncio.sleep(SCRAPE_JOB_POLL_SECONDS)
+    finally:
+        await asyncio.to_thread(get_parse_pool().close)
+        await asyncio.to_thread(get_webdriver_pool().close)
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="scrape_jobs kuyruğundan kalem işleyen worker")
+    parser.add_argument("--platform", action="append", choices=sorted(TRACKER_FACTORIES), required=True)
+    parser.add_argument("--worker-id", default=default_worker_id())
+    parser.add_argument("--once", action="store_true", help="Alınabilecek kalem kalmayınca çık")
+    args = parser.parse_args()
+    logger.info(f"Worker {args.worker_id} starting for platforms: {args.platform}")
+    asyncio.run(run_worker(args.platform, args.worker_id, args.once))
+
+
+if __name__ == "__main__":
+    main()